@@ -1,4 +1,5 @@
 import sys
+import time
 from flask import Flask
 from flask_restx import Api
 from flask_bcrypt import Bcrypt
@@ -21,7 +22,26 @@ from .routes.bookings import bookings as bookings_routes_blueprint
 from app.models.user import User
 from .routes.place_photo import place_photo_bp
 from app.routes.notifications import notifications_bp
+from app.routes.media import media_bp
 from app.api.v1.notifications import notifications_ns
+from app.utils.geocode import geocoder
+from app.services.view_counter import view_counter
+from app.services import conversations, ratings
+from app.services.availability import availability
+from app.services.host_stats import host_stats
+from app.services.outbox import outbox
+from app.services.mailer import mailer
+from app.services.uploads import uploads
+from app.services.photo_pipeline import photo_pipeline
+from app.services.media import build_assets, manifest_path, media
+from app.services.identity import identity
+from app.services.passwords import passwords
+from app.services.tokens import tokens
+from app.utils.perf import perf
+from app.utils.response_cache import response_cache
+from app.utils.pubsub import pubsub
+from app.services.notification_feed import notification_feed
+from app.services.notification_retention import notification_retention
 
 bcrypt = Bcrypt()
 jwt = JWTManager()
@@ -78,9 +98,99 @@ def init_db_command():
     click.echo("✅ Database initialized.")
 
 
+@click.command("geocode-preload")
+@click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+@with_appcontext
+def geocode_preload_command(csv_path):
+    """Load a gazetteer CSV (name, latitude, longitude[, country])."""
+    count = geocoder.gazetteer().load_csv(csv_path)
+    click.echo(f"✅ {count} gazetteer entries loaded.")
+
+
+@click.command("flush-views")
+@with_appcontext
+def flush_views_command():
+    """Write buffered place views to the database now."""
+    count = view_counter.flush()
+    click.echo(f"✅ {count} views flushed.")
+
+
+@click.command("rebuild-ratings")
+@with_appcontext
+def rebuild_ratings_command():
+    """Recompute every place's rating aggregates from its reviews."""
+    count = ratings.rebuild_all()
+    # Written with plain SQL, so the commit hooks did not see which places changed
+    response_cache.clear()
+    click.echo(f"✅ Ratings rebuilt for {count} places.")
+
+
+@click.command("rebuild-host-stats")
+@with_appcontext
+def rebuild_host_stats_command():
+    """Recompute and store every host's rating and portfolio statistics."""
+    count = host_stats.materialize()
+    click.echo(f"✅ Statistics stored for {count} hosts.")
+
+
+@click.command("rebuild-conversations")
+@with_appcontext
+def rebuild_conversations_command():
+    """Recompute every inbox conversation from the messages table."""
+    count = conversations.rebuild_all()
+    click.echo(f"✅ {count} conversations rebuilt.")
+
+
+@click.command("prune-notifications")
+@click.option("--days", type=int, default=None, help="Age in days (NOTIFY_RETENTION_DAYS).")
+@click.option(
+    "--archive/--delete",
+    default=None,
+    help="Keep a copy in notifications_archive (NOTIFY_RETENTION_ARCHIVE).",
+)
+@with_appcontext
+def prune_notifications_command(days, archive):
+    """Remove read notifications older than the retention age."""
+    count = notification_retention.prune(days=days, archive_rows=archive)
+    click.echo(f"✅ {count} notifications pruned.")
+
+
+@click.command("build-assets")
+@with_appcontext
+def build_assets_command():
+    """Fingerprint and pre-compress the static CSS/JS files."""
+    from flask import current_app
+
+    manifest = build_assets(current_app.static_folder, manifest_path(current_app))
+    current_app.extensions["asset_manifest"] = manifest
+    click.echo(f"✅ {len(manifest)} assets built.")
+
+
+@click.command("outbox-worker")
+@click.option("--once", is_flag=True, help="Run the jobs due now, then exit.")
+@click.option("--workers", type=int, default=None, help="Worker threads (OUTBOX_WORKERS).")
+@with_appcontext
+def outbox_worker_command(once, workers):
+    """Run queued background jobs (emails, ...)."""
+    from flask import current_app
+
+    if once:
+        count = outbox.drain()
+        click.echo(f"✅ {count} jobs run.")
+        return
+    app = current_app._get_current_object()
+    outbox.start(app, workers=workers or app.config["OUTBOX_WORKERS"] or 1)
+    click.echo("Outbox workers running, Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        outbox.stop(app)
+
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(user_id)
+    return identity.load(user_id)
 
 
 def create_app(config_class: str = "config.DevelopmentConfig") -> Flask:
@@ -100,9 +210,26 @@ def create_app(config_class: str = "config.DevelopmentConfig") -> Flask:
     db.init_app(app)
     bcrypt.init_app(app)
     jwt.init_app(app)
+    tokens.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
+    identity.init_app(app)
+    passwords.init_app(app)
     login_manager.login_view = "auth.login"
+    geocoder.init_app(app)
+    view_counter.init_app(app)
+    availability.init_app(app)
+    host_stats.init_app(app)
+    outbox.init_app(app)
+    mailer.init_app(app)
+    uploads.init_app(app)
+    photo_pipeline.init_app(app)
+    media.init_app(app)
+    pubsub.init_app(app)
+    notification_feed.init_app(app)
+    notification_retention.init_app(app)
+    perf.init_app(app)
+    response_cache.init_app(app)
 
     # Register blueprints with proper URL prefixes
     app.register_blueprint(auth, url_prefix='/auth')
@@ -116,6 +243,7 @@ def create_app(config_class: str = "config.DevelopmentConfig") -> Flask:
     app.register_blueprint(bookings_routes_blueprint)
     app.register_blueprint(place_photo_bp)
     app.register_blueprint(notifications_bp)
+    app.register_blueprint(media_bp)
 
     # Register API namespaces under /api/v1/
     authorizations = {
@@ -160,14 +288,19 @@ def create_app(config_class: str = "config.DevelopmentConfig") -> Flask:
     api.add_namespace(notifications_ns, path="/api/v1/notifications")
 
     app.cli.add_command(init_db_command)
+    app.cli.add_command(geocode_preload_command)
+    app.cli.add_command(flush_views_command)
+    app.cli.add_command(rebuild_ratings_command)
+    app.cli.add_command(rebuild_host_stats_command)
+    app.cli.add_command(rebuild_conversations_command)
+    app.cli.add_command(prune_notifications_command)
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(outbox_worker_command)
 
     from flask import session
-    from app.models.user import User
 
     def inject_user():
-        user_email = session.get("user")
-        user = User.query.filter_by(email=user_email).first() if user_email else None
-        return dict(user=user)
+        return dict(user=identity.by_email(session.get("user")))
 
     app.context_processor(inject_user)
 
@@ -111,7 +111,7 @@ class AdminUserResource(Resource):
             user_data["is_admin"] = is_admin
 
         if password:
-            user.password = password
+            user.set_password(password)
 
         updated_user = facade.update_user(user_id, user_data)
 
@@ -3,6 +3,7 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 from app.services import facade
 from .models import amenity_model, amenity_input
+from .pagination import PAGE_PARAMS, fetch_page
 
 ns = Namespace("amenities", description="Amenity management")
 
@@ -17,11 +18,16 @@ amenity_input = amenity_input(ns)
 
 @ns.route("/")
 class AmenityList(Resource):
-    @ns.doc("list_amenities", description="Retrieve all amenities (Public)")
+    @ns.doc(
+        "list_amenities",
+        description="Retrieve amenities, one page at a time (Public)",
+        params=PAGE_PARAMS,
+    )
     @ns.marshal_list_with(amenity_model)
     def get(self):
-        """List all amenities."""
-        return facade.list_amenities()
+        """List amenities."""
+        amenities, headers = fetch_page(facade.paginate_amenities)
+        return amenities, 200, headers
 
     @ns.doc(
         "create_amenity",
@@ -4,8 +4,11 @@ auth.py: Authentication endpoints for logging in users or hosts.
 
 from flask import request
 from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import create_access_token, create_refresh_token
+from flask_jwt_extended import get_jwt, jwt_required
+from app.database import db
 from app.services import facade
+from app.services.passwords import passwords
+from app.services.tokens import tokens
 
 # Namespace for authentication
 ns = Namespace("auth", description="Authentication operations")
@@ -40,35 +43,22 @@ class Login(Resource):
         email = data["email"].strip().lower()
         password = data["password"]
 
-        # Try User first
+        # Users and hosts alike (a Host is a User)
         user = facade.get_user_by_email(email)
-        if user and user.check_password(password):
-            identity = str(user.id)  # ✅ cast to string
-            claims = {"is_admin": user.is_admin}
-            access_token = create_access_token(
-                identity=identity, additional_claims=claims
-            )
-            refresh_token = create_refresh_token(
-                identity=identity, additional_claims=claims
-            )
-            return {"access_token": access_token, "refresh_token": refresh_token}, 200
+        if not passwords.check(user, password):
+            ns.abort(401, "Invalid credentials")
+        db.session.commit()  # a password rehashed with the current method
 
-        # Try Host
-        try:
-            host = facade.get_host_by_email(email)
-        except AttributeError:
-            host = None
+        # Claims the resources authorize with, without loading the user
+        return tokens.issue(user), 200
 
-        if host and host.check_password(password):
-            identity = str(host.id)  # ✅ cast to string
-            claims = {"is_admin": host.is_admin}
-            access_token = create_access_token(
-                identity=identity, additional_claims=claims
-            )
-            refresh_token = create_refresh_token(
-                identity=identity, additional_claims=claims
-            )
-            return {"access_token": access_token, "refresh_token": refresh_token}, 200
 
-        # If neither matched
-        ns.abort(401, "Invalid credentials")
+@ns.route("/logout")
+class Logout(Resource):
+    @jwt_required(verify_type=False)
+    @ns.doc("logout", security="BearerAuth")
+    @ns.response(204, "Token revoked")
+    def post(self):
+        """Revoke the presented token (access or refresh) until it expires"""
+        tokens.revoke(get_jwt())
+        return "", 204
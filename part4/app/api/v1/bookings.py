@@ -3,6 +3,8 @@ from flask_restx import Namespace, Resource, fields
 from datetime import datetime, timedelta, date
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.services.facade import BookingConflictError
+from app.api.v1.pagination import PAGE_PARAMS, fetch_page
 
 ns = Namespace("bookings", description="Booking management", security="BearerAuth")
 
@@ -50,15 +52,22 @@ rating_output = ns.model(
 @ns.route("")
 class Bookings(Resource):
     @jwt_required()
+    @ns.doc(
+        "list_bookings",
+        description="List bookings, one page at a time: all of them for admins, "
+        "the caller's own otherwise",
+        security="BearerAuth",
+        params=PAGE_PARAMS,
+    )
     @ns.marshal_list_with(booking_output)
     def get(self):
         current_user = get_jwt_identity()
         claims = get_jwt()
 
         if claims.get("is_admin"):
-            bookings = facade.list_bookings()
+            bookings, headers = fetch_page(facade.paginate_bookings)
         else:
-            bookings = facade.get_user_bookings(current_user)
+            bookings, headers = fetch_page(facade.paginate_bookings, user_id=current_user)
 
         result = []
         for booking in bookings:
@@ -73,7 +82,7 @@ class Bookings(Resource):
                     "total_price": booking.total_price,
                 }
             )
-        return result, 200
+        return result, 200, headers
 
     @jwt_required()
     @ns.expect(booking_input, validate=True)
@@ -105,7 +114,10 @@ class Bookings(Resource):
             "guest_count": guest_count,
         }
 
-        booking = facade.create_booking(data)
+        try:
+            booking = facade.create_booking(data)
+        except BookingConflictError as e:
+            ns.abort(409, str(e))
         if not booking:
             ns.abort(400, "Cannot create booking: conflict or invalid data.")
 
@@ -197,27 +209,29 @@ class BookingResource(Resource):
             ns.abort(400, "Place not found.")
 
         data = {
-            "place": place,
-            "checkin_date": checkin_date,
-            "night_count": nights,
+            "place_id": place.id,
+            "host_id": place.host_id,
+            "start_date": checkin_date,
+            "end_date": checkin_date + timedelta(days=nights),
             "guest_count": guest_count,
+            "total_price": place.price * nights,
         }
 
-        updated = facade.update_booking(booking_id, data)
+        try:
+            updated = facade.update_booking(booking_id, data)
+        except BookingConflictError as e:
+            ns.abort(409, str(e))
         if not updated:
             ns.abort(400, "Cannot update booking: conflict or invalid data.")
 
-        check_out = updated.checkin_date + timedelta(days=updated.night_count)
-        total = updated.place.price * updated.night_count
         return {
             "id": updated.id,
             "user_id": updated.user.id,
             "place_id": updated.place.id,
-            "check_in": updated.checkin_date,
-            "nights": updated.night_count,
+            "start_date": updated.start_date,
+            "end_date": updated.end_date,
             "guest_count": updated.guest_count,
-            "check_out": check_out,
-            "total_price": total,
+            "total_price": updated.total_price,
         }, 200
 
     @jwt_required()
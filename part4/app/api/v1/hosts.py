@@ -1,10 +1,11 @@
-from flask_restx import Resource, marshal
+from flask_restx import Resource, fields, marshal
 from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from app.services import facade
 from app.api.v1.places import place_model
+from app.api.v1.pagination import PAGE_PARAMS, fetch_page
+from app.utils.response_cache import response_cache
 from .models import EMAIL_RE, host_create, host_model, host_update
 from .ns import ns
-from ...models.host import Host
 
 # ----------------------- data models ----------------------- #
 
@@ -21,8 +22,9 @@ class HostList(Resource):
     @jwt_required()
     @ns.doc(
         "list_hosts",
-        description="List all host accounts (Admin only)",
+        description="List host accounts, one page at a time (Admin only)",
         security="BearerAuth",
+        params=PAGE_PARAMS,
     )
     @ns.response(403, "Unauthorized action")
     @ns.marshal_list_with(host_model)
@@ -30,7 +32,8 @@ class HostList(Resource):
         claims = get_jwt()
         if not claims.get("is_admin"):
             ns.abort(403, "Unauthorized action")
-        return facade.list_hosts(), 200
+        hosts, headers = fetch_page(facade.paginate_hosts)
+        return hosts, 200, headers
 
     @jwt_required(optional=True)
     @ns.doc(
@@ -62,7 +65,7 @@ class HostList(Resource):
             ns.abort(400, "First and last name required")
         if not EMAIL_RE.match(email):
             ns.abort(400, "Invalid email address")
-        if any(h.email.lower() == email for h in facade.list_hosts()):
+        if facade.get_user_by_email(email):
             ns.abort(400, f"Host with email {email} already exists")
         if len(pwd) < 8:
             ns.abort(400, "Password must be at least 8 characters")
@@ -91,14 +94,14 @@ class HostDetail(Resource):
     )
     @ns.marshal_with(host_model)
     def get(self, host_id):
-        host = facade.get_host(host_id)
-        if not host:
-            ns.abort(404, f"Host {host_id} not found")
         claims = get_jwt()
         caller = get_jwt_identity()
         if not claims.get("is_admin"):
-            if caller != host_id or not isinstance(host, Host):
+            if caller != host_id or not claims.get("is_host"):
                 ns.abort(403, "Unauthorized action")
+        host = facade.get_host(host_id)
+        if not host:
+            ns.abort(404, f"Host {host_id} not found")
         return host, 200
 
     @jwt_required()
@@ -109,14 +112,14 @@ class HostDetail(Resource):
     )
     @ns.expect(host_update, validate=True)
     def put(self, host_id):
-        host = facade.get_host(host_id)
-        if not host:
-            ns.abort(404, f"Host {host_id} not found")
         claims = get_jwt()
         caller = get_jwt_identity()
         if not claims.get("is_admin"):
-            if caller != host_id or not isinstance(host, Host):
+            if caller != host_id or not claims.get("is_host"):
                 ns.abort(403, "Unauthorized action")
+        host = facade.get_host(host_id)
+        if not host:
+            ns.abort(404, f"Host {host_id} not found")
 
         data = ns.payload or {}
         if "email" in data or "password" in data:
@@ -143,28 +146,50 @@ class HostDetail(Resource):
     )
     @ns.response(204, "Host deleted")
     def delete(self, host_id):
-        host = facade.get_host(host_id)
-        if not host:
-            ns.abort(404, f"Host {host_id} not found")
         claims = get_jwt()
         caller = get_jwt_identity()
         if not claims.get("is_admin"):
-            if caller != host_id or not isinstance(host, Host):
+            if caller != host_id or not claims.get("is_host"):
                 ns.abort(403, "Unauthorized action")
+        host = facade.get_host(host_id)
+        if not host:
+            ns.abort(404, f"Host {host_id} not found")
         facade.delete_host(host_id)
         return "", 204
 
 
+host_stats_model = ns.model(
+    "HostStats",
+    {
+        "host_id": fields.String(description="Host UUID"),
+        "host_rating": fields.Float(
+            description="Mean rating of the reviews of all the host's places"
+        ),
+        "review_count": fields.Integer(description="Number of rated reviews"),
+        "listing_count": fields.Integer(description="Number of places listed"),
+        "total_views": fields.Integer(description="Views of all the host's places"),
+        "booked_nights": fields.Integer(
+            description="Nights booked over the trailing HOST_STATS_WINDOW_DAYS"
+        ),
+        "occupancy": fields.Float(
+            description="Booked nights / (listings x window days), 0 to 1"
+        ),
+    },
+)
+
+
 @ns.route("/hosts/<string:host_id>/rating")
 @ns.response(404, "Host not found or rating unavailable")
 @ns.doc(tags=["Hosts"])
 class HostRating(Resource):
     @ns.doc("get_host_rating", description="Get host rating (Public)", security=[])
+    @response_cache.cached(tags=lambda host_id: (f"host:{host_id}",))
+    @ns.marshal_with(host_stats_model)
     def get(self, host_id):
-        host = facade.get_host(host_id)
-        if not host:
+        stats = facade.get_host_stats(host_id)
+        if stats is None:
             ns.abort(404, f"Host {host_id} not found")
-        return {"host_rating": float(getattr(host, "rating", 0.0) or 0.0)}, 200
+        return stats.to_dict(), 200
 
 
 @ns.route("/hosts/<string:host_id>/owned_places")
@@ -176,6 +201,7 @@ class HostOwnedPlaces(Resource):
         description="List places owned by host (Public)",
         security=[],
     )
+    @response_cache.cached(tags=lambda host_id: (f"host:{host_id}",))
     @ns.marshal_list_with(place_model)
     def get(self, host_id):
         places = facade.get_host_owned_places(host_id)
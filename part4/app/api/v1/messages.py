@@ -5,6 +5,9 @@ from app.models.message import Message
 from app.models.user import User
 from app.database import db
 from datetime import datetime
+from app.api.v1.pagination import page_args
+from app.persistence import InvalidCursor
+from app.services import chat
 
 ns = Namespace("messages", description="Messaging operations")
 
@@ -60,8 +63,11 @@ class Conversation(Resource):
     @jwt_required()
     @ns.param("user_id", "Other user ID to fetch conversation with", required=True)
     @ns.param("place_id", "Place ID to filter messages", required=False)
+    @ns.param("limit", "Messages returned at most (default PAGE_SIZE, at most MAX_PAGE_SIZE)")
+    @ns.param("before", "X-Before-Cursor of a previous response: older history")
+    @ns.param("after", "X-After-Cursor of a previous response: only newer messages")
     def get(self):
-        """Get conversation messages with another user, optionally filtered by place"""
+        """Get the newest messages with another user (oldest first), optionally filtered by place"""
         current_user_id = get_jwt_identity()
         other_user_id = request.args.get("user_id")
         place_id = request.args.get("place_id", type=int)
@@ -69,32 +75,22 @@ class Conversation(Resource):
         if not other_user_id:
             return {"message": "user_id query parameter is required"}, 400
 
-        query = Message.query.filter(
-            (
-                (Message.sender_id == current_user_id)
-                & (Message.receiver_id == other_user_id)
+        limit, _ = page_args()
+        try:
+            messages, before, after = chat.history(
+                current_user_id,
+                other_user_id,
+                limit,
+                before=request.args.get("before") or None,
+                after=request.args.get("after") or None,
+                place_id=place_id,
             )
-            | (
-                (Message.sender_id == other_user_id)
-                & (Message.receiver_id == current_user_id)
-            )
-        )
-        if place_id:
-            query = query.filter(Message.place_id == place_id)
-
-        messages = query.order_by(Message.timestamp.asc()).all()
-
-        result = [
-            {
-                "id": m.id,
-                "sender_id": m.sender_id,
-                "receiver_id": m.receiver_id,
-                "place_id": m.place_id,
-                "content": m.content,
-                "timestamp": m.timestamp.isoformat(),
-                "is_read": m.is_read,
-            }
-            for m in messages
-        ]
+        except InvalidCursor as e:
+            ns.abort(400, str(e))
 
-        return result
+        headers = {}
+        if before:
+            headers["X-Before-Cursor"] = before
+        if after:
+            headers["X-After-Cursor"] = after
+        return [chat.serialize(m) for m in messages], 200, headers
@@ -0,0 +1,64 @@
+"""
+pagination.py: Query-string handling for paginated collection endpoints.
+
+Collections accept `limit` (page size) and `cursor` (the `next` cursor of
+the previous page). The body stays a plain JSON list; the next page is
+advertised in the response headers:
+
+    X-Next-Cursor: <cursor>
+    Link: <https://host/api/v1/places/?limit=50&cursor=<cursor>>; rel="next"
+
+Both headers are absent on the last page.
+"""
+
+from urllib.parse import urlencode
+
+from flask import abort, current_app, request
+
+from app.persistence import InvalidCursor
+
+PAGE_PARAMS = {
+    "limit": "Page size (default PAGE_SIZE, at most MAX_PAGE_SIZE)",
+    "cursor": "Cursor from the X-Next-Cursor header of the previous page",
+}
+
+
+def page_args():
+    """
+    Read `limit` and `cursor` from the query string.
+
+    Returns:
+        tuple[int, str | None]: Validated page size and cursor.
+    """
+    config = current_app.config
+    limit = request.args.get("limit", config["PAGE_SIZE"], type=int)
+    if limit < 1:
+        abort(400, "'limit' must be a positive integer")
+    return min(limit, config["MAX_PAGE_SIZE"]), request.args.get("cursor") or None
+
+
+def page_headers(next_cursor):
+    """Response headers pointing at the next page (empty on the last one)."""
+    if not next_cursor:
+        return {}
+    args = request.args.to_dict()
+    args["cursor"] = next_cursor
+    return {
+        "X-Next-Cursor": next_cursor,
+        "Link": f'<{request.base_url}?{urlencode(args)}>; rel="next"',
+    }
+
+
+def fetch_page(paginate, *args, **kwargs):
+    """
+    Call a facade `paginate_*` method with the request's page arguments.
+
+    Returns:
+        tuple[list, dict]: The page items and the response headers.
+    """
+    limit, cursor = page_args()
+    try:
+        page = paginate(*args, limit=limit, cursor=cursor, **kwargs)
+    except InvalidCursor as e:
+        abort(400, str(e))
+    return page.items, page_headers(page.next_cursor)
@@ -1,8 +1,16 @@
+from datetime import date, datetime, timedelta
+
 from flask_restx import Namespace, Resource, fields, marshal
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from sqlalchemy.orm import selectinload
 from app.services.facade import facade
-from flask import abort, request
+from app.services.availability import availability
+from app.persistence.pagination import keyset_slice
+from app.api.v1.pagination import PAGE_PARAMS, fetch_page
+from app.utils.response_cache import response_cache
+from flask import abort, current_app, request
 from app.models.amenity import Amenity
+from app.models.place import Place
 from app.api.v1.bookings import booking_output
 
 ns = Namespace(
@@ -21,7 +29,7 @@ place_model = ns.model(
         "price": fields.Float(required=True, description="Price per night"),
         "latitude": fields.Float(description="Latitude of the place"),
         "longitude": fields.Float(description="Longitude of the place"),
-        "host_id": fields.String(attribute="host.id", description="Owner's UUID"),
+        "host_id": fields.String(description="Owner's UUID"),
         "description": fields.String(description="Textual description"),
         "amenity_ids": fields.List(fields.String, description="List of amenity UUIDs"),
     },
@@ -52,31 +60,129 @@ amenity_model = ns.model(
     },
 )
 
+booked_range_model = ns.model(
+    "BookedRange",
+    {
+        "check_in": fields.Date(description="First booked night"),
+        "check_out": fields.Date(description="Day after the last booked night"),
+    },
+)
+
+availability_model = ns.model(
+    "PlaceAvailability",
+    {
+        "place_id": fields.String(description="Place UUID"),
+        "start": fields.Date(description="First night of the queried range"),
+        "end": fields.Date(description="End of the queried range (exclusive)"),
+        "available": fields.Boolean(description="True if every night is free"),
+        "free_nights": fields.Integer(description="Number of free nights"),
+        "booked": fields.List(
+            fields.Nested(booked_range_model), description="Booked stretches"
+        ),
+    },
+)
+
+place_rating_model = ns.model(
+    "PlaceRating",
+    {
+        "place_id": fields.String(description="Place UUID"),
+        "average_rating": fields.Float(description="Mean of the review ratings"),
+        "review_count": fields.Integer(description="Number of rated reviews"),
+        "histogram": fields.Raw(
+            description="Number of reviews per star rating, keyed '1' to '5'"
+        ),
+        "bayesian_rating": fields.Float(
+            description="Average smoothed towards the site-wide mean, "
+            "weighted by RATING_PRIOR_WEIGHT reviews"
+        ),
+    },
+)
+
+# Loader options of endpoints reading a place's amenity list
+WITH_AMENITIES = (selectinload(Place.amenities),)
+
+# Longest range accepted by date-based queries
+MAX_RANGE_DAYS = 3 * 366
+
+
+def parse_date_range(start_arg, end_arg, default_days=None):
+    """
+    Read a [start, end) night range from the query string.
+
+    Returns:
+        tuple[date, date] | None: None if neither bound is given and there
+        is no default length.
+    """
+    start_str, end_str = request.args.get(start_arg), request.args.get(end_arg)
+    if not start_str and not end_str and default_days is None:
+        return None
+    try:
+        start = (
+            datetime.strptime(start_str, "%Y-%m-%d").date()
+            if start_str
+            else date.today()
+        )
+        end = (
+            datetime.strptime(end_str, "%Y-%m-%d").date()
+            if end_str
+            else start + timedelta(days=default_days or 1)
+        )
+    except ValueError:
+        ns.abort(400, f"'{start_arg}' and '{end_arg}' must be YYYY-MM-DD dates")
+    if end <= start:
+        ns.abort(400, f"'{end_arg}' must be after '{start_arg}'")
+    if (end - start).days > MAX_RANGE_DAYS:
+        ns.abort(400, f"Date range cannot exceed {MAX_RANGE_DAYS} days")
+    return start, end
+
+
+def place_list_tags():
+    """Listings filtered on a stay also depend on bookings."""
+    if request.args.get("check_in") or request.args.get("check_out"):
+        return ("places", "bookings")
+    return ("places",)
+
 
 @ns.route("/")
 class PlaceList(Resource):
     @ns.doc(
         "list_places",
-        description="Retrieve all places, or places near lat/lon if provided (Public)",
+        description="Retrieve places one page at a time, oldest first, or places within `radius` km "
+        "of lat/lon if provided, nearest first. With check_in/check_out, only places free for the "
+        "whole stay are returned; outside radius searches such pages may hold fewer than `limit` "
+        "places (Public)",
         security=[],
+        params={
+            **PAGE_PARAMS,
+            "lat": "Latitude of the search center",
+            "lon": "Longitude of the search center",
+            "radius": "Search radius in kilometers (default 5)",
+            "check_in": "First night of the stay (YYYY-MM-DD)",
+            "check_out": "Departure day (YYYY-MM-DD, default check_in + 1)",
+        },
     )
+    @response_cache.cached(tags=place_list_tags)
     @ns.marshal_list_with(place_model)
     def get(self):
         lat = request.args.get("lat", type=float)
         lon = request.args.get("lon", type=float)
+        radius_km = request.args.get("radius", 5, type=float)
+        stay = parse_date_range("check_in", "check_out")
         if lat is not None and lon is not None:
-            # Replace with a real radius filter if you want, but this works as a demo
-            places = [
-                p
-                for p in facade.place.list()
-                if p.latitude is not None
-                and p.longitude is not None
-                and abs(p.latitude - lat) < 0.05
-                and abs(p.longitude - lon) < 0.05
-            ]
-        else:
-            places = facade.place.list()
-        return places
+            pairs = facade.places_with_distances(lat, lon, radius_km)
+            if stay:
+                free = availability.available_places([p.id for p, _ in pairs], *stay)
+                pairs = [pair for pair in pairs if pair[0].id in free]
+            pairs, headers = fetch_page(
+                keyset_slice, pairs, key=lambda pair: (pair[1], pair[0].id)
+            )
+            return [p for p, _ in pairs], 200, headers
+
+        places, headers = fetch_page(facade.paginate_places)
+        if stay:
+            free = availability.available_places([p.id for p in places], *stay)
+            places = [p for p in places if p.id in free]
+        return places, 200, headers
 
 
 @ns.route("/<string:place_id>")
@@ -85,12 +191,13 @@ class PlaceDetail(Resource):
     @ns.doc(
         "get_place", description="Fetch a single place by its ID (Public)", security=[]
     )
+    @response_cache.cached(tags=lambda place_id: (f"place:{place_id}",))
     @ns.marshal_with(place_model)
     def get(self, place_id):
         """
         Retrieve detailed information for the specified place UUID. Public access.
         """
-        place = facade.get_place(place_id)
+        place = facade.get_place(place_id, WITH_AMENITIES)
         if not place:
             ns.abort(404, f"Place {place_id} not found")
         place.amenity_ids = [a.id for a in getattr(place, "amenities", [])]
@@ -113,10 +220,10 @@ class PlaceDetail(Resource):
         """
         claims = get_jwt()
         caller_id = get_jwt_identity()
-        place = facade.get_place(place_id)
+        place = facade.get_place(place_id, WITH_AMENITIES)
         if not place:
             return {"error": f"Place {place_id} not found"}, 404
-        if caller_id != place.host.id and not claims.get("is_admin"):
+        if caller_id != place.host_id and not claims.get("is_admin"):
             return {"error": "Unauthorized action"}, 403
 
         payload = dict(ns.payload)
@@ -169,7 +276,7 @@ class PlaceDetail(Resource):
         place = facade.get_place(place_id)
         if not place:
             return {"error": f"Place {place_id} not found"}, 404
-        if caller_id != place.host.id and not claims.get("is_admin"):
+        if caller_id != place.host_id and not claims.get("is_admin"):
             return {"error": "Unauthorized action"}, 403
         facade.delete_place(place_id)
         return "", 204
@@ -180,30 +287,26 @@ class PlaceDetail(Resource):
 class PlaceRating(Resource):
     @ns.doc(
         "get_place_rating",
-        description="Return the average review rating for a place (Public)",
+        description="Return the average review rating of a place, the number of rated "
+        "reviews, their 1-5 star histogram and a Bayesian-smoothed score (Public)",
         security=[],
     )
+    # The Bayesian score leans on the site-wide mean, hence "ratings"
+    @response_cache.cached(tags=lambda place_id: (f"place:{place_id}", "ratings"))
+    @ns.marshal_with(place_rating_model)
     def get(self, place_id):
         """
-        Calculate and return the average rating score for the specified place UUID.
+        Return the rating summary of the specified place UUID, read from its
+        maintained aggregates.
         """
-        place = facade.get_place(place_id)
-        if not place:
-            return {"error": f"Place {place_id} not found"}, 404
-        reviews = facade.list_reviews()
-        ratings = [
-            float(r.rating)
-            for r in reviews
-            if getattr(r, "booking", None)
-            and r.booking.place.id == place_id
-            and isinstance(r.rating, (int, float, str))
-        ]
-        if not ratings:
-            return {"error": f"No ratings found for place {place_id}"}, 404
-        return {
-            "place_id": place_id,
-            "average_rating": sum(ratings) / len(ratings),
-        }, 200
+        if not facade.get_place(place_id):
+            ns.abort(404, f"Place {place_id} not found")
+        summary = facade.get_place_rating(
+            place_id, current_app.config["RATING_PRIOR_WEIGHT"]
+        )
+        if summary is None:
+            ns.abort(404, f"No ratings found for place {place_id}")
+        return summary, 200
 
 
 @ns.route("/<string:place_id>/bookings")
@@ -212,8 +315,9 @@ class PlaceBookings(Resource):
     @jwt_required(optional=True)
     @ns.doc(
         "list_place_bookings",
-        description="List all bookings for a place (Owners, Admins or Public?)",
+        description="List bookings for a place, one page at a time (Owners, Admins or Public?)",
         security="BearerAuth",
+        params=PAGE_PARAMS,
     )
     @ns.marshal_list_with(booking_output)
     def get(self, place_id):
@@ -227,11 +331,43 @@ class PlaceBookings(Resource):
         # Optional: enforce owner/admin if you don’t want these public
         caller = get_jwt_identity()
         claims = get_jwt()
-        if place.host.id != caller and not claims.get("is_admin"):
+        if place.host_id != caller and not claims.get("is_admin"):
             ns.abort(403, "Unauthorized action")
 
-        bookings = facade.list_bookings_for_place(place_id)
-        return bookings, 200
+        bookings, headers = fetch_page(facade.paginate_bookings, place_id=place_id)
+        return bookings, 200, headers
+
+
+@ns.route("/<string:place_id>/availability")
+@ns.response(404, "Place not found")
+class PlaceAvailability(Resource):
+    @ns.doc(
+        "get_place_availability",
+        description="Booked and free nights of a place over a date range, "
+        "by default the next 365 nights (Public)",
+        security=[],
+        params={
+            "start": "First night (YYYY-MM-DD, default today)",
+            "end": "End of the range, exclusive (YYYY-MM-DD, default start + 365)",
+        },
+    )
+    @ns.marshal_with(availability_model)
+    def get(self, place_id):
+        if not facade.get_place(place_id):
+            ns.abort(404, f"Place {place_id} not found")
+        start, end = parse_date_range("start", "end", default_days=365)
+
+        calendar = availability.calendar(place_id)
+        booked = calendar.booked_ranges(start, end)
+        taken = sum((b - a).days for a, b in booked)
+        return {
+            "place_id": place_id,
+            "start": start,
+            "end": end,
+            "available": not booked,
+            "free_nights": (end - start).days - taken,
+            "booked": [{"check_in": a, "check_out": b} for a, b in booked],
+        }, 200
 
 
 @ns.route("/<string:place_id>/amenities")
@@ -240,7 +376,7 @@ class PlaceAmenitiesList(Resource):
     @ns.doc("list_place_amenities")
     @ns.marshal_list_with(amenity_model)
     def get(self, place_id):
-        place = facade.get_place(place_id)
+        place = facade.get_place(place_id, WITH_AMENITIES)
         if not place:
             abort(404)
         if hasattr(place, "amenities"):
@@ -256,7 +392,7 @@ class PlaceAmenityLink(Resource):
     @ns.doc("link_place_amenity")
     @ns.marshal_with(amenity_model, code=201)
     def post(self, place_id, amenity_id):
-        place = facade.get_place(place_id)
+        place = facade.get_place(place_id, WITH_AMENITIES)
         amenity = facade.get_amenity(amenity_id)
         if not place or not amenity:
             abort(404)
@@ -267,7 +403,7 @@ class PlaceAmenityLink(Resource):
 
     @ns.doc("unlink_place_amenity")
     def delete(self, place_id, amenity_id):
-        place = facade.get_place(place_id)
+        place = facade.get_place(place_id, WITH_AMENITIES)
         amenity = facade.get_amenity(amenity_id)
         if not place or not amenity or amenity not in getattr(place, "amenities", []):
             abort(404)
@@ -2,6 +2,7 @@ from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services import facade
+from app.api.v1.pagination import PAGE_PARAMS, fetch_page
 
 ns = Namespace("reviews", description="Review management", security="BearerAuth")
 
@@ -34,8 +35,9 @@ review_input = ns.model(
 class ReviewList(Resource):
     @ns.doc(
         "list_reviews",
-        description="Retrieve all reviews (Authenticated users)",
+        description="Retrieve reviews, one page at a time (Authenticated users)",
         security="BearerAuth",
+        params=PAGE_PARAMS,
     )
     @jwt_required()
     @ns.marshal_list_with(review_output)
@@ -43,7 +45,7 @@ class ReviewList(Resource):
         """
         Retrieve a list of all reviews. Only authenticated users may list reviews.
         """
-        reviews = facade.list_reviews()
+        reviews, headers = fetch_page(facade.paginate_reviews)
         result = []
         for r in reviews:
             try:
@@ -58,7 +60,7 @@ class ReviewList(Resource):
                     "rating": rating_val,
                 }
             )
-        return result, 200
+        return result, 200, headers
 
     @ns.doc(
         "create_review",
@@ -5,6 +5,8 @@ from .models import EMAIL_RE, user_model, user_create, user_update
 from flask import request
 from .ns import ns
 from app.api.v1.bookings import booking_output
+from app.api.v1.pagination import PAGE_PARAMS, fetch_page
+from app.models.host import Host
 
 # ----------------------- data models ----------------------- #
 
@@ -21,8 +23,9 @@ class UserList(Resource):
     @jwt_required()
     @ns.doc(
         "list_users",
-        description="List all user accounts (Admin only)",
+        description="List user accounts, one page at a time (Admin only)",
         security="BearerAuth",
+        params=PAGE_PARAMS,
     )
     @ns.response(403, "Unauthorized action")
     @ns.marshal_list_with(user_model)
@@ -30,17 +33,16 @@ class UserList(Resource):
         claims = get_jwt()
         if not claims.get("is_admin"):
             ns.abort(403, "Unauthorized action")
-        user_list = facade.list_users()
-        host_ids = {host.id for host in facade.list_hosts()}  # Precompute host IDs
+        user_list, headers = fetch_page(facade.paginate_users)
 
         # Inject is_host flag into each user
         enriched_users = []
         for user in user_list:
             user_dict = marshal(user, user_model)
-            user_dict["is_host"] = user.id in host_ids
+            user_dict["is_host"] = isinstance(user, Host)
             enriched_users.append(user_dict)
 
-        return enriched_users, 200
+        return enriched_users, 200, headers
 
     @jwt_required(optional=True)
     @ns.doc(
@@ -66,7 +68,7 @@ class UserList(Resource):
             ns.abort(400, "First and last name required")
         if not EMAIL_RE.match(email):
             ns.abort(400, "Invalid email address")
-        if any(u.email.lower() == email for u in facade.list_users()):
+        if facade.get_user_by_email(email):
             ns.abort(400, "Email already in use")
         if len(pwd) < 8:
             ns.abort(400, "Password must be at least 8 characters")
@@ -95,13 +97,14 @@ class UserResource(Resource):
     )
     @ns.marshal_with(user_model)
     def get(self, user_id):
-        user = facade.get_user(user_id)
-        if not user:
-            ns.abort(404, f"User {user_id} not found")
+        # From the token alone: no query to turn a caller away
         claims = get_jwt()
         caller = get_jwt_identity()
         if caller != user_id and not claims.get("is_admin"):
             ns.abort(403, "Unauthorized action")
+        user = facade.get_user(user_id)
+        if not user:
+            ns.abort(404, f"User {user_id} not found")
         return user, 200
 
     @jwt_required()
@@ -112,13 +115,14 @@ class UserResource(Resource):
     )
     @ns.expect(user_update, validate=True)
     def put(self, user_id):
-        user = facade.get_user(user_id)
-        if not user:
-            ns.abort(404, f"User {user_id} not found")
+        # From the token alone: no query to turn a caller away
         claims = get_jwt()
         caller = get_jwt_identity()
         if caller != user_id and not claims.get("is_admin"):
             ns.abort(403, "Unauthorized action")
+        user = facade.get_user(user_id)
+        if not user:
+            ns.abort(404, f"User {user_id} not found")
 
         data = ns.payload or {}
         if "email" in data or "password" in data:
@@ -145,13 +149,14 @@ class UserResource(Resource):
     )
     @ns.response(204, "User deleted")
     def delete(self, user_id):
-        user = facade.get_user(user_id)
-        if not user:
-            ns.abort(404, f"User {user_id} not found")
+        # From the token alone: no query to turn a caller away
         claims = get_jwt()
         caller = get_jwt_identity()
         if caller != user_id and not claims.get("is_admin"):
             ns.abort(403, "Unauthorized action")
+        user = facade.get_user(user_id)
+        if not user:
+            ns.abort(404, f"User {user_id} not found")
         facade.delete_user(user_id)
         return "", 204
 
@@ -171,17 +176,17 @@ class UserBookings(Resource):
         """
         Retrieve all bookings for the given user.
         """
-        # 1) fetch user, abort if missing
-        user = facade.get_user(user_id)
-        if not user:
-            ns.abort(404, f"User {user_id} not found")
-
-        # 2) enforce self-or-admin
+        # 1) enforce self-or-admin, from the token's claims
         caller = get_jwt_identity()
         claims = get_jwt()
         if caller != user_id and not claims.get("is_admin"):
             ns.abort(403, "Unauthorized action")
 
+        # 2) fetch user, abort if missing
+        user = facade.get_user(user_id)
+        if not user:
+            ns.abort(404, f"User {user_id} not found")
+
         # 3) list bookings via facade
         bookings = facade.list_bookings_for_user(user_id)
         # 4) return marshaled
@@ -1,4 +1,14 @@
+import os
+
 from flask_sqlalchemy import SQLAlchemy
 
 # single shared DB instance
 db = SQLAlchemy()
+
+# Loading strategy of the collection relationships of places and amenities.
+# They load on first access by default; code walking them over many rows
+# asks for `selectinload`/`joinedload` in its query (see the facade's
+# loader options). The test suite sets HBNB_LAZY_LOADING=raise_on_sql, so a
+# collection walked without such an option (an N+1 query loop in the
+# making) raises instead of silently issuing one query per row.
+LAZY_LOADING = os.getenv("HBNB_LAZY_LOADING", "select")
@@ -3,4 +3,9 @@ from .amenity import Amenity
 from .place import Place
 from .user import User
 from .booking import Booking
-from .message import Message
\ No newline at end of file
+from .message import Message
+from .place_rating_stats import PlaceRatingStats
+from .host_stats import HostStats
+from .outbox_job import OutboxJob
+from .conversation import Conversation
+from .photo_blob import PhotoBlob
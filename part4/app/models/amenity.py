@@ -1,5 +1,5 @@
 from app.models.base import BaseModel
-from app.database import db
+from app.database import db, LAZY_LOADING
 from app.models.place_amenities import place_amenities
 
 
@@ -11,5 +11,5 @@ class Amenity(BaseModel):
 
     # --- Many-to-Many with Place ---
     places = db.relationship(
-        "Place", secondary=place_amenities, lazy="subquery", back_populates="amenities"
+        "Place", secondary=place_amenities, lazy=LAZY_LOADING, back_populates="amenities"
     )
@@ -5,6 +5,9 @@ from datetime import datetime
 class Booking(db.Model):
     __tablename__ = "bookings"
 
+    # Statuses that no longer hold the dates
+    INACTIVE_STATUSES = ("declined", "cancelled")
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
     place_id = db.Column(db.String(36), db.ForeignKey("places.id"), nullable=False)
@@ -13,7 +16,7 @@ class Booking(db.Model):
     end_date = db.Column(db.DateTime, nullable=False)
     total_price = db.Column(db.Float, nullable=False)
     guest_count = db.Column(db.Integer, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
@@ -23,6 +26,17 @@ class Booking(db.Model):
     place = db.relationship("Place", back_populates="bookings")
     host = db.relationship("Host", back_populates="bookings", foreign_keys=[host_id])
 
+    # Serves the availability check: one place, active statuses, date range
+    __table_args__ = (
+        db.Index(
+            "ix_bookings_place_availability",
+            "place_id",
+            "status",
+            "start_date",
+            "end_date",
+        ),
+    )
+
     def __init__(self, user_id, place_id, host_id, start_date, end_date, total_price, guest_count, status="pending"):
         self.user_id = user_id
         self.place_id = place_id
@@ -0,0 +1,57 @@
+from app.database import db
+
+
+class Conversation(db.Model):
+    """
+    One row per pair of users who exchanged messages, maintained as
+    messages are sent (see app.services.conversations).
+
+    The pair is stored in a fixed order, user_a_id < user_b_id, so it has
+    a single row whoever wrote first; unread counts are kept per side.
+    """
+
+    __tablename__ = "conversations"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_a_id = db.Column(
+        db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    user_b_id = db.Column(
+        db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+
+    # --- Newest message; not a FK so message deletes need no ordering ---
+    last_message_id = db.Column(db.Integer, nullable=True)
+    last_sender_id = db.Column(db.String(36), nullable=True)
+    last_preview = db.Column(db.String(200), nullable=True)
+    last_timestamp = db.Column(db.DateTime, nullable=False)
+
+    # Messages not read yet by user_a / by user_b
+    unread_a = db.Column(db.Integer, nullable=False, default=0)
+    unread_b = db.Column(db.Integer, nullable=False, default=0)
+
+    user_a = db.relationship("User", foreign_keys=[user_a_id])
+    user_b = db.relationship("User", foreign_keys=[user_b_id])
+
+    # The inbox reads a user's conversations from either side, newest
+    # first: one index range per side, already in recency order
+    __table_args__ = (
+        db.UniqueConstraint("user_a_id", "user_b_id", name="uq_conversations_pair"),
+        db.Index("ix_conversations_a_recent", "user_a_id", "last_timestamp"),
+        db.Index("ix_conversations_b_recent", "user_b_id", "last_timestamp"),
+    )
+
+    PREVIEW_LENGTH = 200
+
+    @staticmethod
+    def pair(user_id, other_id):
+        """The (user_a_id, user_b_id) key of a conversation."""
+        return (user_id, other_id) if user_id <= other_id else (other_id, user_id)
+
+    def other(self, user_id):
+        """The participant that is not `user_id`."""
+        return self.user_b if user_id == self.user_a_id else self.user_a
+
+    def unread_for(self, user_id):
+        """Messages `user_id` has not read yet."""
+        return self.unread_a if user_id == self.user_a_id else self.unread_b
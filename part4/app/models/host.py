@@ -1,6 +1,5 @@
 from app.models.user import User
-from app.database import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.database import db, LAZY_LOADING
 
 
 class Host(User):
@@ -18,20 +17,11 @@ class Host(User):
     places = db.relationship(
         "Place",
         back_populates="host",  # Assuming "Place" model has a relationship defined with the Host model
-        lazy=True,  # Load the related places lazily (load them only when requested)
+        lazy=LAZY_LOADING,  # Load the related places lazily (load them only when requested)
         cascade="all, delete-orphan",  # Automatically delete orphaned places
         foreign_keys="Place.host_id",  # Ensure that the foreign key to the host is used
     )
 
-    # Password utilities
-    def set_password(self, password):
-        """Set password for the host."""
-        self.password = generate_password_hash(password)
-
-    def check_password(self, password):
-        """Check if the given password matches the stored hashed password."""
-        return check_password_hash(self.password, password)
-
     # Serialization method to convert object into a dictionary for easy use in APIs or responses
     def to_dict(self):
         """Convert the Host object into a dictionary."""
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from app.database import db
+
+
+class HostStats(db.Model):
+    """
+    Per-host portfolio statistics (see app.services.host_stats).
+
+    Rows are only written when HOST_STATS_MATERIALIZED is set; otherwise
+    the service returns unsaved instances computed on the fly.
+    """
+
+    __tablename__ = "host_stats"
+
+    host_id = db.Column(db.String(36), db.ForeignKey("hosts.id"), primary_key=True)
+
+    # --- Listings ---
+    listing_count = db.Column(db.Integer, nullable=False, default=0)
+    total_views = db.Column(db.Integer, nullable=False, default=0)
+
+    # --- Reviews of the host's places that carry a rating ---
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    average_rating = db.Column(db.Float, nullable=False, default=0.0)
+
+    # --- Nights booked over the trailing occupancy window ---
+    booked_nights = db.Column(db.Integer, nullable=False, default=0)
+    occupancy = db.Column(db.Float, nullable=False, default=0.0)
+
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "host_id": self.host_id,
+            "host_rating": round(self.average_rating, 2),
+            "review_count": self.review_count,
+            "listing_count": self.listing_count,
+            "total_views": self.total_views,
+            "booked_nights": self.booked_nights,
+            "occupancy": round(self.occupancy, 4),
+        }
@@ -15,3 +15,8 @@ class Message(db.Model):
     sender = db.relationship("User", foreign_keys=[sender_id], backref="sent_messages", single_parent=True)
     receiver = db.relationship("User", foreign_keys=[receiver_id], backref="received_messages")
     place = db.relationship("Place", backref="messages")
+
+    # One index range scan per direction of a conversation, in time order
+    __table_args__ = (
+        db.Index("ix_messages_conversation", "sender_id", "receiver_id", "timestamp"),
+    )
@@ -14,6 +14,18 @@ class Notification(db.Model):
     status = db.Column(db.String(50), default="unread")  # 'unread' or 'read'
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # A user's notifications, newest first (keyset pagination); unread
+    # counts and bulk status updates on one user's rows
+    __table_args__ = (
+        db.Index("ix_notifications_recipient_timestamp", "recipient_id", "timestamp"),
+        db.Index(
+            "ix_notifications_recipient_status_timestamp",
+            "recipient_id",
+            "status",
+            "timestamp",
+        ),
+    )
+
     def __init__(
         self, recipient_id, recipient_type, message, status="unread", timestamp=None
     ):
@@ -22,3 +34,26 @@ class Notification(db.Model):
         self.message = message
         self.status = status
         self.timestamp = timestamp or datetime.utcnow()
+
+
+class NotificationArchive(db.Model):
+    """
+    Read notifications moved out of `notifications` once past the
+    retention age (see app.services.notification_retention).
+    """
+
+    __tablename__ = "notifications_archive"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # notifications.id, which SQLite may hand out again once pruned
+    notification_id = db.Column(db.Integer, nullable=False, index=True)
+    recipient_id = db.Column(db.String(36), nullable=False)
+    recipient_type = db.Column(db.String(20), nullable=False)
+    message = db.Column(db.String(500), nullable=False)
+    status = db.Column(db.String(50))
+    timestamp = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_notifications_archive_recipient_timestamp", "recipient_id", "timestamp"),
+    )
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from app.database import db
+
+
+class OutboxJob(db.Model):
+    """
+    A unit of background work (e.g. an email), written in the same
+    transaction as the change that caused it and run later by the outbox
+    workers (see app.services.outbox).
+    """
+
+    __tablename__ = "outbox_jobs"
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+
+    # Enqueueing twice with the same key yields a single job
+    idempotency_key = db.Column(db.String(255), nullable=True, unique=True)
+
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+
+    # Claim held by a worker; a job still "running" past locked_until was
+    # abandoned by a dead worker and is claimed again
+    claimed_by = db.Column(db.String(36), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    # Serves the workers' "due jobs" scan
+    __table_args__ = (
+        db.Index("ix_outbox_jobs_due", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<OutboxJob {self.id} {self.kind} {self.status}>"
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from app.database import db
+
+
+class PhotoBlob(db.Model):
+    """
+    One stored photo file, named by the SHA-256 of its content.
+
+    Identical uploads share a blob: every `PlacePhoto` showing it points
+    here, and its variants are rendered once (see
+    app.services.photo_pipeline). The photos keep a copy of `url`,
+    `width`, `height` and `variants` so pages need no join.
+    """
+
+    __tablename__ = "photo_blobs"
+
+    # Hex SHA-256 of the uploaded bytes
+    id = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(32), nullable=False)
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+
+    # The upload until its variants are rendered, then the full-size JPEG
+    url = db.Column(db.String(256), nullable=False)
+    variants = db.Column(db.JSON, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.now)
@@ -1,5 +1,7 @@
+from sqlalchemy import event
 from app.models.base import BaseModel
-from app.database import db
+from app.database import db, LAZY_LOADING
+from app.utils.geo import encode_geohash
 from .amenity import place_amenities
 import uuid
 
@@ -16,26 +18,40 @@ class Place(BaseModel):
     address = db.Column(db.String(128), nullable=True)
     city = db.Column(db.String(64), nullable=True)
 
+    # Geohash of (latitude, longitude), kept in sync on insert/update so
+    # radius searches can prefilter candidates with an index range scan
+    geohash = db.Column(db.String(12), nullable=True, index=True)
+
     # Foreign keys
     user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=True)
-    host_id = db.Column(db.String(36), db.ForeignKey("hosts.id"), nullable=True)
+    # Indexed for per-host listings and the grouped host statistics
+    host_id = db.Column(db.String(36), db.ForeignKey("hosts.id"), nullable=True, index=True)
 
     # Relationships
     user = db.relationship("User", backref="owned_places", foreign_keys=[user_id])
     host = db.relationship("Host", back_populates="places", foreign_keys=[host_id])
+    # Collections load on access; list queries eager-load what they render
     bookings = db.relationship(
-        "Booking", back_populates="place", cascade="all, delete-orphan", lazy=True
+        "Booking", back_populates="place", cascade="all, delete-orphan", lazy=LAZY_LOADING
     )
     reviews = db.relationship(
-        "Review", back_populates="place", cascade="all, delete-orphan"
+        "Review", back_populates="place", cascade="all, delete-orphan", lazy=LAZY_LOADING
     )
 
     amenities = db.relationship(
-        "Amenity", secondary=place_amenities, lazy="subquery", back_populates="places"
+        "Amenity", secondary=place_amenities, lazy=LAZY_LOADING, back_populates="places"
     )
 
     photos = db.relationship(
-        "PlacePhoto", back_populates="place", cascade="all, delete-orphan", lazy=True
+        "PlacePhoto", back_populates="place", cascade="all, delete-orphan", lazy=LAZY_LOADING
+    )
+
+    # Review aggregates (count, average, top review), one row per rated place
+    rating_stats = db.relationship(
+        "PlaceRatingStats",
+        back_populates="place",
+        uselist=False,
+        cascade="all, delete-orphan",
     )
 
     # New field for counting views
@@ -55,15 +71,34 @@ class Place(BaseModel):
             db.session.delete(photo_to_remove)
             db.session.commit()
 
-    def increment_views(self, user=None):
+    def increment_views(self, user=None, viewer_key=None):
+        """
+        Count a page view, buffered and flushed in batches by the view counter.
+
+        Views by the place's host are ignored; repeat views by the same
+        viewer within the dedup window are counted once.
+        """
+        from app.services.view_counter import view_counter
+
         if user and user.id == self.host_id:
-            print("[DEBUG] Skipping increment: user is the host")
-            return
+            return False
 
-        self.views = self.views + 1 if self.views else 1
-        db.session.commit()
-        print(f"[DEBUG] View incremented to {self.views}")
+        return view_counter.record(self.id, viewer_key)
+
+    @property
+    def average_rating(self):
+        return self.rating_stats.average_rating if self.rating_stats else 0
+
+    @property
+    def top_review(self):
+        return self.rating_stats.top_review if self.rating_stats else None
 
+    def update_geohash(self):
+        """Recompute the geohash column from the current coordinates."""
+        if self.latitude and self.longitude:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = None
 
     # Serialize the Place object, including photos
     def to_dict(self):
@@ -73,8 +108,14 @@ class Place(BaseModel):
             "price": self.price,
             "latitude": self.latitude,
             "longitude": self.longitude,
-            "photos": [photo.url for photo in self.photos],  # List of photo URLs
+            "photos": [photo.variant("card") for photo in self.photos],  # Card-sized photos
             "address": self.address,
             "city": self.city,
             "views": self.views  # Include views in the serialized data
         }
+
+
+@event.listens_for(Place, "before_insert")
+@event.listens_for(Place, "before_update")
+def _sync_geohash(mapper, connection, target):
+    target.update_geohash()
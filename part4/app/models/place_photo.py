@@ -1,5 +1,5 @@
 from app.models.base import BaseModel
-from app.database import db
+from app.database import db, LAZY_LOADING
 
 class PlacePhoto(BaseModel):
     __tablename__ = "place_photos"
@@ -10,5 +10,25 @@ class PlacePhoto(BaseModel):
     # Foreign key linking this photo to a specific place
     place_id = db.Column(db.String(36), db.ForeignKey("places.id"), nullable=False)
 
+    # Stored file shown (shared by identical uploads); None for photos
+    # uploaded before blobs existed
+    blob_id = db.Column(
+        db.String(64), db.ForeignKey("photo_blobs.id"), nullable=True, index=True
+    )
+
+    # Size of the upload, and its resized copies once rendered:
+    # {"thumb": {"width", "height", "webp", "jpeg"}, "card": ..., "full": ...}
+    # (see app.services.photo_pipeline)
+    width = db.Column(db.Integer, nullable=True)
+    height = db.Column(db.Integer, nullable=True)
+    variants = db.Column(db.JSON, nullable=True)
+
     # Establish a relationship to the 'Place' model
     place = db.relationship("Place", back_populates="photos")
+    blob = db.relationship("PhotoBlob", lazy=LAZY_LOADING)
+
+    def variant(self, size):
+        """Path of the JPEG variant `size` (the upload until rendered)."""
+        if self.variants and size in self.variants:
+            return self.variants[size]["jpeg"]
+        return self.url
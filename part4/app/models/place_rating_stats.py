@@ -0,0 +1,54 @@
+from app.database import db
+
+
+class PlaceRatingStats(db.Model):
+    """
+    Per-place review aggregates, maintained incrementally as reviews are
+    created, edited or deleted (see app.services.ratings).
+    """
+
+    __tablename__ = "place_rating_stats"
+
+    place_id = db.Column(db.String(36), db.ForeignKey("places.id"), primary_key=True)
+
+    # --- Aggregates over reviews that carry a rating ---
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    average_rating = db.Column(db.Float, nullable=False, default=0.0, index=True)
+
+    # Reviews per star rating (ratings outside 1-5 only count in the totals)
+    rating_1_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_2_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_3_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_4_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_5_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Highest rated review (newest wins ties); not a FK so review deletes
+    # never have to be ordered against this row
+    top_review_id = db.Column(db.String(36), nullable=True)
+    top_rating = db.Column(db.Integer, nullable=True)
+
+    # --- Relationships ---
+    place = db.relationship("Place", back_populates="rating_stats")
+    top_review = db.relationship(
+        "Review",
+        primaryjoin="foreign(PlaceRatingStats.top_review_id) == Review.id",
+        viewonly=True,
+    )
+
+    STARS = range(1, 6)
+
+    @property
+    def histogram(self):
+        """Number of reviews per star rating, keyed "1" to "5"."""
+        return {str(i): getattr(self, f"rating_{i}_count") or 0 for i in self.STARS}
+
+    def bayesian_rating(self, prior_mean, prior_weight):
+        """
+        Average rating smoothed towards `prior_mean`, as if the place had
+        `prior_weight` extra reviews rated `prior_mean`. Places with few
+        reviews stay close to the prior; many reviews outweigh it.
+        """
+        return (prior_weight * prior_mean + self.rating_sum) / (
+            prior_weight + self.review_count
+        )
@@ -1,9 +1,15 @@
 from flask_login import UserMixin
 from app.models.base import BaseModel
 from app.database import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import validates
 import uuid  # Import UUID module
 
+
+def normalize_email(email):
+    """Canonical form of an email address: stripped and lowercased."""
+    return email.strip().lower() if email else email
+
+
 class User(UserMixin, BaseModel):
     __tablename__ = "users"
 
@@ -11,26 +17,41 @@ class User(UserMixin, BaseModel):
     first_name = db.Column(db.String(128), nullable=False)
     last_name = db.Column(db.String(128), nullable=False)
     email = db.Column(db.String(128), unique=True, nullable=False)
-    password = db.Column(db.String(128), nullable=False)
+    password = db.Column(db.String(256), nullable=False)  # see app.services.passwords
     pseudo = db.Column(db.String(128), unique=True, nullable=True)
     is_admin = db.Column(db.Boolean, default=False)
     bio = db.Column(db.Text, nullable=True)
     profile_pic = db.Column(db.String(256), nullable=True)
+    # Bumped when API tokens issued before must stop working (app.services.tokens)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     type = db.Column(db.String(50))  # 'user' or 'host'
     __mapper_args__ = {"polymorphic_identity": "user", "polymorphic_on": type}
 
+    # Case-insensitive uniqueness; also serves lookups on lower(email)
+    __table_args__ = (
+        db.Index("ix_users_email_lower", db.func.lower(email), unique=True),
+    )
+
     bookings = db.relationship("Booking", back_populates="user", cascade="all, delete-orphan")
     reviews = db.relationship("Review", back_populates="user", cascade="all, delete-orphan")
     
     # Add the places relationship
     places = db.relationship("Place", back_populates="user", cascade="all, delete-orphan")
 
+    @validates("email")
+    def _normalize_email(self, key, email):
+        return normalize_email(email)
+
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        from app.services.passwords import passwords
+
+        self.password = passwords.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        from app.services.passwords import passwords
+
+        return passwords.verify(self.password, password)
 
     def verify_password(self, password):
         return self.check_password(password)
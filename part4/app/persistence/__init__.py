@@ -1,2 +1,3 @@
 from .repository import Repository
 from .sqlalchemy_repository import SQLAlchemyRepository
+from .pagination import InvalidCursor, Page
@@ -0,0 +1,139 @@
+"""
+pagination.py: Keyset (cursor) pagination for SQLAlchemy queries.
+
+Pages are ordered on a sort column plus the primary key as tie-breaker,
+e.g. (created_at, id). Instead of an OFFSET, each page starts strictly
+after the last row of the previous one, so fetching page N costs the same
+as page 1 and rows inserted meanwhile never shift or repeat entries.
+
+A cursor is the (sort value, id) of the last row served, encoded as an
+opaque URL-safe string.
+"""
+
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+Page = namedtuple("Page", ["items", "next_cursor"])
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded."""
+
+
+def encode_cursor(values):
+    """
+    Encode the key of the last row served.
+
+    Args:
+        values (list): Sort key values; datetimes are stored as ISO strings.
+
+    Returns:
+        str: Opaque URL-safe cursor.
+    """
+    payload = [
+        {"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Inverse of `encode_cursor`.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list):
+            raise ValueError
+        return [
+            datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v
+            for v in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Invalid pagination cursor.") from None
+
+
+def keyset_slice(rows, key, limit, cursor=None):
+    """
+    Keyset-paginate rows already held in memory.
+
+    Args:
+        rows (iterable): Rows to page through.
+        key (callable): Returns a unique, orderable tuple for a row, e.g.
+            (distance, id); the tuple is what the cursor stores.
+        limit (int): Page size.
+        cursor (str | None): Cursor returned with the previous page.
+
+    Returns:
+        Page: The rows and the cursor of the next page (None on the last).
+    """
+    rows = sorted(rows, key=key)
+    if cursor:
+        after = tuple(decode_cursor(cursor))
+        try:
+            rows = [row for row in rows if key(row) > after]
+        except TypeError:
+            raise InvalidCursor("Invalid pagination cursor.") from None
+    if len(rows) <= limit:
+        return Page(rows, None)
+    return Page(rows[:limit], encode_cursor(list(key(rows[limit - 1]))))
+
+
+def keyset_paginate(query, sort_column, id_column, limit, cursor=None, descending=False):
+    """
+    Fetch one page of `query` ordered on (sort_column, id_column).
+
+    Args:
+        query: SQLAlchemy Query to paginate (any filters already applied).
+        sort_column: Primary ordering column, e.g. Model.created_at.
+        id_column: Unique tie-breaker, usually the primary key.
+        limit (int): Page size.
+        cursor (str | None): Cursor returned with the previous page.
+        descending (bool): Newest first instead of oldest first.
+
+    Returns:
+        Page: The rows and the cursor of the next page (None on the last).
+    """
+    if cursor:
+        after = decode_cursor(cursor)
+        if len(after) != 2:
+            raise InvalidCursor("Invalid pagination cursor.")
+        sort_value, id_value = after
+        if descending:
+            query = query.filter(
+                or_(
+                    sort_column < sort_value,
+                    and_(sort_column == sort_value, id_column < id_value),
+                )
+            )
+        else:
+            query = query.filter(
+                or_(
+                    sort_column > sort_value,
+                    and_(sort_column == sort_value, id_column > id_value),
+                )
+            )
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # One extra row tells whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return Page(rows, None)
+    rows = rows[:limit]
+    last = rows[-1]
+    return Page(
+        rows,
+        encode_cursor([getattr(last, sort_column.key), getattr(last, id_column.key)]),
+    )
@@ -1,3 +1,4 @@
+from app.persistence.pagination import keyset_paginate
 from app.persistence.repository import Repository
 
 
@@ -11,11 +12,63 @@ class SQLAlchemyRepository(Repository):
         db.session.add(obj)
         db.session.commit()
 
-    def get(self, obj_id):
-        return self.model.query.get(obj_id)
+    def get(self, obj_id, options=()):
+        """
+        Fetch an object by primary key.
 
-    def get_all(self):
-        return self.model.query.all()
+        Args:
+            obj_id: Primary key of the object.
+            options (tuple): Loader options (e.g. `selectinload(...)`) for
+                the relationships the caller is going to walk.
+        """
+        if not options:
+            return self.model.query.get(obj_id)
+        # get() would return an object already in the session as is, with
+        # the options ignored; a query fills in its unloaded relationships
+        return (
+            self.model.query.options(*options)
+            .filter(self.model.id == obj_id)
+            .one_or_none()
+        )
+
+    def get_all(self, options=()):
+        return self.model.query.options(*options).all()
+
+    def paginate(
+        self,
+        limit,
+        cursor=None,
+        query=None,
+        sort_attr="created_at",
+        descending=False,
+        options=(),
+    ):
+        """
+        Fetch one page of objects ordered on (sort_attr, id).
+
+        Args:
+            limit (int): Page size.
+            cursor (str | None): `next_cursor` of the previous page.
+            query: Optional pre-filtered query (defaults to all objects).
+            sort_attr (str): Ordering column, with the primary key as tie-breaker.
+            descending (bool): Newest first instead of oldest first.
+            options (tuple): Loader options applied to the page query.
+
+        Returns:
+            Page: namedtuple of (items, next_cursor).
+
+        Raises:
+            InvalidCursor: If the cursor is malformed.
+        """
+        query = query if query is not None else self.model.query
+        return keyset_paginate(
+            query.options(*options),
+            getattr(self.model, sort_attr),
+            self.model.id,
+            limit,
+            cursor,
+            descending,
+        )
 
     def update(self, obj_id, data):
         from app import db
@@ -6,6 +6,10 @@ from functools import wraps
 from uuid import UUID
 from app.utils.decorators import admin_required
 from app.models.message import Message
+from app.api.v1.pagination import fetch_page
+from app.services import conversations
+from app.services.facade import facade
+from app.utils.perf import perf
 
 # Define the Blueprint for admin routes
 admin = Blueprint("admin", __name__, url_prefix="/admin")
@@ -128,13 +132,25 @@ def delete_amenity(amenity_id):
     return redirect(url_for("admin.amenities_list"))
 
 
+# Per-endpoint query counts and latency percentiles (PERF_ENABLED only)
+@admin.route("/perf")
+@login_required
+@admin_required
+def perf_report():
+    return jsonify(perf.report())
+
+
 # Route to list all places
 @admin.route("/places")
 @login_required
 @admin_required
 def places_list():
-    places = Place.query.all()
-    return render_template("admin/places_list.html", places=places)
+    places, headers = fetch_page(facade.paginate_places)
+    return render_template(
+        "admin/places_list.html",
+        places=places,
+        next_cursor=headers.get("X-Next-Cursor"),
+    )
 
 
 @admin.route('/delete_user/<uuid:user_id>', methods=['POST'])
@@ -149,6 +165,9 @@ def delete_user(user_id):
     # Ensure all messages where the user is the sender or receiver are updated to a default user
     Message.query.filter_by(sender_id=user.id).update({Message.sender_id: default_user_id})
     Message.query.filter_by(receiver_id=user.id).update({Message.receiver_id: default_user_id})
+    # Their conversations now belong to the default user (merged with any
+    # it already had with the same people)
+    conversations.rebuild_users([user.id, default_user_id])
 
     # Delete the user
     db.session.delete(user)
@@ -183,8 +202,13 @@ from flask_login import current_user
 @login_required
 @admin_required
 def view_users():
-    users = User.query.all()  # Get all users
-    return render_template('view_users.html', users=users, admin=current_user)
+    users, headers = fetch_page(facade.paginate_users)  # One page of users
+    return render_template(
+        'view_users.html',
+        users=users,
+        admin=current_user,
+        next_cursor=headers.get("X-Next-Cursor"),
+    )
 
 @admin.route('/edit_user/<uuid:user_id>', methods=['GET', 'POST'])
 @login_required
@@ -10,8 +10,9 @@ from flask import (
 )
 from flask_login import login_required, login_user, logout_user, current_user
 from app.models.user import User
+from app.services.facade import facade
 from app.database import db
-from werkzeug.security import check_password_hash
+from app.services.passwords import passwords
 from werkzeug.utils import secure_filename
 import os
 
@@ -22,11 +23,12 @@ def login():
     if request.method == "POST":
         email = request.form.get("email")
         password = request.form.get("password")
-        user = User.query.filter_by(email=email).first()
+        user = facade.get_user_by_email(email)
 
-        if not user or not check_password_hash(user.password, password):
+        if not passwords.check(user, password):
             flash("Invalid email or password", "danger")
             return redirect(url_for("auth.login"))
+        db.session.commit()  # a password rehashed with the current method
 
         login_user(user)
         flash("Logged in successfully!", "success")
@@ -55,7 +57,7 @@ def register():
         last_name = request.form.get("last_name")
         pseudo = request.form.get("pseudo")
 
-        existing_user = User.query.filter_by(email=email).first()
+        existing_user = facade.get_user_by_email(email)
         if existing_user:
             flash("Email already registered. Please login or use a different email.", "error")
             return render_template("register.html")
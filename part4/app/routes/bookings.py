@@ -4,7 +4,7 @@ from app.models.booking import Booking
 from app.models.user import User
 from app.models.place import Place
 from app.database import db
-from app.services.facade import facade
+from app.services.facade import BOOKING_CARD, facade
 from datetime import datetime
 
 bookings = Blueprint("bookings", __name__)
@@ -49,12 +49,14 @@ def host_bookings():
 
     bookings = (
         Booking.query.join(Place)
+        .options(*BOOKING_CARD)
         .filter(Place.host_id == user.id, Booking.status == "pending")
         .all()
     )
 
     last_requests = (
         Booking.query.join(Place)
+        .options(*BOOKING_CARD)
         .filter(Place.host_id == user.id, Booking.status == "requested")
         .order_by(Booking.created_at.desc())  # Sort by creation date
         .limit(5)  # Limit the number of requests to show
@@ -71,7 +73,7 @@ def host_bookings():
 @bookings.route("/booking/<booking_id>")
 @login_required
 def view_booking(booking_id):
-    booking = Booking.query.get_or_404(booking_id)
+    booking = Booking.query.options(*BOOKING_CARD).get_or_404(booking_id)
     return render_template("view_booking.html", booking=booking)
 
 
@@ -93,10 +95,9 @@ def approve_booking(booking_id):
     booking.status = "confirmed"
     
     try:
-        db.session.commit()
-
-        # Notify the guest (you may need to handle both success/failure of notification)
+        # Queued with the status change, sent once it is committed
         facade.notify_guest_booking_status(booking, "accepted")
+        db.session.commit()
 
         flash(f"Booking for {booking.place.title} confirmed and guest notified.", "success")
         return redirect(url_for("bookings.host_bookings"))
@@ -2,10 +2,11 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from datetime import datetime
 from app.models.user import User
-from app.models.message import Message
+from app.services import conversations
 from app.models.booking import Booking
 from app.models.amenity import Amenity
 from app.database import db
+from app.services.facade import facade
 from functools import wraps
 
 dashboard = Blueprint("dashboard", __name__)
@@ -37,7 +38,7 @@ def dashboard_view():
 
     # Statistics for widgets
     total_bookings = Booking.query.filter_by(user_id=user.id).count()
-    unread_messages = Message.query.filter_by(receiver_id=user.id, is_read=False).count()
+    unread_messages = conversations.unread_total(user.id)
     upcoming_reservations = Booking.query.filter(
         Booking.user_id == user.id,
         Booking.start_date >= datetime.utcnow(),
@@ -45,7 +46,8 @@ def dashboard_view():
     ).count()
 
     # Total views for user's places
-    total_views = sum(place.views for place in user.places)
+    places = facade.list_owned_places(user)
+    total_views = sum(place.views for place in places)
 
     return render_template(
         "dashboard.html",
@@ -53,7 +55,7 @@ def dashboard_view():
         unread_messages=unread_messages,
         upcoming_reservations=upcoming_reservations,
         confirmed_bookings=confirmed_bookings,
-        places=user.places,
+        places=places,
         total_views=total_views
     )
 
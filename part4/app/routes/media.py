@@ -0,0 +1,69 @@
+"""
+media.py: Uploaded files and built assets, with long-lived cache headers
+(see app.services.media).
+"""
+
+import mimetypes
+import os
+
+from flask import Blueprint, abort, current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+from app.services.media import ASSET_DIR, ENCODINGS, content_hash
+from app.utils.photo_utils import upload_folder
+
+media_bp = Blueprint("media", __name__)
+
+# Folders of the upload folder holding published files (older uploads sit
+# at its top level); in-flight uploads (.incoming, *.part) are never served
+MEDIA_DIRS = ("blobs", "variants")
+
+
+def _published(filename):
+    parts = filename.split("/")
+    if filename.endswith(".part") or any(part.startswith(".") for part in parts):
+        return False
+    return len(parts) == 1 or parts[0] in MEDIA_DIRS
+
+
+def _immutable(response):
+    response.cache_control.max_age = current_app.config["MEDIA_IMMUTABLE_MAX_AGE"]
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@media_bp.route("/media/<path:filename>", methods=["GET"])
+def serve(filename):
+    """An uploaded file; immutable when its name is its content hash."""
+    if not _published(filename):
+        abort(404)
+    digest = content_hash(filename)
+    response = send_from_directory(
+        upload_folder(),
+        filename,
+        conditional=True,
+        etag=digest or True,
+        max_age=current_app.config["MEDIA_MAX_AGE"],
+    )
+    return _immutable(response) if digest else response
+
+
+@media_bp.route("/assets/<path:filename>", methods=["GET"])
+def asset(filename):
+    """A fingerprinted CSS/JS file, pre-compressed when the client accepts it."""
+    folder = os.path.join(current_app.static_folder, ASSET_DIR)
+    mimetype = mimetypes.guess_type(filename)[0]
+    for encoding, suffix in ENCODINGS:
+        path = safe_join(folder, filename + suffix)
+        if request.accept_encodings[encoding] and path and os.path.isfile(path):
+            response = send_from_directory(
+                folder, filename + suffix, mimetype=mimetype, conditional=True,
+                etag=f"{filename}:{encoding}",
+            )
+            response.content_encoding = encoding
+            break
+    else:
+        response = send_from_directory(folder, filename, mimetype=mimetype, conditional=True)
+    response.vary.add("Accept-Encoding")
+    return _immutable(response)
@@ -1,51 +1,56 @@
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, current_app, render_template, request, jsonify
 from flask_login import login_required, current_user
 from app.database import db
+from app.api.v1.pagination import fetch_page, page_args
 from app.models.message import Message
 from app.models.user import User
 from app.models.notification import Notification
+from app.persistence import InvalidCursor
+from app.services import chat as chat_service
+from app.services import conversations
+from app.utils.sse import event_stream, format_event
 
 from datetime import datetime
 import logging
 
 messages_bp = Blueprint("messages_bp", __name__)
 
-# View: List conversations (all users you chatted with)
+# View: List conversations, most recent first, a page at a time
 @messages_bp.route("/messages")
 @login_required
 def messages_list():
     user_id = current_user.id
-
-    sent_users = db.session.query(Message.receiver_id).filter(
-        Message.sender_id == user_id
-    )
-    received_users = db.session.query(Message.sender_id).filter(
-        Message.receiver_id == user_id
+    rows, headers = fetch_page(conversations.inbox, user_id)
+    inbox = [
+        {
+            "user": row.other(user_id),
+            "last_message": row.last_preview,
+            "last_timestamp": row.last_timestamp,
+            "sent_by_me": row.last_sender_id == user_id,
+            "unread": row.unread_for(user_id),
+        }
+        for row in rows
+    ]
+    return render_template(
+        "messages_list.html",
+        conversations=inbox,
+        next_cursor=headers.get("X-Next-Cursor"),
     )
-    user_ids = set(u[0] for u in sent_users.union(received_users))
-    users = User.query.filter(User.id.in_(user_ids)).all()
-
-    return render_template("messages_list.html", users=users)
 
 
 @messages_bp.route("/chat/<other_user_id>")
 @login_required
 def chat(other_user_id):
-    # Fetch the conversation messages between current_user and the other user
-    messages = Message.query.filter(
-        ((Message.sender_id == current_user.id) & (Message.receiver_id == other_user_id)) |
-        ((Message.sender_id == other_user_id) & (Message.receiver_id == current_user.id))
-    ).order_by(Message.timestamp.asc()).all()
-
-    # Fetch the user's pseudo (name) to display in the chat
-    other_user = User.query.get(other_user_id)
+    # Messages are loaded by chat.js, newest first, through the API below
+    other_user = User.query.get_or_404(other_user_id)
+    if conversations.mark_read(current_user.id, other_user_id):
+        db.session.commit()
 
     return render_template(
         "chat.html", 
         your_user_id=current_user.id, 
         other_user_id=other_user_id,
         other_user_pseudo=other_user.pseudo,  # Add pseudo to the template
-        messages=messages  # Pass messages to the template
     )
 
 
@@ -85,10 +90,8 @@ def send_message():
             is_read=False,
         )
         db.session.add(msg)
-        db.session.commit()
 
-        # ✅ Create a notification for the receiver
-        from app.models.notification import Notification
+        # ✅ Notify the receiver, in the same transaction as the message
         notif = Notification(
             recipient_id=receiver_id,
             recipient_type="user",  # or "host" if applicable
@@ -104,37 +107,84 @@ def send_message():
         db.session.rollback()
         return jsonify({"error": "Failed to send message", "details": str(e)}), 500
 
-# API route to get conversation messages
+# API route to get conversation messages, a slice at a time
 @messages_bp.route("/api/messages/conversation", methods=["GET"])
 @login_required
 def get_conversation():
+    """
+    The newest `limit` messages with `user_id`, oldest first; `before`
+    (the X-Before-Cursor header) pages back through older history and
+    `after` (the X-After-Cursor header) returns only newer messages.
+    """
     other_user_id = request.args.get("user_id")
     if not other_user_id:
         return jsonify({"error": "user_id required"}), 400
-    
-    messages = (
-        Message.query.filter(
-            (
-                (Message.sender_id == current_user.id) & (Message.receiver_id == other_user_id)
-            )
-            | (
-                (Message.sender_id == other_user_id) & (Message.receiver_id == current_user.id)
-            )
+
+    limit, _ = page_args()
+    try:
+        messages, before, after = chat_service.history(
+            current_user.id,
+            other_user_id,
+            limit,
+            before=request.args.get("before") or None,
+            after=request.args.get("after") or None,
         )
-        .order_by(Message.timestamp.asc())
-        .all()
-    )
-    
-    return jsonify(
-        [
-            {
-                "id": m.id,
-                "sender_id": m.sender_id,
-                "receiver_id": m.receiver_id,
-                "content": m.content,
-                "timestamp": m.timestamp.isoformat(),
-                "is_read": m.is_read,
-            }
-            for m in messages
-        ]
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    headers = {}
+    if before:
+        headers["X-Before-Cursor"] = before
+    if after:
+        headers["X-After-Cursor"] = after
+    return jsonify([chat_service.serialize(m) for m in messages]), 200, headers
+
+
+@messages_bp.route("/api/messages/stream", methods=["GET"])
+@login_required
+def conversation_stream():
+    """
+    Server-Sent Events: each new message exchanged with `user_id`.
+
+    Messages newer than `after` (or the Last-Event-ID a reconnecting
+    browser sends) are sent first.
+    """
+    user_id = current_user.id
+    other_user_id = request.args.get("user_id")
+    if not other_user_id:
+        return jsonify({"error": "user_id required"}), 400
+    after = request.headers.get("Last-Event-ID") or request.args.get("after") or None
+
+    # Subscribe before reading the backlog so nothing falls in between
+    subscription = chat_service.subscribe(user_id)
+    backlog = []
+    if after:
+        try:
+            backlog, _, _ = chat_service.history(
+                user_id, other_user_id, current_app.config["MAX_PAGE_SIZE"], after=after
+            )
+        except InvalidCursor as e:
+            subscription.close()
+            return jsonify({"error": str(e)}), 400
+    backlog = [chat_service.serialize(m) for m in backlog]
+    db.session.close()
+
+    sent = [max((m["id"] for m in backlog), default=0)]
+
+    def select(message):
+        if other_user_id not in (message["sender_id"], message["receiver_id"]):
+            return None
+        if message["id"] <= sent[0]:
+            return None
+        sent[0] = message["id"]
+        return format_event("message", message, message["cursor"])
+
+    config = current_app.config
+    return event_stream(
+        subscription,
+        [format_event("message", m, m["cursor"]) for m in backlog],
+        config["NOTIFY_STREAM_TIMEOUT"],
+        config["NOTIFY_HEARTBEAT"],
+        select,
     )
+
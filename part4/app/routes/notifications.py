@@ -1,21 +1,29 @@
-from flask import Blueprint, jsonify, request
+from datetime import datetime
+
+from flask import Blueprint, current_app, jsonify, request
 from flask_login import login_required, current_user
+from app.api.v1.pagination import fetch_page
 from app.database import db
 from app.models.notification import Notification
+from app.services.facade import facade
+from app.services.notification_feed import notification_feed
+from app.utils.decorators import login_or_jwt_required
+from app.utils.sse import event_stream, format_event
 
 notifications_bp = Blueprint("notifications_bp", __name__, url_prefix="/api/v1/notifications")
 
 @notifications_bp.route("/", methods=["GET"])
 @login_required
 def get_notifications():
-    notifications = Notification.query.filter_by(recipient_id=current_user.id).order_by(Notification.timestamp.desc()).all()
+    """The user's notifications, newest first, one page at a time (see pagination)."""
+    notifications, headers = fetch_page(facade.paginate_notifications, current_user.id)
     data = [{
         "id": n.id,
         "message": n.message,
         "status": n.status,
         "timestamp": n.timestamp.strftime('%Y-%m-%d %H:%M:%S')
     } for n in notifications]
-    return jsonify({"notifications": data})
+    return jsonify({"notifications": data}), 200, headers
 
 @notifications_bp.route("/unread_count", methods=["GET"])
 @login_required
@@ -23,6 +31,88 @@ def unread_count():
     count = Notification.query.filter_by(recipient_id=current_user.id, status="unread").count()
     return jsonify({"unread_count": count})
 
+@notifications_bp.route("/stream", methods=["GET"])
+@login_required
+def stream():
+    """
+    Server-Sent Events: the unread count, then each new notification.
+
+    A reconnecting browser sends the last event id it saw (or the page can
+    pass `?since=`) and first receives the notifications it missed.
+    """
+    user_id = current_user.id
+    config = current_app.config
+    last_id = request.headers.get("Last-Event-ID", type=int)
+    if last_id is None:
+        last_id = request.args.get("since", type=int)
+
+    # Subscribe first: whatever is committed from now on is either in the
+    # backlog read below or delivered by the subscription
+    subscription = notification_feed.subscribe(user_id)
+    backlog = notification_feed.since(user_id, last_id) if last_id is not None else []
+    cursor = backlog[-1]["id"] if backlog else last_id
+    if cursor is None:
+        cursor = notification_feed.latest_id(user_id)
+    unread = notification_feed.unread_count(user_id)
+    # The response outlives the request: do not hold a DB connection
+    db.session.close()
+
+    opening = [format_event("unread", {"unread_count": unread, "cursor": cursor}, cursor)]
+    opening += [format_event("notification", item, item["id"]) for item in backlog]
+    sent = [cursor]
+
+    def select(item):
+        if item["id"] <= sent[0]:
+            return None
+        sent[0] = item["id"]
+        return format_event("notification", item, item["id"])
+
+    return event_stream(
+        subscription,
+        opening,
+        config["NOTIFY_STREAM_TIMEOUT"],
+        config["NOTIFY_HEARTBEAT"],
+        select,
+    )
+
+
+@notifications_bp.route("/poll", methods=["GET"])
+@login_required
+def poll():
+    """
+    Long poll: notifications newer than `since`, waiting up to `timeout`
+    seconds (NOTIFY_POLL_TIMEOUT at most) for one to arrive.
+
+    Without `since`, answers at once with the unread count and the cursor
+    to pass next time.
+    """
+    user_id = current_user.id
+    since = request.args.get("since", type=int)
+    if since is None:
+        return jsonify(
+            {
+                "notifications": [],
+                "cursor": notification_feed.latest_id(user_id),
+                "unread_count": notification_feed.unread_count(user_id),
+            }
+        )
+
+    limit = current_app.config["NOTIFY_POLL_TIMEOUT"]
+    timeout = min(request.args.get("timeout", limit, type=float), limit)
+    with notification_feed.subscribe(user_id) as subscription:
+        items = notification_feed.since(user_id, since)
+        db.session.close()
+        if not items:
+            item = subscription.get(timeout=timeout)
+            while item is not None:
+                if item["id"] > since:
+                    items.append(item)
+                item = subscription.get(timeout=0)
+
+    cursor = max([since] + [item["id"] for item in items])
+    return jsonify({"notifications": items, "cursor": cursor})
+
+
 @notifications_bp.route("/<int:notification_id>/mark_as_read", methods=["POST"])
 @login_required
 def mark_as_read(notification_id):
@@ -35,10 +125,54 @@ def mark_as_read(notification_id):
     return jsonify({"message": "Notification marked as read."})
 
 @notifications_bp.route("/mark_all_as_read", methods=["POST"])
-@login_required
-def mark_all_as_read():
-    notifications = Notification.query.filter_by(recipient_id=current_user.id, status="unread").all()
-    for n in notifications:
-        n.status = "read"
+@login_or_jwt_required
+def mark_all_as_read(user_id):
+    count = facade.mark_notifications_read(user_id)
+    db.session.commit()
+    return jsonify({"message": "All notifications marked as read.", "updated": count})
+
+
+def parse_mark_read(data):
+    """
+    Validate the body of a mark_read request.
+
+    Returns:
+        tuple[list[int] | None, datetime | None]: The ids and the date.
+
+    Raises:
+        ValueError: If neither is given or one is malformed.
+    """
+    ids = data.get("ids")
+    older_than = data.get("older_than")
+    if ids is None and older_than is None:
+        raise ValueError("'ids' or 'older_than' required")
+    if ids is not None:
+        if not isinstance(ids, list) or not all(
+            isinstance(i, int) and not isinstance(i, bool) for i in ids
+        ):
+            raise ValueError("'ids' must be a list of notification ids")
+    if older_than is not None:
+        try:
+            older_than = datetime.fromisoformat(older_than)
+        except (TypeError, ValueError):
+            raise ValueError("'older_than' must be an ISO 8601 date") from None
+    return ids, older_than
+
+
+@notifications_bp.route("/mark_read", methods=["POST"])
+@login_or_jwt_required
+def mark_read(user_id):
+    """
+    Mark several notifications as read in one statement: those listed in
+    `ids`, those created before `older_than` (ISO 8601), or both. Serves
+    the site (session) and API clients (Bearer token) alike.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        ids, older_than = parse_mark_read(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    count = facade.mark_notifications_read(user_id, ids=ids, older_than=older_than)
     db.session.commit()
-    return jsonify({"message": "All notifications marked as read."})
+    return jsonify({"message": f"{count} notifications marked as read.", "updated": count})
+
@@ -1,13 +1,12 @@
-import os
-from flask import Blueprint, request, flash, redirect, url_for, current_app, jsonify
-from werkzeug.utils import secure_filename
+from flask import Blueprint, request, flash, redirect, url_for, jsonify
 from app import db
 from app.models.place import Place
 from app.models.place_photo import PlacePhoto
+from app.services.photo_pipeline import InvalidImage, photo_pipeline
 from flask_login import login_required, current_user
 
 # Define allowed file extensions for photo uploads
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
 # Blueprint for photo-related actions
 place_photo_bp = Blueprint("place_photo_bp", __name__, url_prefix="/place")
@@ -41,20 +40,11 @@ def upload_photo(place_id):
 
     # If the file is allowed
     if file and allowed_file(file.filename):
-        # Use current_app to access the app's config
-        upload_folder = os.path.join(current_app.root_path, 'static/uploads')
-        
-        # Ensure the upload folder exists
-        if not os.path.exists(upload_folder):
-            os.makedirs(upload_folder)
-
-        filename = secure_filename(file.filename)
-        filepath = os.path.join('uploads', filename)  # Save relative path
-        file.save(os.path.join(upload_folder, filename))
-
-        # Create and save the photo record in the database with the relative path
-        photo = PlacePhoto(url=filepath, place_id=place.id)
-        db.session.add(photo)
+        try:
+            photo_pipeline.add_photo(place, file)
+        except InvalidImage as e:
+            flash(str(e), 'error')
+            return redirect(request.url)
         db.session.commit()
 
         flash("Photo uploaded successfully.", "success")
@@ -77,16 +67,7 @@ def delete_photo(place_id, photo_id):
     if place.host_id != current_user.id:
         return jsonify({"error": "Unauthorized action."}), 403
 
-    # Construct the full path to the photo file
-    photo_path = os.path.join(current_app.root_path, "static", "uploads", photo.url)
-
-    # Check if the file exists
-    if os.path.exists(photo_path):
-        os.remove(photo_path)
-    else:
-        return jsonify({"error": "Photo file not found."}), 404
-
-    # Remove the photo record from the database
+    # Remove the photo record (its files go once committed)
     db.session.delete(photo)
     db.session.commit()
 
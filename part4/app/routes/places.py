@@ -1,5 +1,4 @@
 import uuid
-import os
 from datetime import datetime
 from flask import (
     Blueprint,
@@ -9,7 +8,6 @@ from flask import (
     url_for,
     session,
     flash,
-    current_app,
     jsonify,
 )
 from flask_login import current_user, login_required
@@ -17,18 +15,17 @@ from app.models.place import Place
 from app.models.host import Host
 from app.models.user import User
 from app.models.booking import Booking
-from app.models.place_photo import PlacePhoto
 from app.models.amenity import Amenity
 from app.models.review import Review
 from app.database import db
 from app.utils.geocode import geocode_address
 from app.utils.calculate_price import calculate_price
-from app.utils.photo_utils import save_photo
-from app.services.facade import facade
+from app.services.photo_pipeline import InvalidImage, photo_pipeline
+from app.services.facade import PLACE_DETAIL, facade
+from app.utils.response_cache import response_cache
 from datetime import datetime
 from sqlalchemy import func
-from werkzeug.utils import secure_filename
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.exc import ObjectDeletedError
 from functools import wraps
 
@@ -104,8 +101,8 @@ def booking(place_id):
                 status="pending",
             )
 
-            db.session.add(new_booking)
-            db.session.commit()
+            # Checks the dates against other bookings under a lock, then commits
+            facade.add_booking(new_booking)
 
             flash("Booking request sent! Awaiting host approval.", "success")
             return redirect(url_for("places.place", place_id=place_id))
@@ -121,9 +118,7 @@ def booking(place_id):
 @places.route("/<place_id>")
 def place(place_id):
     try:
-        place = Place.query.options(
-            joinedload(Place.photos),
-        ).get_or_404(place_id)
+        place = Place.query.options(*PLACE_DETAIL).get_or_404(place_id)
 
         print(f"[DEBUG] Loaded place: {place.title}, current views: {place.views}")
 
@@ -138,10 +133,12 @@ def place(place_id):
         else:
             print("[DEBUG] No authenticated user")
 
-        # Call the view increment logic with the actual current_user
-        place.increment_views(user=user)
-
-        db.session.refresh(place)
+        # Buffered view count, deduplicated per user (or per anonymous session)
+        if user:
+            viewer_key = f"user:{user.id}"
+        else:
+            viewer_key = "session:" + session.setdefault("viewer_id", uuid.uuid4().hex)
+        place.increment_views(user=user, viewer_key=viewer_key)
 
         owner = User.query.get(place.host_id)
         if not owner:
@@ -178,10 +175,8 @@ def search_places():
     print(f"Location: {location}")
     print(f"Max Price: {max_price}")
 
-    query = Place.query
     lat, lon = None, None
     radius_km = 20
-    filtered_places = []
     places_list = []
 
     # Geocode location if provided
@@ -192,62 +187,18 @@ def search_places():
             print("Geocoding failed:", e)
             lat, lon = None, None
 
-        def haversine(lat1, lon1, lat2, lon2):
-            import math
-
-            R = 6371
-            dlat = math.radians(lat2 - lat1)
-            dlon = math.radians(lon2 - lon1)
-            a = (
-                math.sin(dlat / 2) ** 2
-                + math.cos(math.radians(lat1))
-                * math.cos(math.radians(lat2))
-                * math.sin(dlon / 2) ** 2
-            )
-            c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-            return R * c
-
         if lat is not None and lon is not None:
-            all_places = query.filter(
-                Place.latitude.isnot(None),
-                Place.longitude.isnot(None),
-                Place.latitude != 0,
-                Place.longitude != 0,
-            ).all()
-            filtered_places = [
-                place
-                for place in all_places
-                if place.latitude
-                and place.longitude
-                and haversine(lat, lon, place.latitude, place.longitude) <= radius_km
-            ]
-            places_list = filtered_places
+            places_list = facade.places_within_radius(lat, lon, radius_km)
         else:
             flash(
                 f"Could not geocode '{location}' (no network). Showing all places.",
                 "warning",
             )
             places_list = (
-                query.filter(
-                    Place.latitude.isnot(None),
-                    Place.longitude.isnot(None),
-                    Place.latitude != 0,
-                    Place.longitude != 0,
-                )
-                .order_by(Place.id.desc())
-                .all()
+                facade.geocoded_places_query().order_by(Place.id.desc()).all()
             )
     else:
-        places_list = (
-            query.filter(
-                Place.latitude.isnot(None),
-                Place.longitude.isnot(None),
-                Place.latitude != 0,
-                Place.longitude != 0,
-            )
-            .order_by(Place.id.desc())
-            .all()
-        )
+        places_list = facade.geocoded_places_query().order_by(Place.id.desc()).all()
 
     # Apply price filter if provided
     if max_price:
@@ -334,9 +285,10 @@ def new_place():
         photo_files = request.files.getlist("photos")
         for photo_file in photo_files:
             if photo_file and photo_file.filename != "":
-                filename = save_photo(photo_file)
-                place_photo = PlacePhoto(url=filename, place_id=new_place.id)
-                db.session.add(place_photo)
+                try:
+                    photo_pipeline.add_photo(new_place, photo_file)
+                except InvalidImage as e:
+                    flash(f"{photo_file.filename}: {e}", "warning")
         db.session.commit()
 
         
@@ -350,7 +302,9 @@ def new_place():
 @login_required
 def edit_place(place_id):
     user = current_user
-    place = Place.query.options(joinedload(Place.photos)).get_or_404(place_id)
+    place = Place.query.options(
+        selectinload(Place.photos), selectinload(Place.amenities)
+    ).get_or_404(place_id)
     amenities = Amenity.query.all()
 
     if place.host_id != user.id:
@@ -371,13 +325,10 @@ def edit_place(place_id):
         uploaded_files = request.files.getlist("photos")
         for file in uploaded_files:
             if file and file.filename:
-                filename = secure_filename(file.filename)
-                unique_filename = f"{uuid.uuid4()}_{filename}"
-                upload_folder = os.path.join(current_app.root_path, "static", "uploads")
-                os.makedirs(upload_folder, exist_ok=True)
-                file.save(os.path.join(upload_folder, unique_filename))
-                photo = PlacePhoto(url=unique_filename, place=place)
-                db.session.add(photo)
+                try:
+                    photo_pipeline.add_photo(place, file)
+                except InvalidImage as e:
+                    flash(f"{file.filename}: {e}", "warning")
 
         db.session.commit()
         return redirect(url_for("dashboard.dashboard_view"))
@@ -472,6 +423,7 @@ def leave_review(place_id):
 
 
 @places.route("/api", methods=["GET"])
+@response_cache.cached(tags=("places",))
 def api_places():
     lat = request.args.get("lat", type=float)
     lon = request.args.get("lon", type=float)
@@ -480,28 +432,11 @@ def api_places():
     
     print(f"API Request - Lat: {lat}, Lon: {lon}, Radius: {radius_km}km")  # Debugging line
     
-    query = Place.query
-    filtered_places = []
-
     if lat and lon:
-        # Filter places by radius using Haversine formula
-        all_places = query.filter(
-            Place.latitude.isnot(None),
-            Place.longitude.isnot(None),
-            Place.latitude != 0,
-            Place.longitude != 0,
-        ).all()
-        filtered_places = [
-            place for place in all_places
-            if haversine(lat, lon, place.latitude, place.longitude) <= radius_km
-        ]
+        # Indexed geohash/bounding-box prefilter, exact distance on candidates
+        filtered_places = facade.places_within_radius(lat, lon, radius_km)
     else:
-        filtered_places = query.filter(
-            Place.latitude.isnot(None),
-            Place.longitude.isnot(None),
-            Place.latitude != 0,
-            Place.longitude != 0,
-        ).all()
+        filtered_places = facade.geocoded_places_query().all()
 
     # Apply price filter if provided
     if max_price is not None:
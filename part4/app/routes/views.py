@@ -1,5 +1,6 @@
 from flask import Blueprint, flash, render_template, request, redirect, url_for
 from flask_login import current_user
+from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.exc import ObjectDeletedError
 
 from app.models.user import User 
@@ -7,64 +8,64 @@ from app.models.place import Place
 from app.models.review import Review
 from app.models.message import Message
 from app.database import db
+from app.services import ratings
+from app.services.facade import facade
+from app.utils.response_cache import response_cache
 
 views = Blueprint("views", __name__)
 
 @views.route("/")
 @views.route("/index")
 def index():
-    # Fetch the 4 newest places (order by the most recent)
-    newest_places = Place.query.order_by(Place.created_at.desc()).limit(4).all()
-
-    # Calculate average rating for each place (for the top-rated places)
-    places = Place.query.all()
-    for place in places:
-        reviews = Review.query.filter_by(place_id=place.id).all()
-        if reviews:
-            place.average_rating = sum([review.rating for review in reviews]) / len(reviews)
-            # Get the top review (or any other specific review data you want to display)
-            place.top_review = reviews[0]  # Assuming we want the first review as the "top" review
-        else:
-            place.average_rating = 0  # No reviews, set rating to 0
-            place.top_review = None
-
-    # Fetch the top 4 rated places (sorted by average_rating)
-    top_rated_places = sorted(places, key=lambda x: x.average_rating, reverse=True)[:4]
-
-    return render_template(
-        "index.html",
-        places=newest_places,
-        top_rated_places=top_rated_places
+    # The listings are the same for every visitor; the rest of the page
+    # greets the current user
+    listings = response_cache.fragment(
+        "index:listings",
+        lambda: render_template(
+            "_index_listings.html",
+            # The 4 newest places (order by the most recent)
+            places=facade.newest_places(4),
+            # The top 4 rated places from the precomputed rating aggregates
+            top_rated_places=ratings.top_rated_places(limit=4),
+        ),
+        tags=("places", "ratings"),
     )
 
+    return render_template("index.html", listings=listings)
+
 @views.route("/owner/<owner_id>")
 def owner_profile(owner_id):
     owner = User.query.get_or_404(owner_id)
-    places = Place.query.filter_by(host_id=owner.id).all()
-    place_ids = [place.id for place in places]
+    stats = facade.get_host_stats(owner.id)
 
+    places = []
     reviews = []
-    avg_rating = None
-    if place_ids:
-        reviews = Review.query.filter(Review.place_id.in_(place_ids)).all()
-        avg_rating = db.session.query(db.func.avg(Review.rating)).filter(Review.place_id.in_(place_ids)).scalar()
+    if stats is not None and stats.listing_count:
+        places = facade.list_host_places(owner.id)
+        reviews = (
+            Review.query.options(joinedload(Review.user))
+            .join(Place, Place.id == Review.place_id)
+            .filter(Place.host_id == owner.id)
+            .all()
+        )
 
     return render_template(
         "owner_profile.html",
         owner=owner,
         places=places,
         reviews=reviews,
-        avg_rating=round(avg_rating, 2) if avg_rating else None
+        avg_rating=round(stats.average_rating, 2) if stats and stats.review_count else None
     )
     
 @views.route("/user/<user_id>")
 def user_profile(user_id):
     user = User.query.get_or_404(user_id)
-    user_places = Place.query.filter_by(host_id=user.id).all() 
-    user_reviews = Review.query.filter_by(user_id=user.id).all()
-
-    for review in user_reviews:
-        review.place = Place.query.get(review.place_id)
+    user_places = facade.list_host_places(user.id)
+    user_reviews = (
+        Review.query.options(joinedload(Review.place).selectinload(Place.photos))
+        .filter_by(user_id=user.id)
+        .all()
+    )
 
     return render_template("user_profile.html", user=user, places=user_places, reviews=user_reviews)
 
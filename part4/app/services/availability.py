@@ -0,0 +1,224 @@
+"""
+availability.py: In-memory night-occupancy calendars for places.
+
+Each place's active bookings are expanded once into one boolean array per
+calendar year (index = day of year - 1, True = night taken), so range
+questions ("is 3-7 July free?", "which nights are booked this year?") are
+answered with array slices instead of queries.
+
+Calendars are built lazily, one indexed query per place (or one query for
+a whole batch of places), and kept per process. Booking inserts, updates
+and deletes mark their place dirty on the session; the calendar is dropped
+when the transaction commits and rebuilt on next use. Changes made by
+other worker processes are picked up after AVAILABILITY_TTL seconds.
+
+The calendar is a read path only: `HBnBFacade.check_availability` remains
+the authoritative, locked check when a booking is written.
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.booking import Booking
+
+DEFAULTS = {
+    "AVAILABILITY_TTL": 300,
+}
+
+_DIRTY_KEY = "availability_dirty"
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+class PlaceCalendar:
+    """
+    Night occupancy of one place.
+
+    Attributes:
+        years (dict[int, numpy.ndarray]): 366-slot boolean array per year
+            that has at least one booked night.
+        built_at (float): Monotonic time the calendar was loaded.
+    """
+
+    def __init__(self):
+        self.years = {}
+        self.built_at = time.monotonic()
+
+    def _spans(self, start, end):
+        """Yield (year, first, last) day-of-year slices covering [start, end)."""
+        day = start
+        while day < end:
+            year_end = min(end, date(day.year + 1, 1, 1))
+            first = day.timetuple().tm_yday - 1
+            yield day.year, first, first + (year_end - day).days
+            day = year_end
+
+    def mark(self, start, end, booked=True):
+        """Set nights [start, end) as booked (or free)."""
+        for year, first, last in self._spans(_as_date(start), _as_date(end)):
+            if year not in self.years:
+                if not booked:
+                    continue
+                self.years[year] = np.zeros(366, dtype=bool)
+            self.years[year][first:last] = booked
+
+    def occupancy(self, start, end):
+        """Boolean array with one entry per night in [start, end)."""
+        start, end = _as_date(start), _as_date(end)
+        parts = [
+            self.years[year][first:last]
+            if year in self.years
+            else np.zeros(last - first, dtype=bool)
+            for year, first, last in self._spans(start, end)
+        ]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=bool)
+
+    def is_free(self, start, end):
+        """True if no night in [start, end) is booked."""
+        for year, first, last in self._spans(_as_date(start), _as_date(end)):
+            nights = self.years.get(year)
+            if nights is not None and nights[first:last].any():
+                return False
+        return True
+
+    def booked_ranges(self, start, end):
+        """
+        Booked stretches within [start, end) as (check_in, check_out) pairs.
+        """
+        start = _as_date(start)
+        taken = self.occupancy(start, end).astype(np.int8)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], taken, [0]))))
+        return [
+            (start + timedelta(days=int(a)), start + timedelta(days=int(b)))
+            for a, b in zip(edges[::2], edges[1::2])
+        ]
+
+
+class _IndexState:
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+        self.calendars = {}
+
+
+class AvailabilityIndex:
+    """
+    Flask extension caching a PlaceCalendar per place.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        app.extensions["availability"] = _IndexState(app)
+
+    @staticmethod
+    def _state():
+        return current_app.extensions["availability"]
+
+    def calendars(self, place_ids):
+        """
+        Calendars for several places, loading the missing or expired ones
+        with a single query.
+
+        Returns:
+            dict[str, PlaceCalendar]
+        """
+        state = self._state()
+        ttl = state.app.config["AVAILABILITY_TTL"]
+        now = time.monotonic()
+        with state.lock:
+            found = {
+                pid: cal
+                for pid in place_ids
+                if (cal := state.calendars.get(pid)) and now - cal.built_at < ttl
+            }
+        missing = [pid for pid in set(place_ids) if pid not in found]
+        if missing:
+            loaded = {pid: PlaceCalendar() for pid in missing}
+            rows = (
+                Booking.query.with_entities(
+                    Booking.place_id, Booking.start_date, Booking.end_date
+                )
+                .filter(
+                    Booking.place_id.in_(missing),
+                    Booking.status.notin_(Booking.INACTIVE_STATUSES),
+                )
+                .all()
+            )
+            for place_id, start, end in rows:
+                loaded[place_id].mark(start, end)
+            with state.lock:
+                state.calendars.update(loaded)
+            found.update(loaded)
+        return found
+
+    def calendar(self, place_id):
+        return self.calendars([place_id])[place_id]
+
+    def is_available(self, place_id, start, end):
+        return self.calendar(place_id).is_free(start, end)
+
+    def available_places(self, place_ids, start, end):
+        """
+        Subset of `place_ids` with every night of [start, end) free.
+
+        Returns:
+            set[str]
+        """
+        calendars = self.calendars(place_ids)
+        return {pid for pid, cal in calendars.items() if cal.is_free(start, end)}
+
+    def invalidate(self, place_ids=None):
+        """Drop cached calendars (all of them when place_ids is None)."""
+        state = self._state()
+        with state.lock:
+            if place_ids is None:
+                state.calendars.clear()
+            else:
+                for pid in place_ids:
+                    state.calendars.pop(pid, None)
+
+
+availability = AvailabilityIndex()
+
+
+# ---- Invalidation on booking changes ----
+
+
+@event.listens_for(Booking.place_id, "set", active_history=True)
+def _track_previous_place(target, value, oldvalue, initiator):
+    """Load the stored place before it changes so both calendars are dropped."""
+
+
+def _mark_dirty(mapper, conn, booking):
+    # Places left marked after a rollback are merely rebuilt once more
+    session = Session.object_session(booking)
+    if session is None:
+        return
+    dirty = session.info.setdefault(_DIRTY_KEY, set())
+    dirty.add(booking.place_id)
+    history = inspect(booking).attrs.place_id.history
+    dirty.update(pid for pid in history.deleted if pid)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Booking, _event, _mark_dirty)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_dirty(session):
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if dirty and has_app_context() and "availability" in current_app.extensions:
+        availability.invalidate(dirty)
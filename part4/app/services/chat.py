@@ -0,0 +1,125 @@
+"""
+chat.py: Incremental reads of a conversation and live delivery of messages.
+
+A conversation between two users is read in keyset pages ordered on
+(timestamp, id), served by the composite index on
+(sender_id, receiver_id, timestamp) - one index range scan per direction:
+
+- the newest `limit` messages;
+- older history: the page before a `before` cursor;
+- updates: the messages after an `after` cursor.
+
+Cursors are the opaque (timestamp, id) keys of app.persistence.pagination;
+every serialized message carries its own.
+
+Each committed message is published on the pubsub channels of both its
+sender and its receiver ("chat:<user id>"), so every open tab of either
+user can append it without refetching the conversation.
+"""
+
+from sqlalchemy import and_, event, or_
+from sqlalchemy.orm import Session, object_session
+
+from app.models.message import Message
+from app.persistence.pagination import encode_cursor, keyset_paginate
+from app.utils.pubsub import pubsub
+
+_NEW_KEY = "chat_new_messages"
+
+
+def channel(user_id):
+    return f"chat:{user_id}"
+
+
+def subscribe(user_id):
+    """Messages sent or received by `user_id`, as they are committed."""
+    return pubsub.subscribe(channel(user_id))
+
+
+def message_cursor(message):
+    return encode_cursor([message.timestamp, message.id])
+
+
+def serialize(message):
+    return {
+        "id": message.id,
+        "sender_id": message.sender_id,
+        "receiver_id": message.receiver_id,
+        "place_id": message.place_id,
+        "content": message.content,
+        "timestamp": message.timestamp.isoformat(),
+        "is_read": message.is_read,
+        "cursor": message_cursor(message),
+    }
+
+
+def conversation_query(user_id, other_id, place_id=None):
+    """Messages exchanged between two users, in either direction."""
+    query = Message.query.filter(
+        or_(
+            and_(Message.sender_id == user_id, Message.receiver_id == other_id),
+            and_(Message.sender_id == other_id, Message.receiver_id == user_id),
+        )
+    )
+    if place_id is not None:
+        query = query.filter(Message.place_id == place_id)
+    return query
+
+
+def history(user_id, other_id, limit, before=None, after=None, place_id=None):
+    """
+    One slice of a conversation, oldest message first.
+
+    Args:
+        user_id (str): The reader.
+        other_id (str): The other participant.
+        limit (int): Messages returned at most.
+        before (str | None): Cursor; return the page just older than it.
+        after (str | None): Cursor; return the messages newer than it
+            (oldest first, `limit` at a time). Takes precedence over
+            `before`.
+        place_id (int | None): Only messages about this place.
+
+    Returns:
+        tuple[list[Message], str | None, str | None]: The messages, the
+            cursor of older history (None when there is none, or when
+            reading newer messages) and the cursor to poll for newer ones
+            (None when reading older history, or if the conversation is
+            empty).
+
+    Raises:
+        InvalidCursor: If a cursor is malformed.
+    """
+    query = conversation_query(user_id, other_id, place_id)
+    if after:
+        page = keyset_paginate(query, Message.timestamp, Message.id, limit, after)
+        messages, older = page.items, None
+        newest = messages[-1] if messages else None
+        return messages, older, message_cursor(newest) if newest else after
+
+    page = keyset_paginate(
+        query, Message.timestamp, Message.id, limit, before, descending=True
+    )
+    messages = list(reversed(page.items))
+    newest = message_cursor(messages[-1]) if messages and not before else None
+    return messages, page.next_cursor, newest
+
+
+# ---- Publishing on commit ----
+
+
+@event.listens_for(Message, "after_insert")
+def _collect(mapper, conn, message):
+    object_session(message).info.setdefault(_NEW_KEY, []).append(serialize(message))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session):
+    for payload in session.info.pop(_NEW_KEY, ()):
+        for user_id in {payload["sender_id"], payload["receiver_id"]}:
+            pubsub.publish(channel(user_id), payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_NEW_KEY, None)
@@ -0,0 +1,230 @@
+"""
+conversations.py: The inbox, read from maintained per-conversation rows.
+
+Every pair of users who exchanged messages has one `conversations` row
+holding the newest message (id, sender, preview, timestamp) and how many
+messages each side has not read. The row is updated from the Message
+mapper event on the flushing connection, so it commits or rolls back
+together with the message, whichever endpoint sent it:
+
+- insert: count the message as unread for its receiver and, unless an
+  even newer one is already recorded, make it the last message.
+
+Reading a conversation (`mark_read`) sets its messages as read with one
+bulk UPDATE and resets the reader's counter.
+
+The inbox is then one keyset-paginated query over the user's rows,
+newest conversation first, instead of a scan of every message the user
+ever sent or received. Bulk statements and raw SQL on `messages` bypass
+the mapper event; run `flask rebuild-conversations` after such changes.
+"""
+
+from sqlalchemy import case, event, func, or_, select
+from sqlalchemy.orm import joinedload
+
+from app.database import db
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.persistence.pagination import keyset_paginate
+
+conversations = Conversation.__table__
+messages = Message.__table__
+
+
+def _preview(content):
+    return (content or "")[: Conversation.PREVIEW_LENGTH]
+
+
+def _unread_column(user_a_id, receiver_id):
+    return "unread_a" if receiver_id == user_a_id else "unread_b"
+
+
+# ---- Mapper events ----
+
+
+@event.listens_for(Message, "after_insert")
+def _message_inserted(mapper, conn, message):
+    user_a_id, user_b_id = Conversation.pair(message.sender_id, message.receiver_id)
+    latest = {
+        "last_message_id": message.id,
+        "last_sender_id": message.sender_id,
+        "last_preview": _preview(message.content),
+        "last_timestamp": message.timestamp,
+    }
+    # Messages inserted out of order only add to the unread count
+    newer = conversations.c.last_timestamp <= message.timestamp
+    values = {
+        name: case((newer, value), else_=conversations.c[name])
+        for name, value in latest.items()
+    }
+    unread = None
+    if message.sender_id != message.receiver_id:
+        unread = _unread_column(user_a_id, message.receiver_id)
+        values[unread] = conversations.c[unread] + 1
+
+    result = conn.execute(
+        conversations.update()
+        .where(
+            conversations.c.user_a_id == user_a_id,
+            conversations.c.user_b_id == user_b_id,
+        )
+        .values(**values)
+    )
+    if result.rowcount == 0:
+        values = dict(latest, user_a_id=user_a_id, user_b_id=user_b_id, unread_a=0, unread_b=0)
+        if unread:
+            values[unread] = 1
+        conn.execute(conversations.insert().values(**values))
+
+
+# ---- Queries ----
+
+
+def _involving(user_id):
+    return or_(Conversation.user_a_id == user_id, Conversation.user_b_id == user_id)
+
+
+def inbox(user_id, limit, cursor=None):
+    """
+    One page of a user's conversations, most recent first, with both
+    participants loaded in the same query.
+
+    Args:
+        user_id (str): The inbox owner.
+        limit (int): Page size.
+        cursor (str | None): Cursor returned with the previous page.
+
+    Returns:
+        Page: Conversation rows and the cursor of the next page.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed.
+    """
+    query = Conversation.query.options(
+        joinedload(Conversation.user_a), joinedload(Conversation.user_b)
+    ).filter(_involving(user_id))
+    return keyset_paginate(
+        query, Conversation.last_timestamp, Conversation.id, limit, cursor, descending=True
+    )
+
+
+def unread_total(user_id):
+    """Messages `user_id` has not read yet, over all conversations."""
+    total = db.session.execute(
+        select(
+            func.sum(
+                case(
+                    (Conversation.user_a_id == user_id, Conversation.unread_a),
+                    else_=Conversation.unread_b,
+                )
+            )
+        ).where(_involving(user_id))
+    ).scalar()
+    return total or 0
+
+
+def mark_read(user_id, other_id):
+    """
+    Mark every message `other_id` sent to `user_id` as read. The caller
+    commits.
+
+    Returns:
+        int: Number of messages that were unread.
+    """
+    count = (
+        Message.query.filter(
+            Message.sender_id == other_id,
+            Message.receiver_id == user_id,
+            Message.is_read.isnot(True),
+        ).update({Message.is_read: True}, synchronize_session=False)
+    )
+    user_a_id, user_b_id = Conversation.pair(user_id, other_id)
+    if count and user_id != other_id:
+        db.session.execute(
+            conversations.update()
+            .where(
+                conversations.c.user_a_id == user_a_id,
+                conversations.c.user_b_id == user_b_id,
+            )
+            .values(**{_unread_column(user_a_id, user_id): 0})
+        )
+    return count
+
+
+def rebuild_all():
+    """
+    Recompute every conversation row from the messages table.
+
+    Returns:
+        int: Number of conversations.
+    """
+    count = _rebuild()
+    db.session.commit()
+    return count
+
+
+def rebuild_users(user_ids):
+    """
+    Recompute the conversation rows of these users from their messages,
+    after bulk changes to them (messages handed to another user). The
+    caller commits.
+
+    Returns:
+        int: Number of conversations.
+    """
+    return _rebuild(list(user_ids))
+
+
+def _rebuild(user_ids=None):
+    user_a = case(
+        (messages.c.sender_id < messages.c.receiver_id, messages.c.sender_id),
+        else_=messages.c.receiver_id,
+    )
+    user_b = case(
+        (messages.c.sender_id < messages.c.receiver_id, messages.c.receiver_id),
+        else_=messages.c.sender_id,
+    )
+    unread = messages.c.is_read.isnot(True) & (messages.c.sender_id != messages.c.receiver_id)
+    query = select(
+        user_a,
+        user_b,
+        func.sum(case((unread & (messages.c.receiver_id == user_a), 1), else_=0)),
+        func.sum(case((unread & (messages.c.receiver_id == user_b), 1), else_=0)),
+    ).group_by(user_a, user_b)
+    stale = conversations.delete()
+    if user_ids is not None:
+        query = query.where(
+            or_(messages.c.sender_id.in_(user_ids), messages.c.receiver_id.in_(user_ids))
+        )
+        stale = stale.where(
+            or_(conversations.c.user_a_id.in_(user_ids), conversations.c.user_b_id.in_(user_ids))
+        )
+    rows = db.session.execute(query).all()
+
+    conn = db.session.connection()
+    conn.execute(stale)
+    for user_a_id, user_b_id, unread_a, unread_b in rows:
+        last = conn.execute(
+            select(messages.c.id, messages.c.sender_id, messages.c.content, messages.c.timestamp)
+            .where(
+                or_(
+                    (messages.c.sender_id == user_a_id) & (messages.c.receiver_id == user_b_id),
+                    (messages.c.sender_id == user_b_id) & (messages.c.receiver_id == user_a_id),
+                )
+            )
+            .order_by(messages.c.timestamp.desc(), messages.c.id.desc())
+            .limit(1)
+        ).one()
+        conn.execute(
+            conversations.insert().values(
+                user_a_id=user_a_id,
+                user_b_id=user_b_id,
+                last_message_id=last.id,
+                last_sender_id=last.sender_id,
+                last_preview=_preview(last.content),
+                last_timestamp=last.timestamp,
+                unread_a=unread_a,
+                unread_b=unread_b,
+            )
+        )
+    return len(rows)
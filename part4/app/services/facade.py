@@ -1,15 +1,60 @@
-from datetime import datetime, timedelta, date
-from flask import abort
+from datetime import datetime, timedelta, date, time
 from dateutil.parser import parse
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.persistence import SQLAlchemyRepository
-from app.models.user import User
+from app.models.user import User, normalize_email
 from app.models.host import Host
 from app.models.place import Place
+from app.models.place_photo import PlacePhoto  # noqa: F401 (mapped before the loader options)
 from app.models.amenity import Amenity
 from app.models.booking import Booking
 from app.models.review import Review
+from app.models.notification import Notification
 from app.database import db
+from app.services import ratings
+from app.services.host_stats import host_stats
+from app.services.mailer import mailer
+from app.utils.geo import bounding_box, covering_geohashes, sort_by_distance
+
+
+# ---- Loader options ----
+# Collections load on first access (and raise in the test suite, see
+# app/database.py). Queries returning rows for a page pass the options
+# matching what the page walks, so each relationship costs one extra query
+# for the whole result instead of one per row.
+
+# Listing cards and `Place.to_dict()`: photos and host
+PLACE_CARD = (selectinload(Place.photos), joinedload(Place.host))
+
+# Place page: photos, host, amenities and reviews with their authors
+PLACE_DETAIL = PLACE_CARD + (
+    selectinload(Place.amenities),
+    selectinload(Place.reviews).joinedload(Review.user),
+)
+
+# Booking lists: guest and place with its photos
+BOOKING_CARD = (
+    joinedload(Booking.user),
+    joinedload(Booking.place).selectinload(Place.photos),
+)
+
+
+class BookingConflictError(ValueError):
+    """Raised when requested dates overlap an active booking of the place."""
+
+
+def as_booking_date(value):
+    """
+    Normalize a date, datetime or date string to the midnight datetime
+    stored in the booking columns (bookings cover whole nights).
+    """
+    if not isinstance(value, date):
+        value = parse(str(value))
+    if isinstance(value, datetime):
+        value = value.date()
+    return datetime.combine(value, time.min)
 
 
 class HBnBFacade:
@@ -20,6 +65,7 @@ class HBnBFacade:
         self.amenity_repo = SQLAlchemyRepository(Amenity)
         self.booking_repo = SQLAlchemyRepository(Booking)
         self.review_repo = SQLAlchemyRepository(Review)
+        self.notification_repo = SQLAlchemyRepository(Notification)
 
     # ---- Users ----
     def create_user(self, data):
@@ -39,10 +85,15 @@ class HBnBFacade:
     def list_users(self):
         return self.user_repo.get_all() + self.host_repo.get_all()
 
+    def paginate_users(self, limit, cursor=None):
+        """One page of users and hosts (each listed once), oldest first."""
+        return self.user_repo.paginate(limit, cursor)
+
     def get_user_by_email(self, email):
-        return next(
-            (u for u in self.list_users() if u.email.lower() == email.lower()), None
-        )
+        """Find a user (or host) by email, ignoring case, in one indexed query."""
+        return User.query.filter(
+            func.lower(User.email) == normalize_email(email)
+        ).first()
 
     def update_user(self, uid, data):
         user = self.get_user(uid)
@@ -56,7 +107,7 @@ class HBnBFacade:
         self.user_repo.delete(uid)
 
     def is_first_user(self):
-        return len(self.list_users()) == 0
+        return db.session.query(User.id).first() is None
 
     # ---- Hosts ----
     def create_host(self, data):
@@ -76,6 +127,9 @@ class HBnBFacade:
     def list_hosts(self):
         return self.host_repo.get_all()
 
+    def paginate_hosts(self, limit, cursor=None):
+        return self.host_repo.paginate(limit, cursor)
+
     def update_host(self, hid, data):
         host = self.get_host(hid)
         if not host:
@@ -87,23 +141,19 @@ class HBnBFacade:
     def delete_host(self, hid):
         self.host_repo.delete(hid)
 
-    def get_host_owned_places(self, hid):
-        host = self.get_host(hid)
-        if not host:
+    def get_host_stats(self, hid):
+        """Rating and portfolio statistics of a host, or None if no such host."""
+        return host_stats.for_host(hid)
+
+    def get_host_owned_places(self, hid, options=PLACE_CARD):
+        if not self.get_host(hid):
             return None
-        seen = set()
-        return [
-            p
-            for p in self.list_places()
-            if getattr(p, "host", None)
-            and p.host.id == hid
-            and not (p.id in seen or seen.add(p.id))
-        ]
+        return self.list_host_places(hid, options)
 
     def get_host_by_email(self, email):
-        return next(
-            (h for h in self.list_hosts() if h.email.lower() == email.lower()), None
-        )
+        return Host.query.filter(
+            func.lower(Host.email) == normalize_email(email)
+        ).first()
 
     # ---- Places ----
     def create_place(self, data):
@@ -127,11 +177,75 @@ class HBnBFacade:
         self.place_repo.add(place)
         return place
 
-    def get_place(self, pid):
-        return self.place_repo.get(pid)
+    def get_place(self, pid, options=()):
+        return self.place_repo.get(pid, options)
 
-    def list_places(self):
-        return self.place_repo.get_all()
+    def list_places(self, options=()):
+        return self.place_repo.get_all(options)
+
+    def paginate_places(self, limit, cursor=None, options=PLACE_CARD):
+        return self.place_repo.paginate(limit, cursor, options=options)
+
+    def newest_places(self, limit, options=PLACE_CARD):
+        return (
+            Place.query.options(*options)
+            .order_by(Place.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def list_host_places(self, hid, options=PLACE_CARD):
+        return Place.query.options(*options).filter_by(host_id=hid).all()
+
+    def list_owned_places(self, owner, options=PLACE_CARD):
+        """Places listed by a host, or created by a plain user."""
+        owner_column = Place.host_id if isinstance(owner, Host) else Place.user_id
+        return Place.query.options(*options).filter(owner_column == owner.id).all()
+
+    def geocoded_places_query(self, options=PLACE_CARD):
+        """Places with usable coordinates (0/0 is treated as 'not geocoded')."""
+        return Place.query.options(*options).filter(
+            Place.latitude.isnot(None),
+            Place.longitude.isnot(None),
+            Place.latitude != 0,
+            Place.longitude != 0,
+        )
+
+    def places_within_radius(self, lat, lon, radius_km, query=None):
+        """Return places within `radius_km` of (lat, lon), nearest first."""
+        return [
+            p for p, _ in self.places_with_distances(lat, lon, radius_km, query)
+        ]
+
+    def places_with_distances(self, lat, lon, radius_km, query=None):
+        """
+        Return (place, distance_km) pairs within `radius_km` of (lat, lon),
+        nearest first.
+
+        Candidates are prefiltered in SQL with the indexed geohash column
+        and the bounding box of the circle; exact distances are then
+        computed for all candidates in one vectorized pass.
+        """
+        query = query if query is not None else self.geocoded_places_query()
+        min_lat, min_lon, max_lat, max_lon = bbox = bounding_box(lat, lon, radius_km)
+
+        cells = covering_geohashes(bbox)
+        if cells is not None:
+            # "{" sorts right after "z", so [cell, cell + "{") is the prefix range
+            query = query.filter(
+                or_(
+                    *(
+                        and_(Place.geohash >= cell, Place.geohash < cell + "{")
+                        for cell in cells
+                    )
+                )
+            )
+
+        query = query.filter(Place.latitude.between(min_lat, max_lat))
+        if min_lon >= -180.0 and max_lon <= 180.0:
+            query = query.filter(Place.longitude.between(min_lon, max_lon))
+
+        return sort_by_distance(query.all(), lat, lon, radius_km)
 
     def update_place(self, pid, data):
         place = self.get_place(pid)
@@ -160,6 +274,9 @@ class HBnBFacade:
     def list_amenities(self):
         return self.amenity_repo.get_all()
 
+    def paginate_amenities(self, limit, cursor=None):
+        return self.amenity_repo.paginate(limit, cursor)
+
     def update_amenity(self, aid, data):
         amenity = self.get_amenity(aid)
         if not amenity:
@@ -172,49 +289,113 @@ class HBnBFacade:
         self.amenity_repo.delete(aid)
 
     # ---- Bookings ----
+    def find_booking_conflict(self, place_id, start, end, exclude_id=None):
+        """
+        Return the first active booking of a place overlapping [start, end).
+
+        Stays are half-open, so a check-out and the next check-in may fall
+        on the same day. The predicate is answered from the
+        ix_bookings_place_availability index.
+        """
+        query = Booking.query.filter(
+            Booking.place_id == place_id,
+            Booking.status.notin_(Booking.INACTIVE_STATUSES),
+            Booking.start_date < end,
+            Booking.end_date > start,
+        )
+        if exclude_id:
+            query = query.filter(Booking.id != exclude_id)
+        return query.order_by(Booking.start_date).first()
+
+    def _lock_place(self, place_id):
+        """
+        Write-lock a place's row for the rest of the transaction.
+
+        The no-op UPDATE makes concurrent bookings of the same place queue
+        behind each other until commit (a row lock on server databases,
+        the database write lock on SQLite), so the overlap check and the
+        insert cannot interleave with another request's.
+        """
+        db.session.execute(
+            text("UPDATE places SET updated_at = updated_at WHERE id = :id"),
+            {"id": place_id},
+        )
+
+    def check_availability(self, place_id, start, end, exclude_id=None):
+        """
+        Lock the place and make sure [start, end) is free.
+
+        Must run in the transaction that then writes the booking.
+
+        Raises:
+            BookingConflictError: If the dates overlap an active booking.
+        """
+        self._lock_place(place_id)
+        conflict = self.find_booking_conflict(place_id, start, end, exclude_id)
+        if conflict:
+            raise BookingConflictError(
+                f"Place {place_id} is already booked from "
+                f"{conflict.start_date:%Y-%m-%d} to {conflict.end_date:%Y-%m-%d}"
+            )
+
+    def add_booking(self, booking):
+        """
+        Persist a booking if its dates are still free.
+
+        Raises:
+            BookingConflictError: If the dates overlap an active booking.
+        """
+        try:
+            self.check_availability(
+                booking.place_id, booking.start_date, booking.end_date
+            )
+            db.session.add(booking)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return booking
+
     def create_booking(self, data):
         user = self.get_user(data["user_id"])
         place = self.get_place(data["place_id"])
+        if not user or not place:
+            return None
 
         start = data.get("start_date")
         if start is None:
             raise TypeError("start_date is required and cannot be None")
-        start = start if isinstance(start, date) else parse(str(start)).date()
+        start = as_booking_date(start)
 
         end = data.get("end_date")
         if end is None:
             raise TypeError("end_date is required and cannot be None")
-        end = end if isinstance(end, date) else parse(str(end)).date()
-
-        for existing in self.list_bookings():
-            if (
-                existing.place
-                and existing.place.id == place.id
-                and existing.status not in ["declined", "cancelled"]
-            ):
-                if start < existing.end_date and end > existing.start_date:
-                    abort(
-                        400,
-                        f"Place {place.id} is already booked from {existing.start_date} to {existing.end_date}",
-                    )
+        end = as_booking_date(end)
 
         days = (end - start).days
-        total_price = place.price * days
+        if days <= 0:
+            raise ValueError("End date must be later than start date.")
 
         booking = Booking(
-            user=user,
-            place=place,
+            user_id=user.id,
+            place_id=place.id,
+            host_id=place.host_id,
             guest_count=data["guest_count"],
             start_date=start,
             end_date=end,
-            total_price=total_price,
+            total_price=place.price * days,
             status="pending",
         )
-        self.booking_repo.add(booking)
-
-        return booking
+        return self.add_booking(booking)
 
     def update_booking(self, bid, data):
+        """
+        Update a booking, re-checking availability when its place or dates
+        change.
+
+        Raises:
+            BookingConflictError: If the new dates overlap an active booking.
+        """
         booking = self.get_booking(bid)
         if not booking:
             return None
@@ -223,18 +404,28 @@ class HBnBFacade:
             start = data["start_date"]
             if start is None:
                 raise TypeError("start_date cannot be None")
-            data["start_date"] = (
-                start if isinstance(start, date) else parse(str(start)).date()
-            )
+            data["start_date"] = as_booking_date(start)
 
         if "end_date" in data:
             end = data["end_date"]
             if end is None:
                 raise TypeError("end_date cannot be None")
-            data["end_date"] = end if isinstance(end, date) else parse(str(end)).date()
-
-        for k, v in data.items():
-            setattr(booking, k, v)
+            data["end_date"] = as_booking_date(end)
+
+        try:
+            if {"place_id", "start_date", "end_date"} & data.keys():
+                self.check_availability(
+                    data.get("place_id", booking.place_id),
+                    data.get("start_date", booking.start_date),
+                    data.get("end_date", booking.end_date),
+                    exclude_id=booking.id,
+                )
+            for k, v in data.items():
+                setattr(booking, k, v)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
         return booking
 
     def delete_booking(self, bid):
@@ -246,43 +437,58 @@ class HBnBFacade:
     def list_bookings(self):
         return self.booking_repo.get_all()
 
+    def paginate_bookings(self, limit, cursor=None, user_id=None, place_id=None):
+        """One page of bookings, optionally those of one guest or one place."""
+        query = Booking.query
+        if user_id:
+            query = query.filter(Booking.user_id == user_id)
+        if place_id:
+            query = query.filter(Booking.place_id == place_id)
+        return self.booking_repo.paginate(limit, cursor, query=query)
+
     def get_user_bookings(self, uid):
         user = self.get_user(uid)
-        return [b for b in self.list_bookings() if b.user.id == uid] if user else None
+        return Booking.query.filter_by(user_id=uid).all() if user else None
 
     def list_bookings_for_place(self, pid):
         place = self.get_place(pid)
-        return [b for b in self.list_bookings() if b.place.id == pid] if place else None
+        return Booking.query.filter_by(place_id=pid).all() if place else None
 
 
     def notify_host_booking_cancelled(self, booking):
         """
-        Notify the host when a booking is cancelled.
-        You can log, send an email, or trigger any other type of notification.
+        Email the host that a booking was cancelled.
+
+        The email is queued on the current session and sent by the outbox
+        workers once the caller commits.
         """
         host = booking.place.host
-        # Example: Notify the host by sending an email, logging, etc.
-        print(f"Booking {booking.id} has been cancelled. Notify host {host.first_name} {host.last_name}.")
-
-        # You can send an email to the host or create a notification if needed
-        # For example, you can use an email service or a task queue here to handle notifications.
-
+        guest = booking.user
+        return mailer.send_email(
+            host.email,
+            f"Booking for {booking.place.title} cancelled",
+            f"Dear {host.first_name},\n\n{guest.first_name} {guest.last_name} has "
+            f"cancelled their booking for {booking.place.title} from "
+            f"{booking.start_date:%Y-%m-%d} to {booking.end_date:%Y-%m-%d}.",
+            key=f"booking:{booking.id}:cancelled",
+        )
 
     def notify_guest_booking_status(self, booking, status):
         """
-        Notify the guest when the status of their booking changes (accepted, declined, etc.)
+        Email the guest that their booking was accepted, declined, etc.
+
+        The email is queued on the current session and sent by the outbox
+        workers once the caller commits.
         """
-        guest = booking.user  # The user who made the booking
+        guest = booking.user
         place = booking.place
-        subject = f"Your booking for {place.title} has been {status}"
-        body = f"Dear {guest.first_name},\n\nYour booking for {place.title} from {booking.start_date} to {booking.end_date} has been {status}."
-
-        # For demonstration, we print it. Replace with actual notification logic.
-        print(f"Notify guest {guest.first_name} {guest.last_name}: {subject}\n{body}")
-
-        # If you're using email, you can integrate Flask-Mail or another email service here
-        # Example:
-        # send_email(guest.email, subject, body)
+        return mailer.send_email(
+            guest.email,
+            f"Your booking for {place.title} has been {status}",
+            f"Dear {guest.first_name},\n\nYour booking for {place.title} from "
+            f"{booking.start_date:%Y-%m-%d} to {booking.end_date:%Y-%m-%d} has been {status}.",
+            key=f"booking:{booking.id}:{status}",
+        )
 
 
     # ---- Reviews ----
@@ -305,6 +511,35 @@ class HBnBFacade:
     def list_reviews(self):
         return self.review_repo.get_all()
 
+    def paginate_reviews(self, limit, cursor=None):
+        return self.review_repo.paginate(limit, cursor)
+
+    def get_place_rating(self, pid, prior_weight=5):
+        """
+        Rating summary of a place from its maintained aggregates: a couple
+        of primary-key reads, whatever the number of reviews.
+
+        Args:
+            pid (str): Place id.
+            prior_weight (int): Weight of the site-wide mean in the
+                Bayesian score, in reviews.
+
+        Returns:
+            dict | None: None if the place has no rated review.
+        """
+        summary = ratings.place_summary(pid)
+        if summary is None:
+            return None
+        return {
+            "place_id": pid,
+            "average_rating": summary.average_rating,
+            "review_count": summary.review_count,
+            "histogram": summary.histogram,
+            "bayesian_rating": summary.bayesian_rating(
+                ratings.site_average(), prior_weight
+            ),
+        }
+
     def update_review(self, rid, data):
         review = self.get_review(rid)
         if not review:
@@ -316,6 +551,41 @@ class HBnBFacade:
     def delete_review(self, rid):
         self.review_repo.delete(rid)
 
+    # ---- Notifications ----
+    def paginate_notifications(self, recipient_id, limit, cursor=None):
+        """One page of a user's notifications, newest first."""
+        return self.notification_repo.paginate(
+            limit,
+            cursor,
+            query=Notification.query.filter_by(recipient_id=recipient_id),
+            sort_attr="timestamp",
+            descending=True,
+        )
+
+    def mark_notifications_read(self, recipient_id, ids=None, older_than=None):
+        """
+        Mark a user's unread notifications as read with a single UPDATE,
+        without loading them. The caller commits.
+
+        Args:
+            recipient_id (str): Whose notifications.
+            ids (list[int] | None): Only these notifications (ids belonging
+                to other users are ignored).
+            older_than (datetime | None): Only notifications created before.
+
+        Returns:
+            int: Number of notifications that were unread.
+        """
+        query = Notification.query.filter(
+            Notification.recipient_id == recipient_id,
+            Notification.status == "unread",
+        )
+        if ids is not None:
+            query = query.filter(Notification.id.in_(ids))
+        if older_than is not None:
+            query = query.filter(Notification.timestamp < older_than)
+        return query.update({Notification.status: "read"}, synchronize_session=False)
+
    
    
 
@@ -0,0 +1,203 @@
+"""
+host_stats.py: Per-host rating and portfolio statistics.
+
+For a set of hosts (or all of them) the statistics are computed in the
+database with three grouped queries, whatever the number of places,
+reviews or bookings:
+
+- places per host: listing count and total views;
+- place_rating_stats per host: review count and rating sum, from the
+  per-place aggregates kept by app.services.ratings (no review scan);
+- active bookings per host overlapping the trailing occupancy window of
+  HOST_STATS_WINDOW_DAYS days: booked nights, clipped to the window.
+
+Occupancy is booked nights / (listings x window days).
+
+By default the statistics are computed on each call. With
+HOST_STATS_MATERIALIZED set they are stored in the `host_stats` table and
+served from there until HOST_STATS_MAX_AGE seconds old, when the host's
+row is recomputed on read; `flask rebuild-host-stats` refreshes every row.
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import case, func, select
+
+from app.database import db
+from app.models.booking import Booking
+from app.models.host import Host
+from app.models.host_stats import HostStats
+from app.models.place import Place
+from app.models.place_rating_stats import PlaceRatingStats
+
+DEFAULTS = {
+    "HOST_STATS_MATERIALIZED": False,
+    "HOST_STATS_MAX_AGE": 3600,
+    "HOST_STATS_WINDOW_DAYS": 365,
+}
+
+
+def _days_between(start, end):
+    """SQL expression for the number of days from `start` to `end`."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return func.julianday(end) - func.julianday(start)
+    if dialect in ("mysql", "mariadb"):
+        return func.timestampdiff(db.text("SECOND"), start, end) / 86400.0
+    return func.extract("epoch", end - start) / 86400.0
+
+
+class HostStatsService:
+    """
+    Flask extension computing (and optionally materializing) HostStats.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+
+    # ---- Computation ----
+
+    def compute(self, host_ids=None, now=None):
+        """
+        Compute statistics in the database.
+
+        Args:
+            host_ids (iterable | None): Hosts to compute, all when None.
+            now (datetime | None): End of the occupancy window (UTC now by
+                default).
+
+        Returns:
+            dict[str, HostStats]: Unsaved instances keyed by host id; hosts
+                that do not exist are left out.
+        """
+        now = now or datetime.utcnow()
+        window_days = current_app.config["HOST_STATS_WINDOW_DAYS"]
+        window_start = now - timedelta(days=window_days)
+
+        if host_ids is not None:
+            host_ids = list(host_ids)
+
+        def only(column, query):
+            return query if host_ids is None else query.where(column.in_(host_ids))
+
+        listings = db.session.execute(
+            only(
+                Host.id,
+                select(
+                    Host.id,
+                    func.count(Place.id),
+                    func.coalesce(func.sum(Place.views), 0),
+                )
+                .outerjoin(Place, Place.host_id == Host.id)
+                .group_by(Host.id),
+            )
+        ).all()
+        results = {
+            host_id: HostStats(
+                host_id=host_id,
+                listing_count=count,
+                total_views=views,
+                review_count=0,
+                rating_sum=0,
+                average_rating=0.0,
+                booked_nights=0,
+                occupancy=0.0,
+                computed_at=now,
+            )
+            for host_id, count, views in listings
+        }
+        if not results:
+            return results
+
+        reviews = db.session.execute(
+            only(
+                Place.host_id,
+                select(
+                    Place.host_id,
+                    func.sum(PlaceRatingStats.review_count),
+                    func.sum(PlaceRatingStats.rating_sum),
+                )
+                .join(Place, Place.id == PlaceRatingStats.place_id)
+                .group_by(Place.host_id),
+            )
+        ).all()
+        for host_id, count, total in reviews:
+            stats = results.get(host_id)
+            if stats is not None and count:
+                stats.review_count = count
+                stats.rating_sum = total
+                stats.average_rating = total / count
+
+        # Booked nights inside [window_start, now)
+        first = case(
+            (Booking.start_date < window_start, window_start), else_=Booking.start_date
+        )
+        last = case((Booking.end_date > now, now), else_=Booking.end_date)
+        nights = db.session.execute(
+            only(
+                Booking.host_id,
+                select(Booking.host_id, func.sum(_days_between(first, last)))
+                .where(
+                    Booking.status.notin_(Booking.INACTIVE_STATUSES),
+                    Booking.start_date < now,
+                    Booking.end_date > window_start,
+                )
+                .group_by(Booking.host_id),
+            )
+        ).all()
+        for host_id, booked in nights:
+            stats = results.get(host_id)
+            if stats is not None and booked:
+                stats.booked_nights = round(booked)
+                if stats.listing_count:
+                    stats.occupancy = min(
+                        1.0, booked / (stats.listing_count * window_days)
+                    )
+        return results
+
+    # ---- Reads ----
+
+    def for_host(self, host_id):
+        """
+        Statistics of one host.
+
+        Returns:
+            HostStats | None: None if the host does not exist.
+        """
+        if not current_app.config["HOST_STATS_MATERIALIZED"]:
+            return self.compute([host_id]).get(host_id)
+
+        stats = db.session.get(HostStats, host_id)
+        max_age = timedelta(seconds=current_app.config["HOST_STATS_MAX_AGE"])
+        if stats is not None and datetime.utcnow() - stats.computed_at < max_age:
+            return stats
+        fresh = self.compute([host_id]).get(host_id)
+        if fresh is None:
+            return None
+        stats = db.session.merge(fresh)
+        db.session.commit()
+        return stats
+
+    # ---- Materialization ----
+
+    def materialize(self):
+        """
+        Recompute and store every host's statistics.
+
+        Returns:
+            int: Number of hosts written.
+        """
+        results = self.compute()
+        db.session.query(HostStats).delete()
+        db.session.add_all(results.values())
+        db.session.commit()
+        return len(results)
+
+
+host_stats = HostStatsService()
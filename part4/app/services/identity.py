@@ -0,0 +1,149 @@
+"""
+identity.py: Resolves the logged-in user at most once per request.
+
+Flask-Login's user_loader and the `inject_user` context processor both go
+through `identity`: the first lookup of a request stores the user in
+`flask.g`, later ones (every template rendered, the loader) reuse it.
+
+With IDENTITY_CACHE_TTL > 0 users are also kept across requests in a
+process-level TTL cache, keyed by id. The cache holds the column values
+of the user, not an ORM instance: each request gets its own instance,
+attached to its session with `merge(load=False)` and no SQL. Any change
+to a user flushed through the ORM (profile edit, admin edit, password,
+deletion) drops its entry once the transaction commits; bulk UPDATEs do
+not, and other worker processes keep their copy until the TTL runs out,
+so keep the TTL short.
+"""
+
+from flask import current_app, g, has_app_context, has_request_context
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.database import db
+from app.models.user import User, normalize_email
+from app.utils.cache import MISSING, MemoryTTLCache
+
+DEFAULTS = {
+    "IDENTITY_CACHE_TTL": 0,
+    "IDENTITY_CACHE_MAX_ENTRIES": 10000,
+}
+
+_DIRTY_KEY = "identity_dirty"
+
+
+class IdentityCache:
+    """
+    Flask extension caching the current user per request, and optionally
+    per process.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        if app.config["IDENTITY_CACHE_TTL"] > 0:
+            app.extensions["identity_cache"] = MemoryTTLCache(
+                max_entries=app.config["IDENTITY_CACHE_MAX_ENTRIES"]
+            )
+
+    @staticmethod
+    def _store():
+        return current_app.extensions.get("identity_cache")
+
+    @staticmethod
+    def _request_users():
+        if not has_request_context():
+            return {}
+        if "identity_users" not in g:
+            g.identity_users = {}
+        return g.identity_users
+
+    def load(self, user_id):
+        """
+        The user with this id (a Host when it is one), or None.
+        """
+        users = self._request_users()
+        if user_id in users:
+            return users[user_id]
+        store = self._store()
+        snapshot = store.get(user_id, MISSING) if store is not None else MISSING
+        if snapshot is not MISSING:
+            user = _restore(*snapshot)
+        else:
+            user = db.session.get(User, user_id)
+            if store is not None and user is not None:
+                store.set(user_id, _snapshot(user), current_app.config["IDENTITY_CACHE_TTL"])
+        users[user_id] = user
+        return user
+
+    def by_email(self, email):
+        """
+        The user with this email, or None; the logged-in user needs no query.
+        """
+        from flask_login import current_user
+
+        email = normalize_email(email)
+        if not email:
+            return None
+        if current_user.is_authenticated and current_user.email == email:
+            return current_user._get_current_object()
+        users = self._request_users()
+        key = ("email", email)
+        if key not in users:
+            users[key] = User.query.filter(func.lower(User.email) == email).first()
+        return users[key]
+
+    def invalidate(self, *user_ids):
+        """Forget cached users (all of them with no argument)."""
+        store = self._store()
+        if store is None:
+            return
+        if not user_ids:
+            store.clear()
+        for user_id in user_ids:
+            store.delete(user_id)
+
+
+identity = IdentityCache()
+
+
+def _snapshot(user):
+    """(class, column values) of a loaded user."""
+    mapper = inspect(user).mapper
+    return mapper.class_, {attr.key: getattr(user, attr.key) for attr in mapper.column_attrs}
+
+
+def _restore(cls, values):
+    """A session instance of a snapshot, without querying."""
+    user = inspect(cls).class_manager.new_instance()
+    for key, value in values.items():
+        set_committed_value(user, key, value)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+# ---- Invalidation ----
+
+
+@event.listens_for(User, "after_update", propagate=True)
+@event.listens_for(User, "after_delete", propagate=True)
+def _user_changed(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_DIRTY_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_changed(session):
+    user_ids = session.info.pop(_DIRTY_KEY, ())
+    if user_ids and has_app_context():
+        identity.invalidate(*user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_cached(session):
+    session.info.pop(_DIRTY_KEY, None)
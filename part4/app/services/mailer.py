@@ -0,0 +1,107 @@
+"""
+mailer.py: Outgoing email, delivered through the outbox.
+
+`send_email(...)` only enqueues an "email" job on the current session; the
+outbox workers deliver the claimed emails in batches over one SMTP
+connection (MAIL_SERVER, MAIL_PORT, optional STARTTLS and login). Without
+a MAIL_SERVER, emails are written to the application log instead.
+
+Each email gets its Message-ID when enqueued, so a job run twice (after a
+worker died mid-batch) is recognisable as a duplicate by the receiver.
+"""
+
+import smtplib
+import uuid
+from email.message import EmailMessage
+from email.utils import make_msgid
+
+from flask import current_app
+
+from app.services.outbox import outbox
+
+DEFAULTS = {
+    "MAIL_SERVER": None,
+    "MAIL_PORT": 25,
+    "MAIL_USE_TLS": False,
+    "MAIL_USERNAME": None,
+    "MAIL_PASSWORD": None,
+    "MAIL_DEFAULT_SENDER": "HBnB <noreply@hbnb.local>",
+    "MAIL_TIMEOUT": 10,
+}
+
+
+class Mailer:
+    """
+    Flask extension holding the mail settings.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+
+    def send_email(self, to, subject, body, key=None):
+        """
+        Queue an email, sent once the current transaction commits.
+
+        Args:
+            to (str): Recipient address.
+            subject (str): Subject line.
+            body (str): Plain text body.
+            key (str | None): Idempotency key; an email already queued with
+                the same key is not queued again.
+
+        Returns:
+            OutboxJob: The delivery job.
+        """
+        payload = {
+            "to": to,
+            "subject": subject,
+            "body": body,
+            "message_id": make_msgid(uuid.uuid4().hex, domain="hbnb.local"),
+        }
+        return outbox.enqueue("email", payload, key=key)
+
+
+mailer = Mailer()
+
+
+def _build(payload, sender):
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = payload["to"]
+    message["Subject"] = payload["subject"]
+    message["Message-ID"] = payload["message_id"]
+    message.set_content(payload["body"])
+    return message
+
+
+@outbox.handler("email", batch=True)
+def deliver(payloads):
+    """Send a batch of emails over one SMTP connection."""
+    config = current_app.config
+    if not config["MAIL_SERVER"]:
+        for payload in payloads:
+            current_app.logger.info(
+                "Email to %s: %s\n%s", payload["to"], payload["subject"], payload["body"]
+            )
+        return None
+
+    errors = {}
+    # Connection and login errors propagate and fail (then retry) the batch
+    with smtplib.SMTP(
+        config["MAIL_SERVER"], config["MAIL_PORT"], timeout=config["MAIL_TIMEOUT"]
+    ) as smtp:
+        if config["MAIL_USE_TLS"]:
+            smtp.starttls()
+        if config["MAIL_USERNAME"]:
+            smtp.login(config["MAIL_USERNAME"], config["MAIL_PASSWORD"])
+        for i, payload in enumerate(payloads):
+            try:
+                smtp.send_message(_build(payload, config["MAIL_DEFAULT_SENDER"]))
+            except smtplib.SMTPException as e:
+                errors[i] = e
+    return errors
@@ -0,0 +1,155 @@
+"""
+media.py: URLs and caching of uploaded media and static assets.
+
+Uploaded files are served by the `media` blueprint (/media/<path>) from
+the upload folder. Blob originals (`blobs/<sha256>.<ext>`) and rendered
+variants (`variants/<blob>/<size>.<hash>.<ext>`) are named after their
+content, so their URL changes whenever the bytes do: they are sent with
+`Cache-Control: public, max-age=MEDIA_IMMUTABLE_MAX_AGE, immutable` and the
+hash as a strong ETag, and browsers and proxies never need to revalidate
+them. Other files (uploads older than blobs) get MEDIA_MAX_AGE and an
+ETag of their size and mtime.
+
+Responses go through `send_file`: conditional GETs and Range requests are
+answered by Werkzeug, and the file object is handed to the server's
+`wsgi.file_wrapper`, which sends it with sendfile(2) where the server
+supports it (USE_X_SENDFILE delegates the transfer to a front server).
+
+Static CSS/JS can be fingerprinted ahead of time with `flask build-assets`:
+each file is copied to `static/dist` under a name carrying its hash, with
+a gzip (and, when the `brotli` package is installed, Brotli) copy, and a
+manifest maps the source paths to them. `asset_url()` uses the manifest
+when there is one and falls back to the plain static URL otherwise.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from flask import current_app, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+DEFAULTS = {
+    "MEDIA_MAX_AGE": 3600,
+    "MEDIA_IMMUTABLE_MAX_AGE": 365 * 24 * 3600,
+    "ASSET_MANIFEST": None,
+}
+
+ASSET_DIR = "dist"
+ASSET_TYPES = (".css", ".js")
+
+# Content-addressed paths, and the group holding their hash
+_CONTENT_ADDRESSED = re.compile(
+    r"^(?:blobs/(?P<blob>[0-9a-f]{64})\.\w+"
+    r"|variants/[0-9a-f]{64}/\w+\.(?P<variant>[0-9a-f]{12,})\.\w+)$"
+)
+
+# Pre-compressed copies: Content-Encoding, suffix, preferred first
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+class Media:
+    """
+    Flask extension holding the media settings and the asset manifest.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        app.extensions["asset_manifest"] = load_manifest(manifest_path(app))
+        app.add_template_global(media_url)
+        app.add_template_global(asset_url)
+
+
+media = Media()
+
+
+def content_hash(path):
+    """Hash a media path is named after, None if it is not content-addressed."""
+    match = _CONTENT_ADDRESSED.match(path)
+    if match is None:
+        return None
+    return match.group("blob") or match.group("variant")
+
+
+def media_url(path):
+    """URL of an uploaded file, relative to the upload folder."""
+    return url_for("media.serve", filename=path)
+
+
+# ---- Assets ----
+
+
+def manifest_path(app):
+    return app.config["ASSET_MANIFEST"] or os.path.join(
+        app.static_folder, ASSET_DIR, "manifest.json"
+    )
+
+
+def load_manifest(path):
+    """{source path: fingerprinted path} from a manifest file ({} if none)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def asset_url(path):
+    """URL of a static asset: its fingerprinted copy when built, else /static."""
+    built = current_app.extensions.get("asset_manifest", {}).get(path)
+    if built is None:
+        return url_for("static", filename=path)
+    return url_for("media.asset", filename=built)
+
+
+def _write(path, data):
+    partial = path + ".part"
+    with open(partial, "wb") as f:
+        f.write(data)
+    os.replace(partial, path)
+
+
+def build_assets(static_folder, manifest_file):
+    """
+    Fingerprint and pre-compress the CSS/JS files of `static_folder` into
+    its `dist` folder, replacing any earlier build, and write the manifest.
+
+    Returns:
+        dict: The manifest, {source path: fingerprinted path}.
+    """
+    target = os.path.join(static_folder, ASSET_DIR)
+    shutil.rmtree(target, ignore_errors=True)
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != target and d != "uploads")
+        for name in sorted(files):
+            if not name.endswith(ASSET_TYPES):
+                continue
+            source = os.path.join(root, name)
+            relative = os.path.relpath(source, static_folder).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                data = f.read()
+            stem, ext = os.path.splitext(relative)
+            built = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+            path = os.path.join(target, built)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write(path, data)
+            _write(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write(path + ".br", brotli.compress(data))
+            manifest[relative] = built
+    os.makedirs(os.path.dirname(manifest_file), exist_ok=True)
+    _write(manifest_file, json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return manifest
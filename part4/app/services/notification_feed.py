@@ -0,0 +1,122 @@
+"""
+notification_feed.py: Live delivery of new notifications to their recipients.
+
+Every committed `Notification` row is published on its recipient's pubsub
+channel ("notifications:<user id>"), from the session's after_commit hook,
+so a notification rolled back with its transaction is never pushed.
+
+The notifications blueprint serves the channel two ways:
+
+- `/stream`: a Server-Sent Events response held open for up to
+  NOTIFY_STREAM_TIMEOUT seconds, with a keep-alive comment every
+  NOTIFY_HEARTBEAT seconds. Each event carries the notification id, so a
+  reconnecting browser sends `Last-Event-ID` and gets what it missed.
+- `/poll?since=<id>`: a long poll answering as soon as there is a
+  notification newer than `since`, or empty after NOTIFY_POLL_TIMEOUT.
+
+Both subscribe before reading the backlog, so a notification committed in
+between is seen at least once; clients drop ids they already have. The
+unread count is computed once per connection, not per poll.
+"""
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
+
+from app.database import db
+from app.models.notification import Notification
+from app.utils.pubsub import pubsub
+
+DEFAULTS = {
+    "NOTIFY_STREAM_TIMEOUT": 300,
+    "NOTIFY_HEARTBEAT": 15,
+    "NOTIFY_POLL_TIMEOUT": 25,
+}
+
+# Notifications sent to a reconnecting client at most
+BACKLOG_LIMIT = 50
+
+_NEW_KEY = "notification_feed_new"
+
+
+def serialize(notification):
+    return {
+        "id": notification.id,
+        "message": notification.message,
+        "status": notification.status,
+        "timestamp": notification.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+class NotificationFeed:
+    """
+    Flask extension publishing new notifications and reading the backlog.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+
+    @staticmethod
+    def channel(user_id):
+        return f"notifications:{user_id}"
+
+    def subscribe(self, user_id):
+        return pubsub.subscribe(self.channel(user_id))
+
+    def unread_count(self, user_id):
+        return Notification.query.filter_by(recipient_id=user_id, status="unread").count()
+
+    def latest_id(self, user_id):
+        """Id of the user's newest notification (0 if none), a `since` cursor."""
+        return (
+            db.session.query(func.max(Notification.id))
+            .filter(Notification.recipient_id == user_id)
+            .scalar()
+            or 0
+        )
+
+    def since(self, user_id, after_id, limit=BACKLOG_LIMIT):
+        """
+        The user's notifications newer than `after_id`, oldest first.
+
+        Returns:
+            list[dict]: Serialized notifications.
+        """
+        rows = (
+            Notification.query.filter(
+                Notification.recipient_id == user_id, Notification.id > after_id
+            )
+            .order_by(Notification.id)
+            .limit(limit)
+            .all()
+        )
+        return [serialize(n) for n in rows]
+
+
+notification_feed = NotificationFeed()
+
+
+# ---- Publishing on commit ----
+
+
+@event.listens_for(Notification, "after_insert")
+def _collect(mapper, conn, notification):
+    session = object_session(notification)
+    session.info.setdefault(_NEW_KEY, []).append(
+        (notification.recipient_id, serialize(notification))
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session):
+    for recipient_id, payload in session.info.pop(_NEW_KEY, ()):
+        pubsub.publish(NotificationFeed.channel(recipient_id), payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_NEW_KEY, None)
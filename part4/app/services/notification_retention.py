@@ -0,0 +1,97 @@
+"""
+notification_retention.py: Moves old read notifications out of the way.
+
+Read notifications older than NOTIFY_RETENTION_DAYS are deleted from
+`notifications` by `flask prune-notifications` (run it from cron). With
+NOTIFY_RETENTION_ARCHIVE they are first copied to `notifications_archive`
+with an INSERT ... SELECT, so nothing goes through the ORM.
+
+Rows are handled NOTIFY_RETENTION_BATCH at a time, one transaction per
+batch, so a large backlog never holds a long write lock. Unread
+notifications are kept whatever their age.
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import literal, select
+
+from app.database import db
+from app.models.notification import Notification, NotificationArchive
+
+DEFAULTS = {
+    "NOTIFY_RETENTION_DAYS": 90,
+    "NOTIFY_RETENTION_ARCHIVE": True,
+    "NOTIFY_RETENTION_BATCH": 1000,
+}
+
+notifications = Notification.__table__
+archive = NotificationArchive.__table__
+
+# Columns copied as they are into the archive
+_COPIED = ["recipient_id", "recipient_type", "message", "status", "timestamp"]
+
+
+class NotificationRetention:
+    """
+    Flask extension pruning (or archiving) old read notifications.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+
+    def prune(self, days=None, archive_rows=None, now=None):
+        """
+        Remove the read notifications older than the retention age.
+
+        Args:
+            days (int | None): Age in days (NOTIFY_RETENTION_DAYS).
+            archive_rows (bool | None): Copy them to notifications_archive
+                first (NOTIFY_RETENTION_ARCHIVE).
+            now (datetime | None): Reference time (tests).
+
+        Returns:
+            int: Number of notifications removed.
+        """
+        config = current_app.config
+        if days is None:
+            days = config["NOTIFY_RETENTION_DAYS"]
+        if archive_rows is None:
+            archive_rows = config["NOTIFY_RETENTION_ARCHIVE"]
+        batch = config["NOTIFY_RETENTION_BATCH"]
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=days)
+
+        due = (
+            select(notifications.c.id)
+            .where(notifications.c.status == "read", notifications.c.timestamp < cutoff)
+            .order_by(notifications.c.id)
+            .limit(batch)
+        )
+        removed = 0
+        while True:
+            ids = db.session.execute(due).scalars().all()
+            if not ids:
+                return removed
+            if archive_rows:
+                db.session.execute(
+                    archive.insert().from_select(
+                        ["notification_id"] + _COPIED + ["archived_at"],
+                        select(
+                            notifications.c.id,
+                            *(notifications.c[name] for name in _COPIED),
+                            literal(now),
+                        ).where(notifications.c.id.in_(ids)),
+                    )
+                )
+            db.session.execute(notifications.delete().where(notifications.c.id.in_(ids)))
+            db.session.commit()
+            removed += len(ids)
+
+
+notification_retention = NotificationRetention()
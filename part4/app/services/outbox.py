@@ -0,0 +1,316 @@
+"""
+outbox.py: Durable background job queue (transactional outbox).
+
+Side effects that are slow or may fail (sending email, ...) are not run in
+the request. The request enqueues an `OutboxJob` row with
+`outbox.enqueue(kind, payload)` on the current session, so the job is
+committed - or rolled back - together with the change that caused it.
+
+A pool of OUTBOX_WORKERS worker threads per process polls the
+`outbox_jobs` table; a commit that enqueued jobs wakes them at once.
+Each worker claims up to OUTBOX_BATCH_SIZE due jobs with one conditional
+UPDATE (so concurrent workers, in this process or others, never claim the
+same job) and hands each kind's jobs to its handler, in one call for
+handlers registered with `batch=True` (e.g. to reuse one SMTP connection).
+
+A failed job is retried with exponential backoff (OUTBOX_BACKOFF_BASE
+seconds, doubling per attempt, capped at OUTBOX_BACKOFF_MAX, with jitter)
+until it has run `max_attempts` times, then marked "failed". A job whose
+worker died is claimed again once its OUTBOX_LEASE has expired, so
+handlers must tolerate running a job twice. Jobs enqueued with the same
+idempotency key are only stored once.
+
+`flask outbox-worker` runs the workers in a dedicated process instead.
+"""
+
+import random
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import and_, event, or_, select
+from sqlalchemy.orm import Session
+
+from app.database import db
+from app.models.outbox_job import OutboxJob
+
+DEFAULTS = {
+    "OUTBOX_WORKERS": 2,
+    "OUTBOX_BATCH_SIZE": 20,
+    "OUTBOX_POLL_INTERVAL": 5.0,
+    "OUTBOX_MAX_ATTEMPTS": 5,
+    "OUTBOX_BACKOFF_BASE": 10.0,
+    "OUTBOX_BACKOFF_MAX": 3600.0,
+    "OUTBOX_LEASE": 300,
+}
+
+_ENQUEUED_KEY = "outbox_enqueued"
+
+
+class _Handler:
+    def __init__(self, func, batch):
+        self.func = func
+        self.batch = batch
+
+
+class _PoolState:
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.threads = []
+
+
+class Outbox:
+    """
+    Flask extension storing background jobs and running them in a worker pool.
+    """
+
+    def __init__(self, app=None):
+        self.handlers = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        app.extensions["outbox"] = _PoolState(app)
+
+    @staticmethod
+    def _state(app=None):
+        return (app or current_app).extensions["outbox"]
+
+    def handler(self, kind, batch=False):
+        """
+        Register the function running jobs of `kind`.
+
+        A plain handler is called with one job's payload; an exception
+        fails that job. A batch handler is called with the list of payloads
+        claimed together and returns a dict {index: exception} of the ones
+        that failed (or None); an exception fails the whole batch.
+        """
+
+        def decorator(func):
+            self.handlers[kind] = _Handler(func, batch)
+            return func
+
+        return decorator
+
+    # ---- Producer side ----
+
+    def enqueue(self, kind, payload, key=None, delay=0, max_attempts=None):
+        """
+        Add a job to the current session; it is stored on commit.
+
+        Args:
+            kind (str): Name of the registered handler.
+            payload (dict): JSON-serializable job data.
+            key (str | None): Idempotency key. If a job with this key
+                already exists, it is returned and nothing is added.
+            delay (float): Seconds before the job may run.
+            max_attempts (int | None): OUTBOX_MAX_ATTEMPTS by default.
+
+        Returns:
+            OutboxJob: The new (or existing) job.
+        """
+        if key is not None:
+            existing = OutboxJob.query.filter_by(idempotency_key=key).first()
+            if existing is not None:
+                return existing
+        job = OutboxJob(
+            kind=kind,
+            payload=payload,
+            idempotency_key=key,
+            status=OutboxJob.PENDING,
+            attempts=0,
+            max_attempts=max_attempts or current_app.config["OUTBOX_MAX_ATTEMPTS"],
+            next_attempt_at=datetime.utcnow() + timedelta(seconds=delay),
+        )
+        db.session.add(job)
+        db.session.info[_ENQUEUED_KEY] = True
+        return job
+
+    # ---- Worker side ----
+
+    def _claim(self, config):
+        """Mark a batch of due jobs as ours and return them."""
+        now = datetime.utcnow()
+        due = or_(
+            and_(OutboxJob.status == OutboxJob.PENDING, OutboxJob.next_attempt_at <= now),
+            and_(OutboxJob.status == OutboxJob.RUNNING, OutboxJob.locked_until < now),
+        )
+        ids = db.session.scalars(
+            select(OutboxJob.id)
+            .where(due)
+            .order_by(OutboxJob.next_attempt_at)
+            .limit(config["OUTBOX_BATCH_SIZE"])
+        ).all()
+        if not ids:
+            db.session.commit()
+            return []
+        # Re-checking `due` skips jobs another worker claimed meanwhile
+        token = str(uuid.uuid4())
+        claimed = db.session.execute(
+            OutboxJob.__table__.update()
+            .where(OutboxJob.id.in_(ids), due)
+            .values(
+                status=OutboxJob.RUNNING,
+                claimed_by=token,
+                locked_until=now + timedelta(seconds=config["OUTBOX_LEASE"]),
+                attempts=OutboxJob.attempts + 1,
+            )
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            return []
+        return OutboxJob.query.filter_by(claimed_by=token).order_by(OutboxJob.id).all()
+
+    def _execute(self, jobs):
+        """Run claimed jobs; return {job.id: exception} of the failed ones."""
+        errors = {}
+        by_kind = defaultdict(list)
+        for job in jobs:
+            by_kind[job.kind].append(job)
+        for kind, group in by_kind.items():
+            handler = self.handlers.get(kind)
+            if handler is None:
+                errors.update(
+                    {job.id: LookupError(f"No handler for {kind!r} jobs") for job in group}
+                )
+            elif handler.batch:
+                try:
+                    failed = handler.func([job.payload for job in group]) or {}
+                except Exception as e:
+                    failed = dict.fromkeys(range(len(group)), e)
+                errors.update({group[i].id: e for i, e in failed.items()})
+            else:
+                for job in group:
+                    try:
+                        handler.func(job.payload)
+                    except Exception as e:
+                        errors[job.id] = e
+        return errors
+
+    def backoff(self, attempts, config=None):
+        """Seconds to wait before retrying a job that failed `attempts` times."""
+        config = config or current_app.config
+        delay = min(
+            config["OUTBOX_BACKOFF_MAX"],
+            config["OUTBOX_BACKOFF_BASE"] * 2 ** (attempts - 1),
+        )
+        # Jitter spreads out retries of jobs that failed together
+        return delay * random.uniform(0.5, 1.0)
+
+    def run_once(self):
+        """
+        Claim and run one batch of due jobs.
+
+        Returns:
+            int: Number of jobs run (successfully or not).
+        """
+        config = current_app.config
+        jobs = self._claim(config)
+        if not jobs:
+            return 0
+        errors = self._execute(jobs)
+
+        now = datetime.utcnow()
+        for job in jobs:
+            job.claimed_by = None
+            job.locked_until = None
+            error = errors.get(job.id)
+            if error is None:
+                job.status = OutboxJob.DONE
+                job.completed_at = now
+                job.last_error = None
+                continue
+            job.last_error = f"{type(error).__name__}: {error}"
+            if job.attempts >= job.max_attempts:
+                job.status = OutboxJob.FAILED
+                current_app.logger.error(
+                    "Outbox job %s (%s) failed for good: %s", job.id, job.kind, job.last_error
+                )
+            else:
+                job.status = OutboxJob.PENDING
+                job.next_attempt_at = now + timedelta(
+                    seconds=self.backoff(job.attempts, config)
+                )
+        db.session.commit()
+        return len(jobs)
+
+    def drain(self):
+        """
+        Run batches until no job is due.
+
+        Returns:
+            int: Number of jobs run.
+        """
+        total = 0
+        while True:
+            count = self.run_once()
+            if not count:
+                return total
+            total += count
+
+    # ---- Worker pool ----
+
+    def start(self, app=None, workers=None):
+        """Start the worker threads of `app` if they are not running."""
+        state = self._state(app)
+        count = state.app.config["OUTBOX_WORKERS"] if workers is None else workers
+        with state.lock:
+            if state.threads or not count:
+                return
+            state.stopping.clear()
+            for n in range(count):
+                thread = threading.Thread(
+                    target=self._work, args=(state,), name=f"outbox-{n}", daemon=True
+                )
+                thread.start()
+                state.threads.append(thread)
+
+    def stop(self, app=None, timeout=None):
+        state = self._state(app)
+        with state.lock:
+            threads, state.threads = state.threads, []
+        state.stopping.set()
+        state.wakeup.set()
+        for thread in threads:
+            thread.join(timeout)
+
+    def wake(self, app=None):
+        """Start the workers if needed and have them poll right away."""
+        state = self._state(app)
+        self.start(state.app)
+        state.wakeup.set()
+
+    def _work(self, state):
+        app = state.app
+        while not state.stopping.is_set():
+            try:
+                with app.app_context():
+                    count = self.run_once()
+            except Exception:
+                app.logger.exception("Outbox worker failed")
+                count = 0
+            if not count:
+                state.wakeup.wait(app.config["OUTBOX_POLL_INTERVAL"])
+                state.wakeup.clear()
+
+
+outbox = Outbox()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers(session):
+    if session.info.pop(_ENQUEUED_KEY, False) and has_app_context():
+        if "outbox" in current_app.extensions:
+            outbox.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_enqueued(session):
+    session.info.pop(_ENQUEUED_KEY, None)
@@ -0,0 +1,160 @@
+"""
+passwords.py: Password hashing with a configurable cost, verified off the
+request thread.
+
+PASSWORD_METHOD picks the algorithm and its cost:
+
+- Werkzeug methods: "scrypt:<n>:<r>:<p>" (the default, "scrypt:32768:8:1")
+  or "pbkdf2:sha256:<iterations>";
+- "bcrypt:<rounds>", with the `bcrypt` package flask-bcrypt depends on.
+
+Verifying a password costs tens of milliseconds of CPU by design. With
+PASSWORD_WORKERS > 0 it runs in a pool of that many processes, so a burst
+of logins takes at most that many cores and the worker's threads keep
+serving other requests; 0 verifies on the calling thread. The pool's
+processes are spawned, so they import the main module again: it must not
+create the application at import time in a child (see run.py).
+
+Hashes made with other parameters (an older method, a lower cost) still
+verify; `check()` replaces them with a hash of the current method the next
+time their owner logs in, so raising the cost needs no migration.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:
+    import bcrypt
+except ImportError:  # optional: Werkzeug methods only
+    bcrypt = None
+
+DEFAULTS = {
+    "PASSWORD_METHOD": "scrypt:32768:8:1",
+    "PASSWORD_WORKERS": min(4, os.cpu_count() or 1),
+}
+
+# Something to verify against when there is no account, so unknown and
+# known emails take as long to reject
+_DUMMY_PASSWORD = "not a password"
+
+
+def hash_password(password, method):
+    """Hash a password with a PASSWORD_METHOD."""
+    if method.startswith("bcrypt"):
+        if bcrypt is None:
+            raise RuntimeError("PASSWORD_METHOD bcrypt needs the bcrypt package.")
+        rounds = int(method.partition(":")[2] or 12)
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+    return generate_password_hash(password, method=method)
+
+
+def verify_password(stored, password):
+    """Whether `password` matches a stored hash of any supported method."""
+    if not stored:
+        return False
+    if stored.startswith("$2"):
+        if bcrypt is None:
+            return False
+        return bcrypt.checkpw(password.encode(), stored.encode())
+    if "$" not in stored:
+        return False
+    return check_password_hash(stored, password)
+
+
+def hash_method(stored):
+    """The PASSWORD_METHOD a stored hash was made with."""
+    if stored.startswith("$2"):
+        return f"bcrypt:{int(stored.split('$')[2])}"
+    return stored.partition("$")[0]
+
+
+class PasswordHasher:
+    """
+    Flask extension hashing and verifying passwords.
+    """
+
+    def __init__(self, app=None):
+        self._pool = None
+        self._pool_size = None
+        self._lock = threading.Lock()
+        self._dummy = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+
+    @property
+    def method(self):
+        return current_app.config["PASSWORD_METHOD"]
+
+    def hash(self, password):
+        return hash_password(password, self.method)
+
+    def _executor(self):
+        workers = current_app.config["PASSWORD_WORKERS"]
+        if not workers:
+            return None
+        with self._lock:
+            if self._pool is None or self._pool_size != workers:
+                self.shutdown()
+                # Not forked: the parent holds threads and database connections
+                self._pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                self._pool_size = workers
+            return self._pool
+
+    def verify(self, stored, password):
+        """
+        Whether `password` matches `stored`, computed in the pool when there
+        is one (the calling thread waits without holding a core).
+        """
+        pool = self._executor()
+        if pool is None:
+            return verify_password(stored, password)
+        return pool.submit(verify_password, stored, password).result()
+
+    def needs_rehash(self, stored):
+        # Compared with a hash actually made, "scrypt" being "scrypt:32768:8:1"
+        return hash_method(stored) != hash_method(self._dummy_hash())
+
+    def check(self, user, password):
+        """
+        Check the password of an account (None: no account, always False
+        but as slow as a real check). On success, a hash of other
+        parameters is replaced; the caller commits.
+
+        Returns:
+            bool
+        """
+        if user is None:
+            self.verify(self._dummy_hash(), password)
+            return False
+        if not self.verify(user.password, password):
+            return False
+        if self.needs_rehash(user.password):
+            user.password = self.hash(password)
+        return True
+
+    def _dummy_hash(self):
+        method = self.method
+        if method not in self._dummy:
+            self._dummy[method] = hash_password(_DUMMY_PASSWORD, method)
+        return self._dummy[method]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+passwords = PasswordHasher()
+atexit.register(passwords.shutdown)
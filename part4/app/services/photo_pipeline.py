@@ -0,0 +1,383 @@
+"""
+photo_pipeline.py: Validation and resized variants of place photos.
+
+An upload is checked before anything is stored: files whose first bytes
+are not those of a JPEG/PNG/GIF/WebP image, that Pillow cannot read, or
+over PHOTO_MAX_PIXELS are rejected with InvalidImage.
+
+Photos are stored by content: the SHA-256 computed while the upload
+streamed in (app.services.uploads) names a `PhotoBlob`. Uploading a photo
+already stored only adds a `PlacePhoto` pointing to its blob; a new one is
+kept as is and a "photo_variants" outbox job is queued in the same
+transaction as its rows.
+
+The outbox workers render the variants: for each size of PHOTO_VARIANTS
+(longest edge in pixels, never upscaled) a WebP and a JPEG file, rotated
+upright from the EXIF orientation and written without EXIF, XMP or
+comments (the colour profile is kept). Each file is named after a hash of
+its bytes, so its URL can be cached forever (see app.services.media). Rendering runs on a pool of
+PHOTO_RENDER_THREADS threads per batch; Pillow releases the GIL while
+decoding, resizing and encoding, so the photos of one batch are processed
+in parallel.
+
+Once rendered, the blob's `variants` map the size names to their files,
+its `url` points to the full-size JPEG, and the original upload (with
+its metadata) is deleted after the commit; the photos of the blob get a
+copy of both. A blob's files go with the last photo showing it, however that photo
+is deleted. Templates use the variants
+through the `photo_src`/`photo_srcset` globals and the `picture` macro of
+`_photo.html`; until a photo is processed they show the default image, never the
+unstripped upload.
+"""
+
+import hashlib
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, url_for
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import db
+from app.models.photo_blob import PhotoBlob
+from app.models.place_photo import PlacePhoto
+from app.services import uploads
+from app.services.media import media_url
+from app.services.outbox import outbox
+from app.utils.photo_utils import upload_folder
+
+DEFAULTS = {
+    "PHOTO_VARIANTS": {"thumb": 320, "card": 800, "full": 1600},
+    "PHOTO_QUALITY": 80,
+    "PHOTO_MAX_PIXELS": 40_000_000,
+    "PHOTO_RENDER_THREADS": 4,
+}
+
+# Pillow format and file extension of each accepted content type
+ALLOWED_FORMATS = {
+    "image/jpeg": ("JPEG", "jpg"),
+    "image/png": ("PNG", "png"),
+    "image/gif": ("GIF", "gif"),
+    "image/webp": ("WEBP", "webp"),
+}
+
+# Variant files: extension and Pillow format
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+# Image returned when a place has no photo
+DEFAULT_IMAGE = "default.jpg"
+
+_REMOVE_KEY = "photo_files_to_remove"
+
+
+class InvalidImage(ValueError):
+    """Raised when an upload is not an image the site accepts."""
+
+
+class PhotoPipeline:
+    """
+    Flask extension validating photo uploads and rendering their variants.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        app.add_template_global(photo_src)
+        app.add_template_global(photo_srcset)
+
+    def validate(self, stream):
+        """
+        Check that a file is an image the site accepts, without decoding
+        its pixels more than needed. The stream is rewound.
+
+        Returns:
+            tuple[str, int, int]: Content type, width and height.
+
+        Raises:
+            InvalidImage: If it is not.
+        """
+        content_type = uploads.sniff(stream)
+        if content_type not in ALLOWED_FORMATS:
+            raise InvalidImage("Unsupported file type.")
+        max_pixels = current_app.config["PHOTO_MAX_PIXELS"]
+        try:
+            with Image.open(stream) as image:
+                # Pillow may recognise more than the first bytes claimed
+                if image.format != ALLOWED_FORMATS[content_type][0]:
+                    raise InvalidImage(f"Unsupported image format: {image.format}.")
+                if image.width * image.height > max_pixels:
+                    raise InvalidImage("Image is too large.")
+                size = image.size
+                image.verify()
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+            raise InvalidImage("File is not a valid image.") from e
+        finally:
+            stream.seek(0)
+        return (content_type, *size)
+
+    def add_photo(self, place, file):
+        """
+        Add an uploaded photo to `place`, storing and queueing the
+        rendering of its file unless the same file is stored already. The
+        caller commits.
+
+        Args:
+            place (Place): The place shown.
+            file (FileStorage): The upload.
+
+        Returns:
+            PlacePhoto: The new photo (not processed yet if its blob is new).
+
+        Raises:
+            InvalidImage: If the file is not an accepted image.
+        """
+        sha256, size = uploads.digest(file.stream)
+        # Streams not parsed by UploadRequest are only checked here
+        max_size = current_app.config["UPLOAD_MAX_FILE_SIZE"]
+        if max_size is not None and size > max_size:
+            raise InvalidImage("File is too large.")
+        blob = db.session.get(PhotoBlob, sha256) or self._store(file, sha256, size)
+        photo = PlacePhoto(
+            id=str(uuid.uuid4()),
+            place=place,
+            blob=blob,
+            url=blob.url,
+            width=blob.width,
+            height=blob.height,
+            variants=blob.variants,
+        )
+        db.session.add(photo)
+        return photo
+
+    def _store(self, file, sha256, size):
+        """Validate and keep a file not stored yet, and queue its variants."""
+        content_type, width, height = self.validate(file.stream)
+        blob = PhotoBlob(
+            id=sha256,
+            size=size,
+            content_type=content_type,
+            width=width,
+            height=height,
+            url=f"blobs/{sha256}.{ALLOWED_FORMATS[content_type][1]}",
+        )
+        try:
+            with db.session.begin_nested():
+                db.session.add(blob)
+        except IntegrityError:
+            # Stored meanwhile by a concurrent upload of the same file
+            return db.session.get(PhotoBlob, sha256)
+        path = os.path.join(upload_folder(), blob.url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        uploads.keep(file, path)
+        outbox.enqueue("photo_variants", {"blob_id": sha256}, key=f"blob:{sha256}:variants")
+        return blob
+
+    def discard_files(self, photos, session=None):
+        """
+        Delete the files of photos being deleted once the transaction
+        commits: those of each blob, with the blob, unless photos outside
+        `photos` still show it. Runs on flush (see `_discard_deleted`).
+        """
+        session = session or db.session()
+        files = session.info.setdefault(_REMOVE_KEY, [])
+        ids = [photo.id for photo in photos]
+        blob_ids = set()
+        for photo in photos:
+            if photo.blob_id is not None:
+                blob_ids.add(photo.blob_id)
+                continue
+            files.append(photo.url)
+            if photo.variants:
+                files.append(variant_dir(photo.id))
+        for blob_id in blob_ids:
+            others = session.query(PlacePhoto.id).filter(
+                PlacePhoto.blob_id == blob_id, PlacePhoto.id.notin_(ids)
+            ).count()
+            if others:
+                continue
+            blob = session.get(PhotoBlob, blob_id)
+            files.append(blob.url)
+            if blob.variants:
+                files.append(variant_dir(blob.id))
+            session.delete(blob)
+
+
+photo_pipeline = PhotoPipeline()
+
+
+# ---- Rendering ----
+
+
+def variant_dir(key):
+    """Folder of a blob's (or older photo's) variants, in the upload folder."""
+    return f"variants/{key}"
+
+
+def _flatten(image):
+    """An RGB copy, transparent areas on white (JPEG has no alpha)."""
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, "white")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render_variants(source, folder, relative_dir, sizes, quality):
+    """
+    Write the resized variants of one image.
+
+    Args:
+        source (str): Path of the original.
+        folder (str): Upload folder.
+        relative_dir (str): Where the variants go, inside `folder`.
+        sizes (dict[str, int]): Longest edge per variant name.
+        quality (int): WebP/JPEG quality.
+
+    Returns:
+        dict: {name: {"width", "height", "webp", "jpeg"}}, paths relative
+            to the upload folder.
+    """
+    target = os.path.join(folder, relative_dir)
+    os.makedirs(target, exist_ok=True)
+    variants = {}
+    with Image.open(source) as original:
+        icc_profile = original.info.get("icc_profile")
+        # Upright pixels; the orientation tag is not carried over
+        image = ImageOps.exif_transpose(original)
+        webp_image = image if image.mode in ("RGB", "RGBA") else image.convert("RGBA")
+        jpeg_image = _flatten(image)
+        for name, edge in sizes.items():
+            entry = {}
+            for fmt, base in (("webp", webp_image), ("jpeg", jpeg_image)):
+                variant = base.copy()
+                variant.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+                # Written under a temporary name: readers never see half a file
+                partial = os.path.join(folder, f"{relative_dir}/{name}.{fmt}.part")
+                options = {"quality": quality, "icc_profile": icc_profile}
+                if fmt == "jpeg":
+                    options.update(optimize=True, progressive=True)
+                variant.save(partial, FORMATS[fmt], **options)
+                with open(partial, "rb") as f:
+                    digest = hashlib.file_digest(f, "sha256").hexdigest()[:16]
+                relative = f"{relative_dir}/{name}.{digest}.{EXTENSIONS[fmt]}"
+                os.replace(partial, os.path.join(folder, relative))
+                entry[fmt] = relative
+                entry["width"], entry["height"] = variant.size
+            variants[name] = entry
+    return variants
+
+
+@outbox.handler("photo_variants", batch=True)
+def process(payloads):
+    """Render the variants of a batch of blobs on the thread pool."""
+    config = current_app.config
+    folder = upload_folder()
+    blob_ids = [p["blob_id"] for p in payloads if "blob_id" in p]
+    # Jobs queued before blobs existed name a photo
+    photo_ids = [p["photo_id"] for p in payloads if "photo_id" in p]
+    found = {("blob_id", b.id): b for b in PhotoBlob.query.filter(PhotoBlob.id.in_(blob_ids))}
+    found.update(
+        (("photo_id", p.id), p) for p in PlacePhoto.query.filter(PlacePhoto.id.in_(photo_ids))
+    )
+    targets = {}
+    for i, payload in enumerate(payloads):
+        kind = "blob_id" if "blob_id" in payload else "photo_id"
+        target = found.get((kind, payload[kind]))
+        # Deleted meanwhile, or already done by an earlier run of the job
+        if target is not None and not target.variants:
+            targets[i] = target
+
+    failed = {}
+    threads = min(config["PHOTO_RENDER_THREADS"], len(targets)) or 1
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = {
+            i: pool.submit(
+                render_variants,
+                os.path.join(folder, target.url),
+                folder,
+                variant_dir(target.id),
+                config["PHOTO_VARIANTS"],
+                config["PHOTO_QUALITY"],
+            )
+            for i, target in targets.items()
+        }
+    session = db.session()
+    for i, future in futures.items():
+        try:
+            variants = future.result()
+        except Exception as e:
+            failed[i] = e
+            continue
+        target = targets[i]
+        session.info.setdefault(_REMOVE_KEY, []).append(target.url)
+        target.variants = variants
+        target.url = variants["full"]["jpeg"]
+        if isinstance(target, PhotoBlob):
+            PlacePhoto.query.filter_by(blob_id=target.id).update(
+                {"url": target.url, "variants": variants}, synchronize_session=False
+            )
+    return failed
+
+
+# ---- Templates ----
+
+
+def photo_src(photo, size="card"):
+    """
+    URL of a photo at `size` (JPEG). Until its variants are rendered a
+    stored upload still has its metadata (GPS position included), so the
+    default image stands in; older photos only have their upload.
+    """
+    if photo is None or (photo.blob_id is not None and not photo.variants):
+        return url_for("static", filename=f"uploads/{DEFAULT_IMAGE}")
+    return media_url(photo.variant(size))
+
+
+def photo_srcset(photo, fmt="webp"):
+    """`srcset` listing every variant of a photo in one format ("" if none)."""
+    if photo is None or not photo.variants:
+        return ""
+    return ", ".join(
+        f"{media_url(v[fmt])} {v['width']}w"
+        for v in sorted(photo.variants.values(), key=lambda v: v["width"])
+    )
+
+
+# ---- File cleanup on commit ----
+
+
+@event.listens_for(Session, "before_flush")
+def _discard_deleted(session, flush_context, instances):
+    # Photos deleted directly or through a cascade (a place, its owner)
+    photos = [obj for obj in session.deleted if isinstance(obj, PlacePhoto)]
+    if photos:
+        photo_pipeline.discard_files(photos, session)
+
+
+@event.listens_for(Session, "after_commit")
+def _remove_files(session):
+    paths = session.info.pop(_REMOVE_KEY, ())
+    if not paths:
+        return
+    folder = upload_folder()
+    for path in paths:
+        full = os.path.join(folder, path)
+        if os.path.isdir(full):
+            shutil.rmtree(full, ignore_errors=True)
+        elif os.path.exists(full):
+            os.remove(full)
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_files(session):
+    session.info.pop(_REMOVE_KEY, None)
@@ -0,0 +1,255 @@
+"""
+ratings.py: Incrementally maintained per-place review aggregates.
+
+Every rated review contributes to one `place_rating_stats` row holding the
+review count, the sum and average of ratings, the number of reviews per
+star rating and the top review. The row
+is updated from Review mapper events on the flushing connection, so it
+commits or rolls back together with the review itself:
+
+- insert: add the rating, and take over as top review if it ranks higher;
+- update: apply the rating delta (moving it between places if needed);
+- delete: subtract the rating.
+
+When an update or delete touches the current top review, the top is
+recomputed with one indexed query over that place's reviews.
+
+Bulk statements (`Query.update`/`Query.delete`) and raw SQL bypass the
+mapper events; run `flask rebuild-ratings` after such changes.
+"""
+
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import contains_eager, selectinload
+
+from app.database import db
+from app.models.place import Place
+from app.models.place_rating_stats import PlaceRatingStats
+from app.models.review import Review
+
+stats = PlaceRatingStats.__table__
+reviews = Review.__table__
+
+
+def _top_review(conn, place_id):
+    """Return (review_id, rating) of the best rated review, or (None, None)."""
+    row = conn.execute(
+        select(reviews.c.id, reviews.c.rating)
+        .where(reviews.c.place_id == place_id, reviews.c.rating.isnot(None))
+        .order_by(reviews.c.rating.desc(), reviews.c.created_at.desc())
+        .limit(1)
+    ).first()
+    return (row.id, row.rating) if row else (None, None)
+
+
+def _histogram_column(rating):
+    if rating in PlaceRatingStats.STARS:
+        return f"rating_{rating}_count"
+    return None
+
+
+def _apply(conn, place_id, rating, sign):
+    """Add (sign=1) or remove (sign=-1) one rating from a place's aggregates."""
+    new_count = stats.c.review_count + sign
+    new_sum = stats.c.rating_sum + sign * rating
+    values = {
+        "review_count": new_count,
+        "rating_sum": new_sum,
+        "average_rating": func.coalesce(new_sum * 1.0 / func.nullif(new_count, 0), 0),
+    }
+    bucket = _histogram_column(rating)
+    if bucket:
+        values[bucket] = stats.c[bucket] + sign
+    result = conn.execute(
+        stats.update().where(stats.c.place_id == place_id).values(**values)
+    )
+    if result.rowcount == 0 and sign > 0:
+        values = {
+            "place_id": place_id,
+            "review_count": 1,
+            "rating_sum": rating,
+            "average_rating": rating,
+        }
+        if bucket:
+            values[bucket] = 1
+        conn.execute(stats.insert().values(**values))
+
+
+def _refresh_top(conn, place_id):
+    top_id, top_rating = _top_review(conn, place_id)
+    conn.execute(
+        stats.update()
+        .where(stats.c.place_id == place_id)
+        .values(top_review_id=top_id, top_rating=top_rating)
+    )
+
+
+def _offer_top(conn, place_id, review_id, rating):
+    """Make a new review the top one if it ranks at least as high."""
+    conn.execute(
+        stats.update()
+        .where(
+            stats.c.place_id == place_id,
+            (stats.c.top_rating.is_(None)) | (stats.c.top_rating <= rating),
+        )
+        .values(top_review_id=review_id, top_rating=rating)
+    )
+
+
+def _is_top(conn, place_id, review_id):
+    return conn.execute(
+        select(stats.c.place_id).where(
+            stats.c.place_id == place_id, stats.c.top_review_id == review_id
+        )
+    ).first() is not None
+
+
+# ---- Mapper events ----
+
+
+@event.listens_for(Review.rating, "set", active_history=True)
+@event.listens_for(Review.place_id, "set", active_history=True)
+def _track_previous_value(target, value, oldvalue, initiator):
+    """Load the stored value before it is replaced, so after_update can
+    subtract it even when the review was expired (e.g. after a commit)."""
+
+
+@event.listens_for(Review, "after_insert")
+def _review_inserted(mapper, conn, review):
+    if review.rating is None:
+        return
+    _apply(conn, review.place_id, review.rating, 1)
+    _offer_top(conn, review.place_id, review.id, review.rating)
+
+
+@event.listens_for(Review, "after_update")
+def _review_updated(mapper, conn, review):
+    state = inspect(review)
+    rating_hist = state.attrs.rating.history
+    place_hist = state.attrs.place_id.history
+    if not (rating_hist.has_changes() or place_hist.has_changes()):
+        return
+
+    old_rating = rating_hist.deleted[0] if rating_hist.deleted else review.rating
+    old_place = place_hist.deleted[0] if place_hist.deleted else review.place_id
+
+    if old_rating is not None:
+        _apply(conn, old_place, old_rating, -1)
+    if review.rating is not None:
+        _apply(conn, review.place_id, review.rating, 1)
+
+    _refresh_top(conn, review.place_id)
+    if old_place != review.place_id:
+        _refresh_top(conn, old_place)
+
+
+@event.listens_for(Review, "after_delete")
+def _review_deleted(mapper, conn, review):
+    state = inspect(review)
+    rating_hist = state.attrs.rating.history
+    place_hist = state.attrs.place_id.history
+    # Use the persisted values, not unflushed edits made before the delete
+    rating = rating_hist.deleted[0] if rating_hist.deleted else review.rating
+    place_id = place_hist.deleted[0] if place_hist.deleted else review.place_id
+    if rating is None:
+        return
+    _apply(conn, place_id, rating, -1)
+    if _is_top(conn, place_id, review.id):
+        _refresh_top(conn, place_id)
+
+
+# ---- Queries ----
+
+
+def top_rated_places(limit=4):
+    """
+    Best rated places, highest average first, in a single query.
+
+    Args:
+        limit (int): Maximum number of places returned.
+
+    Returns:
+        list[Place]: Places with at least one rated review.
+    """
+    return (
+        Place.query.join(PlaceRatingStats)
+        .options(
+            contains_eager(Place.rating_stats).joinedload(PlaceRatingStats.top_review),
+            selectinload(Place.photos),
+        )
+        .filter(PlaceRatingStats.review_count > 0)
+        .order_by(
+            PlaceRatingStats.average_rating.desc(),
+            PlaceRatingStats.review_count.desc(),
+        )
+        .limit(limit)
+        .all()
+    )
+
+
+def place_summary(place_id):
+    """
+    A place's rating aggregates, read from its single stats row.
+
+    Returns:
+        PlaceRatingStats | None: None if the place has no rated review.
+    """
+    row = db.session.get(PlaceRatingStats, place_id)
+    return row if row is not None and row.review_count > 0 else None
+
+
+def site_average():
+    """
+    Mean rating over every rated review of the site, from the per-place
+    sums (one row per place, whatever the number of reviews).
+
+    Returns:
+        float | None: None while no review is rated.
+    """
+    count, total = db.session.execute(
+        select(func.sum(stats.c.review_count), func.sum(stats.c.rating_sum))
+    ).one()
+    return total / count if count else None
+
+
+def rebuild_all():
+    """
+    Recompute every place's aggregates from the reviews table.
+
+    Returns:
+        int: Number of places with rated reviews.
+    """
+    buckets = [
+        func.sum(case((reviews.c.rating == i, 1), else_=0))
+        for i in PlaceRatingStats.STARS
+    ]
+    rows = db.session.execute(
+        select(
+            reviews.c.place_id,
+            func.count(reviews.c.rating),
+            func.coalesce(func.sum(reviews.c.rating), 0),
+            *buckets,
+        )
+        .where(reviews.c.rating.isnot(None))
+        .group_by(reviews.c.place_id)
+    ).all()
+
+    conn = db.session.connection()
+    conn.execute(stats.delete())
+    for place_id, count, total, *histogram in rows:
+        top_id, top_rating = _top_review(conn, place_id)
+        conn.execute(
+            stats.insert().values(
+                place_id=place_id,
+                review_count=count,
+                rating_sum=total,
+                average_rating=total / count,
+                top_review_id=top_id,
+                top_rating=top_rating,
+                **{
+                    _histogram_column(star): n
+                    for star, n in zip(PlaceRatingStats.STARS, histogram)
+                },
+            )
+        )
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,171 @@
+"""
+tokens.py: API tokens carrying their authorization claims, and revocation.
+
+Tokens issued at login (`tokens.issue`) carry what the API authorizes
+with: `is_admin`, `is_host` and `ver`, the account's `token_version`.
+Resources check these claims and the identity before loading anything, so
+most authorized calls need no user query at all.
+
+Changing what a token vouches for (admin flag, host status, password) or
+deleting the account bumps `users.token_version` in the same flush. Once
+committed, tokens of older versions are refused. Logging out
+(`POST /api/v1/auth/logout`) puts the token's `jti` on a denylist.
+Neither check queries the database: both are kept in a process-level
+TTL cache for as long as the tokens concerned can live (JWT_REVOCATION_TTL,
+by default the refresh token lifetime). Other worker processes do not see
+them; keep access tokens short-lived when running several.
+
+The signing and verification keys are parsed once per key value instead
+of on every request (PEM keys of RS*/ES*/PS* algorithms are costly to
+load).
+"""
+
+import time
+from datetime import timedelta
+
+import jwt as pyjwt
+from flask import current_app, has_app_context
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.host import Host
+from app.models.user import User
+from app.utils.cache import MISSING, MemoryTTLCache
+
+DEFAULTS = {
+    "JWT_REVOCATION_TTL": None,
+    "JWT_REVOCATION_MAX_ENTRIES": 100_000,
+}
+
+# Changes to these columns make earlier tokens stale
+TOKEN_FIELDS = ("is_admin", "type", "password")
+
+# Version refusing every token of a deleted account
+DELETED = float("inf")
+
+_PENDING_KEY = "token_revocations"
+
+
+class TokenService:
+    """
+    Flask extension issuing API tokens and refusing revoked ones.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        app.extensions["token_revocations"] = MemoryTTLCache(
+            max_entries=app.config["JWT_REVOCATION_MAX_ENTRIES"]
+        )
+        app.extensions["token_keys"] = {}
+        manager = app.extensions["flask-jwt-extended"]
+        manager.token_in_blocklist_loader(self.is_revoked)
+        manager.decode_key_loader(lambda header, payload: self._key("decode"))
+        manager.encode_key_loader(lambda identity: self._key("encode"))
+
+    @staticmethod
+    def _store():
+        return current_app.extensions["token_revocations"]
+
+    # ---- Issuing ----
+
+    @staticmethod
+    def claims_for(user):
+        return {
+            "is_admin": bool(user.is_admin),
+            "is_host": isinstance(user, Host) or user.type == "host",
+            "ver": user.token_version or 0,
+        }
+
+    def issue(self, user):
+        """Access and refresh tokens of an account, with its claims."""
+        identity = str(user.id)
+        claims = self.claims_for(user)
+        return {
+            "access_token": create_access_token(identity=identity, additional_claims=claims),
+            "refresh_token": create_refresh_token(identity=identity, additional_claims=claims),
+        }
+
+    # ---- Keys ----
+
+    def _key(self, use):
+        config = current_app.config
+        algorithm = config["JWT_ALGORITHM"]
+        if algorithm.startswith("HS"):
+            raw = config["JWT_SECRET_KEY"]
+        else:
+            raw = config["JWT_PUBLIC_KEY" if use == "decode" else "JWT_PRIVATE_KEY"]
+        keys = current_app.extensions["token_keys"]
+        cache_key = (algorithm, use, raw)
+        if cache_key not in keys:
+            keys[cache_key] = pyjwt.get_algorithm_by_name(algorithm).prepare_key(raw)
+        return keys[cache_key]
+
+    # ---- Revocation ----
+
+    def _ttl(self):
+        config = current_app.config
+        ttl = config["JWT_REVOCATION_TTL"] or config["JWT_REFRESH_TOKEN_EXPIRES"]
+        if isinstance(ttl, timedelta):
+            ttl = ttl.total_seconds()
+        return ttl or 30 * 24 * 3600
+
+    def revoke(self, payload):
+        """Refuse one token (its decoded payload) until it expires."""
+        store = self._store()
+        exp = payload.get("exp")
+        ttl = max(exp - time.time(), 1) if exp else self._ttl()
+        store.set(("jti", payload["jti"]), True, ttl)
+
+    def revoke_user(self, user_id, version):
+        """Refuse the tokens of an account older than `version`."""
+        store = self._store()
+        key = ("user", user_id)
+        if store.get(key, 0) < version:
+            store.set(key, version, self._ttl())
+
+    def is_revoked(self, header, payload):
+        store = self._store()
+        if store.get(("jti", payload.get("jti")), MISSING) is not MISSING:
+            return True
+        return payload.get("ver", 0) < store.get(("user", payload.get("sub")), 0)
+
+
+tokens = TokenService()
+
+
+# ---- Token versions ----
+
+
+@event.listens_for(User, "before_update", propagate=True)
+def _bump_version(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in TOKEN_FIELDS):
+        target.token_version = (target.token_version or 0) + 1
+        session = Session.object_session(target)
+        session.info.setdefault(_PENDING_KEY, {})[target.id] = target.token_version
+
+
+@event.listens_for(User, "after_delete", propagate=True)
+def _deleted(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, {})[target.id] = DELETED
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_revocations(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending and has_app_context():
+        for user_id, version in pending.items():
+            tokens.revoke_user(user_id, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_revocations(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,183 @@
+"""
+uploads.py: Streaming file uploads with early size limits.
+
+Werkzeug hands each file part of a multipart body to a stream factory
+while it parses the request. The `UploadRequest` installed by this
+extension streams every file straight into a temporary file of the upload
+folder, hashing it (SHA-256) and counting its bytes as the chunks arrive,
+so a file is never buffered in memory and its digest costs no second pass.
+
+Limits are enforced while the body is read, before a view runs:
+
+- MAX_CONTENT_LENGTH (Flask) caps a whole request;
+- UPLOAD_MAX_FILE_SIZE caps each file, checked on every chunk written;
+- UPLOAD_MAX_FILES caps the number of files in one request.
+
+Going over any of them aborts the request with 413; pages get a flash
+message and are sent back where they came from, the API gets JSON.
+
+Temporary files are deleted when the request ends, unless `keep()` linked
+them to their final name first (same folder, so no copy is made).
+"""
+
+import hashlib
+import os
+import tempfile
+
+from flask import Request, current_app, flash, jsonify, redirect, request, url_for
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from app.utils.photo_utils import upload_folder
+
+DEFAULTS = {
+    "UPLOAD_MAX_FILE_SIZE": 16 * 1024 * 1024,
+    "UPLOAD_MAX_FILES": 20,
+}
+
+INCOMING = ".incoming"
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of the image types accepted, see sniff()
+SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+class HashedUpload:
+    """
+    Writable temporary file hashing what is written to it. Used as the
+    stream of uploaded files (FileStorage.stream).
+
+    Attributes:
+        size (int): Bytes written.
+        head (bytes): First bytes of the file (see sniff()).
+    """
+
+    def __init__(self, folder, max_size=None):
+        os.makedirs(folder, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=folder, prefix="upload-")
+        self._hash = hashlib.sha256()
+        self.max_size = max_size
+        self.size = 0
+        self.head = b""
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise RequestEntityTooLarge("File is too large.")
+        if len(self.head) < 16:
+            self.head += data[: 16 - len(self.head)]
+        self._hash.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+class UploadRequest(Request):
+    """Request streaming its file parts into HashedUpload files."""
+
+    _file_count = 0
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        config = current_app.config
+        self._file_count += 1
+        if self._file_count > config["UPLOAD_MAX_FILES"]:
+            raise RequestEntityTooLarge("Too many files.")
+        max_size = config["UPLOAD_MAX_FILE_SIZE"]
+        if max_size is not None and content_length and content_length > max_size:
+            raise RequestEntityTooLarge("File is too large.")
+        return HashedUpload(os.path.join(upload_folder(), INCOMING), max_size)
+
+
+class Uploads:
+    """
+    Flask extension installing UploadRequest and the 413 error handler.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        app.request_class = UploadRequest
+        app.register_error_handler(RequestEntityTooLarge, _too_large)
+
+
+uploads = Uploads()
+
+
+def _too_large(e):
+    message = e.description if e.description != RequestEntityTooLarge.description else "Upload is too large."
+    if request.path.startswith("/api/") or not request.referrer:
+        return jsonify({"error": message}), 413
+    flash(message, "error")
+    return redirect(request.referrer or url_for("views.index"))
+
+
+def sniff(stream):
+    """
+    Content type of an image from its first bytes, None if it is not one of
+    the accepted types. The stream is rewound.
+    """
+    head = getattr(stream, "head", None)
+    if head is None:
+        head = stream.read(16)
+        stream.seek(0)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+def digest(stream):
+    """
+    SHA-256 (hex) and size of an uploaded file. Free for a HashedUpload;
+    other streams are read once, in chunks, and rewound.
+
+    Returns:
+        tuple[str, int]
+    """
+    if isinstance(stream, HashedUpload):
+        return stream.sha256, stream.size
+    sha, size = hashlib.sha256(), 0
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+        sha.update(chunk)
+        size += len(chunk)
+    stream.seek(0)
+    return sha.hexdigest(), size
+
+
+def keep(file, path):
+    """
+    Store an uploaded file at `path`: a hard link to its temporary file when
+    streamed by UploadRequest, a copy otherwise. Replaces `path` atomically.
+    """
+    partial = path + ".part"
+    if os.path.exists(partial):
+        os.remove(partial)
+    stream = file.stream
+    try:
+        if not isinstance(stream, HashedUpload):
+            raise OSError("not a streamed upload")
+        stream.flush()
+        os.link(stream.name, partial)
+    except OSError:
+        # Other stream, or a filesystem without hard links
+        file.save(partial)
+        stream.seek(0)
+    os.replace(partial, path)
@@ -0,0 +1,164 @@
+"""
+view_counter.py: Batched page-view counting for places.
+
+Views are counted in memory per process and written back to `places.views`
+as aggregated deltas with one additive statement,
+
+    UPDATE places SET views = views + :n WHERE id = :place_id
+
+executed for every dirty place in a single transaction. Because each
+worker only ever adds its own deltas, several worker processes can flush
+concurrently without losing updates. Flushes happen when the number of
+pending views reaches VIEW_FLUSH_THRESHOLD, every VIEW_FLUSH_INTERVAL
+seconds from a background thread (0 disables it), and at interpreter exit.
+
+Repeated views of the same place by the same viewer within
+VIEW_DEDUP_WINDOW seconds are counted once. Deduplication is per process,
+so a viewer whose requests land on several workers may be counted once
+per worker.
+"""
+
+import atexit
+import threading
+import time
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import text
+
+from app.database import db
+
+DEFAULTS = {
+    "VIEW_FLUSH_INTERVAL": 10.0,
+    "VIEW_FLUSH_THRESHOLD": 100,
+    "VIEW_DEDUP_WINDOW": 30 * 60,
+}
+
+_FLUSH_SQL = text("UPDATE places SET views = views + :n WHERE id = :place_id")
+
+
+class _CounterState:
+    """Per-application buffers, guarded by a single lock."""
+
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.seen = {}
+        self.last_flush = time.monotonic()
+        self.timer = None
+
+
+class ViewCounter:
+    """
+    Flask extension buffering place views and flushing them in batches.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        state = _CounterState(app)
+        app.extensions["view_counter"] = state
+        atexit.register(self._flush_state, state)
+
+    @staticmethod
+    def _state(app=None):
+        return (app or current_app).extensions["view_counter"]
+
+    def record(self, place_id, viewer_key=None):
+        """
+        Count one view of a place.
+
+        Args:
+            place_id (str): The viewed place.
+            viewer_key (str | None): Identifies the viewer (user id or
+                session id) for deduplication; None disables it.
+
+        Returns:
+            bool: True if the view was counted, False if it was a repeat.
+        """
+        state = self._state()
+        config = state.app.config
+        now = time.monotonic()
+        with state.lock:
+            if viewer_key is not None:
+                window = config["VIEW_DEDUP_WINDOW"]
+                key = (place_id, viewer_key)
+                last = state.seen.get(key)
+                if last is not None and now - last < window:
+                    return False
+                state.seen[key] = now
+                if len(state.seen) > 10000:
+                    state.seen = {
+                        k: t for k, t in state.seen.items() if now - t < window
+                    }
+            state.pending[place_id] += 1
+            interval = config["VIEW_FLUSH_INTERVAL"]
+            due = sum(state.pending.values()) >= config["VIEW_FLUSH_THRESHOLD"] or (
+                interval and now - state.last_flush >= interval
+            )
+            self._ensure_timer(state)
+        if due:
+            try:
+                self._flush_state(state)
+            except Exception as e:
+                # Kept for the next flush: a page view must not fail for it
+                state.app.logger.warning("View counter flush failed: %s", e)
+        return True
+
+    def pending(self, place_id):
+        """Views recorded by this process but not yet written back."""
+        state = self._state()
+        with state.lock:
+            return state.pending.get(place_id, 0)
+
+    def flush(self, app=None):
+        """
+        Write all pending deltas to the database.
+
+        Returns:
+            int: Number of views written.
+        """
+        return self._flush_state(self._state(app))
+
+    def _flush_state(self, state):
+        with state.lock:
+            batch, state.pending = state.pending, Counter()
+            state.last_flush = time.monotonic()
+        if not batch:
+            return 0
+        rows = [{"place_id": pid, "n": n} for pid, n in batch.items()]
+        try:
+            with state.app.app_context():
+                with db.engine.begin() as conn:
+                    conn.execute(_FLUSH_SQL, rows)
+        except Exception:
+            # Keep the deltas for the next attempt
+            with state.lock:
+                state.pending.update(batch)
+            raise
+        return sum(batch.values())
+
+    def _ensure_timer(self, state):
+        """Start the periodic flusher on first use (caller holds the lock)."""
+        interval = state.app.config["VIEW_FLUSH_INTERVAL"]
+        if state.timer is not None or not interval:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self._flush_state(state)
+                except Exception as e:
+                    state.app.logger.warning("View counter flush failed: %s", e)
+
+        state.timer = threading.Thread(target=run, name="view-counter", daemon=True)
+        state.timer.start()
+
+
+view_counter = ViewCounter()
@@ -2,23 +2,109 @@
 const YOUR_USER_ID = document.getElementById('your-user-id').textContent;
 const OTHER_USER_ID = document.getElementById('other-user-id').textContent;
 
-async function fetchMessages() {
-  const response = await fetch(`/api/messages/conversation?user_id=${OTHER_USER_ID}`);
-  if (!response.ok) {
+const messagesDiv = document.getElementById('messages');
+const seen = new Set();   // ids of the messages on screen
+let beforeCursor = null;  // older history still to load
+let afterCursor = null;   // newest message on screen
+
+function renderMessage(msg) {
+  const div = document.createElement('div');
+  div.classList.add(msg.sender_id === YOUR_USER_ID ? 'message-sent' : 'message-received');
+  div.textContent = (msg.sender_id === YOUR_USER_ID ? 'You' : 'Them') + ': ' + msg.content;
+  return div;
+}
+
+function appendMessages(messages) {
+  const atBottom = messagesDiv.scrollHeight - messagesDiv.scrollTop <= messagesDiv.clientHeight + 20;
+  messages.forEach(msg => {
+    if (seen.has(msg.id)) return;
+    seen.add(msg.id);
+    messagesDiv.appendChild(renderMessage(msg));
+    afterCursor = msg.cursor;
+  });
+  if (atBottom) messagesDiv.scrollTop = messagesDiv.scrollHeight; // Follow new messages
+}
+
+function prependMessages(messages) {
+  const previousHeight = messagesDiv.scrollHeight;
+  const anchor = olderBtn.nextSibling;
+  messages.forEach(msg => {
+    if (seen.has(msg.id)) return;
+    seen.add(msg.id);
+    messagesDiv.insertBefore(renderMessage(msg), anchor);
+  });
+  // Keep the messages the user was reading in place
+  messagesDiv.scrollTop += messagesDiv.scrollHeight - previousHeight;
+}
+
+async function fetchSlice(params) {
+  const query = new URLSearchParams({user_id: OTHER_USER_ID, ...params});
+  const response = await fetch(`/api/messages/conversation?${query}`);
+  if (!response.ok) throw new Error(`HTTP ${response.status}`);
+  return {
+    messages: await response.json(),
+    before: response.headers.get('X-Before-Cursor'),
+    after: response.headers.get('X-After-Cursor'),
+  };
+}
+
+// "Load older messages" button, shown while there is older history
+const olderBtn = document.createElement('button');
+olderBtn.textContent = 'Load older messages';
+olderBtn.className = 'load-older-btn';
+olderBtn.style.display = 'none';
+messagesDiv.appendChild(olderBtn);
+
+olderBtn.addEventListener('click', async () => {
+  if (!beforeCursor) return;
+  try {
+    const slice = await fetchSlice({before: beforeCursor});
+    prependMessages(slice.messages);
+    beforeCursor = slice.before;
+    olderBtn.style.display = beforeCursor ? '' : 'none';
+  } catch (err) {
+    console.error('Failed to load older messages:', err);
+  }
+});
+
+// Only the newest page on load
+async function loadLatest() {
+  try {
+    const slice = await fetchSlice({});
+    appendMessages(slice.messages);
+    messagesDiv.scrollTop = messagesDiv.scrollHeight;
+    beforeCursor = slice.before;
+    olderBtn.style.display = beforeCursor ? '' : 'none';
+  } catch (err) {
     alert('Failed to load messages');
-    return;
   }
-  const messages = await response.json();
+}
 
-  const messagesDiv = document.getElementById('messages');
-  messagesDiv.innerHTML = ''; // Clear previous messages
-  messages.forEach(msg => {
-    const div = document.createElement('div');
-    div.classList.add(msg.sender_id === YOUR_USER_ID ? 'message-sent' : 'message-received');
-    div.textContent = (msg.sender_id === YOUR_USER_ID ? 'You' : 'Them') + ': ' + msg.content;
-    messagesDiv.appendChild(div);
+// Fallback without Server-Sent Events: fetch what is newer than the cursor
+async function fetchNewer() {
+  try {
+    const slice = await fetchSlice(afterCursor ? {after: afterCursor} : {});
+    appendMessages(slice.messages);
+  } catch (err) {
+    console.error('Failed to fetch new messages:', err);
+  }
+}
+
+// New messages are pushed as they are sent; the browser reconnects by
+// itself and resumes after the last message it received
+function listen() {
+  const query = new URLSearchParams({user_id: OTHER_USER_ID});
+  if (afterCursor) query.set('after', afterCursor);
+  const source = new EventSource(`/api/messages/stream?${query}`);
+  let opened = false;
+  source.addEventListener('open', () => { opened = true; });
+  source.addEventListener('message', e => appendMessages([JSON.parse(e.data)]));
+  source.addEventListener('error', () => {
+    if (!opened || source.readyState === EventSource.CLOSED) {
+      source.close();
+      setInterval(fetchNewer, 5000);
+    }
   });
-  messagesDiv.scrollTop = messagesDiv.scrollHeight; // Auto scroll to bottom
 }
 
 async function sendMessage() {
@@ -36,11 +122,15 @@ async function sendMessage() {
     return;
   }
   input.value = '';
-  fetchMessages(); // Refresh the messages after sending
+  if (!window.EventSource) fetchNewer(); // Otherwise the stream delivers it
 }
 
 document.getElementById('sendBtn').addEventListener('click', sendMessage);
 
-// Load messages on page load and refresh every 5 seconds
-fetchMessages();
-setInterval(fetchMessages, 5000);
+loadLatest().then(() => {
+  if (window.EventSource) {
+    listen();
+  } else {
+    setInterval(fetchNewer, 5000);
+  }
+});
@@ -5,14 +5,84 @@ document.addEventListener('DOMContentLoaded', function () {
   const unreadCountEl = document.getElementById('unread-count');
   const markAllBtn = document.getElementById('mark-all-btn');
 
-  // ✅ Load unread count on page load
+  // ✅ Live unread count: pushed by the server instead of polled
+  let unread = 0;
+  let cursor = null; // id of the newest notification seen
+
+  function setUnread(count) {
+    unread = count;
+    if (unreadCountEl) unreadCountEl.textContent = String(unread);
+  }
+
+  function renderItem(n) {
+    return `
+      <div class="notification-item ${n.status === 'unread' ? 'unread' : ''}">
+        <p>${n.message}</p>
+        <small>${n.timestamp}</small>
+      </div>
+    `;
+  }
+
+  function receive(n) {
+    if (cursor !== null && n.id <= cursor) return; // already seen
+    cursor = n.id;
+    if (n.status === 'unread') setUnread(unread + 1);
+    if (notificationItems && notificationList && notificationList.classList.contains('show')) {
+      notificationItems.insertAdjacentHTML('afterbegin', renderItem(n));
+    }
+  }
+
+  // Server-Sent Events; the browser reconnects by itself and resumes
+  // from the last event id
+  function listen() {
+    const source = new EventSource('/api/v1/notifications/stream');
+    let opened = false;
+    source.addEventListener('open', () => { opened = true; });
+    source.addEventListener('unread', e => {
+      const data = JSON.parse(e.data);
+      cursor = Math.max(cursor || 0, data.cursor);
+      setUnread(data.unread_count);
+    });
+    source.addEventListener('notification', e => receive(JSON.parse(e.data)));
+    source.addEventListener('error', () => {
+      // Never connected (e.g. a proxy buffering the stream): long-poll instead
+      if (!opened || source.readyState === EventSource.CLOSED) {
+        source.close();
+        longPoll();
+      }
+    });
+  }
+
+  // Long polling with a `since` cursor, for browsers or networks without SSE
+  async function longPoll() {
+    while (true) {
+      try {
+        const url = cursor === null
+          ? '/api/v1/notifications/poll'
+          : `/api/v1/notifications/poll?since=${cursor}`;
+        const res = await fetch(url);
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const data = await res.json();
+        if (cursor === null) {
+          setUnread(data.unread_count);
+          cursor = data.cursor;
+        } else {
+          data.notifications.forEach(receive);
+          cursor = Math.max(cursor, data.cursor);
+        }
+      } catch (err) {
+        console.error('Notification poll error:', err);
+        await new Promise(resolve => setTimeout(resolve, 5000));
+      }
+    }
+  }
+
   if (unreadCountEl) {
-    fetch('/api/v1/notifications/unread_count')
-      .then(res => res.json())
-      .then(data => {
-        unreadCountEl.textContent = data.unread_count || '0';
-      })
-      .catch(err => console.error('Unread count error:', err));
+    if (window.EventSource) {
+      listen();
+    } else {
+      longPoll();
+    }
   }
 
   // ✅ Toggle dropdown and fetch notifications
@@ -24,12 +94,7 @@ document.addEventListener('DOMContentLoaded', function () {
         fetch('/api/v1/notifications/')
           .then(res => res.json())
           .then(data => {
-            const html = data.notifications.map(n => `
-              <div class="notification-item ${n.status === 'unread' ? 'unread' : ''}">
-                <p>${n.message}</p>
-                <small>${n.timestamp}</small>
-              </div>
-            `).join('');
+            const html = data.notifications.map(renderItem).join('');
             notificationItems.innerHTML = html || '<p>No notifications.</p>';
           })
           .catch(err => {
@@ -49,7 +114,7 @@ document.addEventListener('DOMContentLoaded', function () {
       })
         .then(res => res.json())
         .then(data => {
-          if (unreadCountEl) unreadCountEl.textContent = '0';
+          setUnread(0);
           alert(data.message || 'Marked all as read.');
         })
         .catch(err => {
@@ -69,14 +134,7 @@ document.addEventListener('DOMContentLoaded', function () {
       })
         .then(res => res.json())
         .then(data => {
-          // Refresh unread count
-          if (unreadCountEl) {
-            fetch('/api/v1/notifications/unread_count')
-              .then(r => r.json())
-              .then(data => {
-                unreadCountEl.textContent = data.unread_count;
-              });
-          }
+          // The unread count updates itself from the notification stream
           alert(data.message);
         })
         .catch(err => {
@@ -71,7 +71,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
   // Function to fetch places based on lat and lon
   async function fetchPlaces(lat, lon) {
-    const radius = 5000;  // Radius in meters (5 km)
+    const radius = 5;  // Radius in km (the API expects kilometers)
     const url = `/places/api?lat=${lat}&lon=${lon}&radius=${radius}`;
     
     try {
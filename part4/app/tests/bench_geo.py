@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+Benchmark the vectorized haversine engine against a scalar loop.
+
+Times a radius filter plus distance sort over 100k random points, first
+with the per-point math-module loop the routes used to run, then with
+app.utils.geo.
+
+Usage: python -m app.tests.bench_geo [points]
+"""
+
+import math
+import statistics
+import time
+from sys import argv
+
+import numpy as np
+
+from app.utils.geo import sort_by_distance, within_radius
+
+ORIGIN = (48.8566, 2.3522)
+RADIUS_KM = 500
+RUNS = 5
+
+
+class _Point:
+    __slots__ = ("latitude", "longitude")
+
+    def __init__(self, latitude, longitude):
+        self.latitude = latitude
+        self.longitude = longitude
+
+
+def scalar_haversine(lat1, lon1, lat2, lon2):
+    R = 6371
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(math.radians(lat1))
+        * math.cos(math.radians(lat2))
+        * math.sin(dlon / 2) ** 2
+    )
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return R * c
+
+
+def scalar(points):
+    hits = []
+    for p in points:
+        d = scalar_haversine(ORIGIN[0], ORIGIN[1], p.latitude, p.longitude)
+        if d <= RADIUS_KM:
+            hits.append((p, d))
+    hits.sort(key=lambda pair: pair[1])
+    return hits
+
+
+def _time(fn, *args):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def bench(n):
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(35, 60, n)
+    lons = rng.uniform(-10, 20, n)
+    points = [_Point(a, b) for a, b in zip(lats.tolist(), lons.tolist())]
+
+    loop_ms, expected = _time(scalar, points)
+    sorted_ms, result = _time(sort_by_distance, points, *ORIGIN, RADIUS_KM)
+    mask_ms, (_, mask) = _time(within_radius, *ORIGIN, lats, lons, RADIUS_KM)
+    assert [p for p, _ in result] == [p for p, _ in expected]
+    assert int(mask.sum()) == len(expected)
+
+    print(f"points: {n}, within {RADIUS_KM} km: {len(expected)}")
+    print(f"  scalar loop + sort         {loop_ms:9.2f} ms")
+    print(f"  sort_by_distance (objects) {sorted_ms:9.2f} ms  x{loop_ms / sorted_ms:.1f}")
+    print(f"  within_radius (arrays)     {mask_ms:9.2f} ms  x{loop_ms / mask_ms:.1f}")
+
+
+if __name__ == "__main__":
+    bench(int(argv[1]) if len(argv) > 1 else 100_000)
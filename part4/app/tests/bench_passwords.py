@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Benchmark password verification, the CPU cost of a login.
+
+For each hashing method, times verifications on one thread (logins per
+second per core), then a burst of them spread over a process pool the size
+of PASSWORD_WORKERS, as app.services.passwords runs them.
+
+Usage: python -m app.tests.bench_passwords [workers] [method ...]
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from sys import argv
+
+from app.services.passwords import hash_password, verify_password
+
+METHODS = ["pbkdf2:sha256:600000", "scrypt:32768:8:1", "bcrypt:12"]
+SECONDS = 2.0
+PASSWORD = "correct horse battery staple"
+
+
+def per_core(stored):
+    """Verifications per second on one thread."""
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < SECONDS:
+        assert verify_password(stored, PASSWORD)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def pooled(pool, stored, n):
+    """Verifications per second of a burst of `n` over the pool."""
+    start = time.perf_counter()
+    results = list(pool.map(verify_password, [stored] * n, [PASSWORD] * n))
+    assert all(results)
+    return n / (time.perf_counter() - start)
+
+
+def bench(workers, methods):
+    print(f"cores: {os.cpu_count()}, pool workers: {workers}")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        # Start the workers before timing
+        list(pool.map(verify_password, [""] * workers, [""] * workers))
+        for method in methods:
+            stored = hash_password(PASSWORD, method)
+            single = per_core(stored)
+            burst = pooled(pool, stored, max(int(single * SECONDS), workers) * workers)
+            print(
+                f"  {method:22} {1000 / single:7.1f} ms/login  "
+                f"{single:7.1f} logins/s/core  {burst:7.1f} logins/s over {workers} processes"
+            )
+
+
+if __name__ == "__main__":
+    workers = int(argv[1]) if len(argv) > 1 else min(4, os.cpu_count() or 1)
+    bench(workers, argv[2:] or METHODS)
@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+"""
+Benchmark radius search latency against catalog size.
+
+Keeps a fixed cluster of listings around Paris and grows the rest of the
+catalog elsewhere in the world, then times a 20 km search around Paris with
+the geohash-indexed path and with the former full-table scan.
+
+Usage: python -m app.tests.bench_spatial [max_catalog_size]
+"""
+
+import random
+import statistics
+import time
+import uuid
+from sys import argv
+
+from app import create_app, db
+from app.models.place import Place
+from app.services.facade import HBnBFacade
+from app.utils.geo import encode_geohash, haversine, sort_by_distance
+
+PARIS = (48.8566, 2.3522)
+RADIUS_KM = 20
+LOCAL_LISTINGS = 200
+RUNS = 25
+
+
+def _row(lat, lon):
+    return {
+        "id": str(uuid.uuid4()),
+        "title": "bench",
+        "description": "bench",
+        "price": 42.0,
+        "latitude": lat,
+        "longitude": lon,
+        "capacity": 2,
+        "views": 0,
+        "geohash": encode_geohash(lat, lon),
+    }
+
+
+def _insert(rows):
+    db.session.execute(Place.__table__.insert(), rows)
+    db.session.commit()
+
+
+def _grow_to(size, current):
+    rng = random.Random(size)
+    rows = []
+    for _ in range(size - current):
+        lat = rng.uniform(-60, 70)
+        lon = rng.uniform(-180, 180)
+        if haversine(PARIS[0], PARIS[1], lat, lon) > 2 * RADIUS_KM:
+            rows.append(_row(lat, lon))
+    _insert(rows)
+    return current + len(rows)
+
+
+def _time(fn):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def full_scan():
+    places = HBnBFacade().geocoded_places_query().all()
+    return sort_by_distance(places, *PARIS, RADIUS_KM)
+
+
+def bench(max_size):
+    app = create_app("config.TestingConfig")
+    facade = HBnBFacade()
+    with app.app_context():
+        db.create_all()
+        rng = random.Random(0)
+        _insert(
+            [
+                _row(PARIS[0] + rng.uniform(-0.1, 0.1), PARIS[1] + rng.uniform(-0.1, 0.1))
+                for _ in range(LOCAL_LISTINGS)
+            ]
+        )
+        size = LOCAL_LISTINGS
+        print(f"{'catalog':>10} {'indexed (ms)':>14} {'full scan (ms)':>16} {'hits':>6}")
+        target = 1_000
+        while target <= max_size:
+            size = _grow_to(target, size)
+            hits = len(facade.places_within_radius(*PARIS, RADIUS_KM))
+            indexed = _time(lambda: facade.places_within_radius(*PARIS, RADIUS_KM))
+            scan = _time(full_scan)
+            db.session.expunge_all()
+            print(f"{size:>10} {indexed:>14.2f} {scan:>16.2f} {hits:>6}")
+            target *= 10
+
+
+if __name__ == "__main__":
+    bench(int(argv[1]) if len(argv) > 1 else 100_000)
@@ -0,0 +1,143 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+
+
+def pytest_configure(config):
+    """
+    Register custom markers for grouping tests.
+    """
+    config.addinivalue_line("markers", "api: mark API tests")
+    config.addinivalue_line("markers", "facade: mark Facade tests")
+    config.addinivalue_line("markers", "utils: mark utility module tests")
+
+
+@pytest.fixture(scope="module")
+def app():
+    """
+    Provide an application bound to a fresh in-memory database.
+    """
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope="module")
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        yield
+        db.session.rollback()
+
+
+@pytest.fixture
+def host(ctx):
+    """
+    Persist and return a Host that owns the places created in tests.
+    """
+    import uuid
+    from app.models.host import Host
+
+    host = Host(
+        first_name="Host",
+        last_name="Test",
+        email=f"host-{uuid.uuid4().hex[:8]}@example.com",
+    )
+    host.set_password("hostpass")
+    db.session.add(host)
+    db.session.commit()
+    return host
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Context manager collecting the SQL statements run inside its block
+    (needs an app context):
+
+        with count_queries() as statements:
+            ...
+    """
+
+    @contextmanager
+    def counting():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return counting
+
+
+@pytest.fixture
+def make_place():
+    """
+    Factory persisting a place listed by `host`:
+
+        place = make_place(host, "Title", latitude, longitude, price=..., views=...)
+    """
+    import uuid
+    from app.models.place import Place
+
+    def create(host, title=None, latitude=1.0, longitude=1.0, price=50.0, capacity=2, views=0):
+        place = Place(
+            title=title or f"Listing {uuid.uuid4().hex[:6]}",
+            description="Test listing",
+            price=price,
+            latitude=latitude,
+            longitude=longitude,
+            capacity=capacity,
+            host_id=host.id,
+            views=views,
+        )
+        db.session.add(place)
+        db.session.commit()
+        return place
+
+    return create
+
+
+@pytest.fixture
+def book():
+    """
+    Factory booking `place` for `guest` through the facade (availability
+    checked); `status` then replaces "pending":
+
+        booking = book(place, guest, start, end, status="accepted")
+    """
+    from app.services.facade import facade
+
+    def create(place, guest, start, end, status=None):
+        booking = facade.create_booking(
+            {
+                "user_id": guest.id,
+                "place_id": place.id,
+                "start_date": start,
+                "end_date": end,
+                "guest_count": 1,
+            }
+        )
+        if status is not None:
+            booking.status = status
+            db.session.commit()
+        return booking
+
+    return create
@@ -0,0 +1,70 @@
+from datetime import date
+
+import pytest
+
+from app import db
+from app.services.availability import PlaceCalendar, availability
+
+
+@pytest.mark.utils
+class TestPlaceCalendar:
+    def test_ranges_across_new_year(self):
+        cal = PlaceCalendar()
+        cal.mark(date(2030, 12, 30), date(2031, 1, 2))
+        assert not cal.is_free(date(2031, 1, 1), date(2031, 1, 5))
+        assert cal.is_free(date(2031, 1, 2), date(2031, 1, 5))
+        assert cal.booked_ranges(date(2030, 12, 1), date(2031, 2, 1)) == [
+            (date(2030, 12, 30), date(2031, 1, 2))
+        ]
+
+    def test_leap_day_and_unmark(self):
+        cal = PlaceCalendar()
+        cal.mark(date(2032, 2, 28), date(2032, 3, 2))
+        assert cal.occupancy(date(2032, 2, 27), date(2032, 3, 3)).tolist() == [
+            False, True, True, True, False
+        ]
+        cal.mark(date(2032, 2, 29), date(2032, 3, 1), booked=False)
+        assert cal.booked_ranges(date(2032, 2, 1), date(2032, 4, 1)) == [
+            (date(2032, 2, 28), date(2032, 2, 29)),
+            (date(2032, 3, 1), date(2032, 3, 2)),
+        ]
+
+
+@pytest.mark.api
+class TestAvailabilityApi:
+    def test_calendar_follows_booking_changes(self, client, host, make_place, book):
+        place = make_place(host)
+        booking = book(place, host, date(2030, 7, 3), date(2030, 7, 6))
+
+        url = f"/api/v1/places/{place.id}/availability?start=2030-07-01&end=2030-07-11"
+        data = client.get(url).get_json()
+        assert data["available"] is False
+        assert data["free_nights"] == 7
+        assert data["booked"] == [{"check_in": "2030-07-03", "check_out": "2030-07-06"}]
+
+        booking.status = "declined"
+        db.session.commit()
+        data = client.get(url).get_json()
+        assert data["available"] is True
+        assert data["booked"] == []
+
+    def test_bulk_filter_on_place_list(self, client, host, make_place, book):
+        free = make_place(host)
+        taken = make_place(host)
+        book(taken, host, date(2030, 8, 1), date(2030, 8, 4))
+
+        assert availability.available_places(
+            [free.id, taken.id], date(2030, 8, 2), date(2030, 8, 3)
+        ) == {free.id}
+        ids = {
+            p["id"]
+            for p in client.get(
+                "/api/v1/places/?check_in=2030-08-02&check_out=2030-08-05"
+            ).get_json()
+        }
+        assert free.id in ids and taken.id not in ids
+
+    def test_invalid_range(self, client, host, make_place):
+        place = make_place(host)
+        url = f"/api/v1/places/{place.id}/availability?start=2030-07-10&end=2030-07-01"
+        assert client.get(url).status_code == 400
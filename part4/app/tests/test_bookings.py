@@ -0,0 +1,96 @@
+import threading
+import time
+from datetime import date, datetime
+
+import pytest
+
+from app import create_app, db
+from app.models.booking import Booking
+from app.models.host import Host
+from app.models.place import Place
+from app.services.facade import BookingConflictError, facade
+from config import TestingConfig
+
+
+@pytest.mark.facade
+class TestBookingAvailability:
+    def test_overlap_is_rejected(self, host, make_place, book):
+        place = make_place(host)
+        booking = book(place, host, date(2030, 7, 1), date(2030, 7, 5))
+        assert booking.start_date == datetime(2030, 7, 1)
+        assert booking.total_price == 200.0
+
+        with pytest.raises(BookingConflictError):
+            book(place, host, "2030-07-04", "2030-07-08")
+
+    def test_back_to_back_stays_are_allowed(self, host, make_place, book):
+        place = make_place(host)
+        book(place, host, date(2030, 8, 1), date(2030, 8, 5))
+        assert book(place, host, date(2030, 8, 5), date(2030, 8, 7))
+        assert book(place, host, date(2030, 7, 28), date(2030, 8, 1))
+
+    def test_declined_bookings_free_the_dates(self, host, make_place, book):
+        place = make_place(host)
+        book(place, host, date(2030, 9, 1), date(2030, 9, 5), status="declined")
+        assert book(place, host, date(2030, 9, 2), date(2030, 9, 3))
+
+    def test_update_rechecks_dates(self, host, make_place, book):
+        place = make_place(host)
+        book(place, host, date(2030, 10, 1), date(2030, 10, 5))
+        later = book(place, host, date(2030, 10, 10), date(2030, 10, 12))
+        with pytest.raises(BookingConflictError):
+            facade.update_booking(later.id, {"start_date": date(2030, 10, 4)})
+        moved = facade.update_booking(later.id, {"start_date": date(2030, 10, 6)})
+        assert moved.start_date == datetime(2030, 10, 6)
+
+
+@pytest.mark.facade
+def test_concurrent_requests_cannot_double_book(tmp_path, monkeypatch, make_place, book):
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'bookings.db'}"
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+        host = Host(first_name="H", last_name="T", email="host@example.com")
+        host.set_password("hostpass")
+        db.session.add(host)
+        db.session.commit()
+        host_id, place_id = host.id, make_place(host).id
+
+    # Widen the window between the overlap check and the insert
+    check = facade.find_booking_conflict
+
+    def slow_check(*args, **kwargs):
+        result = check(*args, **kwargs)
+        time.sleep(0.3)
+        return result
+
+    monkeypatch.setattr(facade, "find_booking_conflict", slow_check)
+
+    outcomes = []
+
+    def request():
+        with app.app_context():
+            try:
+                book(
+                    db.session.get(Place, place_id),
+                    db.session.get(Host, host_id),
+                    date(2030, 7, 1),
+                    date(2030, 7, 3),
+                )
+                outcomes.append("booked")
+            except BookingConflictError:
+                outcomes.append("conflict")
+
+    threads = [threading.Thread(target=request) for _ in range(2)]
+    for t in threads:
+        t.start()
+        time.sleep(0.1)
+    for t in threads:
+        t.join()
+
+    assert sorted(outcomes) == ["booked", "conflict"]
+    with app.app_context():
+        assert Booking.query.filter_by(place_id=place_id).count() == 1
+        db.engine.dispose()
@@ -0,0 +1,111 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.models.message import Message
+from app.models.user import User
+
+
+@pytest.fixture
+def pair(app, host):
+    """A logged-in client for `host`, the host's id and a correspondent's id."""
+    guest = User(first_name="Chat", last_name="Guest", email=f"guest-{uuid.uuid4().hex[:8]}@example.com")
+    guest.set_password("guestpass")
+    db.session.add(guest)
+    db.session.commit()
+    client = app.test_client()
+    client.post("/auth/login", data={"email": host.email, "password": "hostpass"})
+    yield client, host.id, guest.id
+    Message.query.filter(Message.receiver_id.in_([host.id, guest.id])).delete()
+    db.session.commit()
+
+
+def exchange(a, b, count, start=datetime(2030, 1, 1)):
+    """`count` messages alternating between a and b, one minute apart."""
+    for n in range(count):
+        sender, receiver = (a, b) if n % 2 == 0 else (b, a)
+        db.session.add(
+            Message(
+                sender_id=sender,
+                receiver_id=receiver,
+                content=f"m{n}",
+                timestamp=start + timedelta(minutes=n),
+            )
+        )
+    db.session.commit()
+
+
+def contents(response):
+    return [m["content"] for m in response.get_json()]
+
+
+@pytest.mark.api
+class TestConversationSlices:
+    def test_newest_page_then_older_history(self, pair):
+        client, me, other = pair
+        exchange(me, other, 5)
+        url = f"/api/messages/conversation?user_id={other}&limit=2"
+
+        newest = client.get(url)
+        assert contents(newest) == ["m3", "m4"]
+        older = client.get(f"{url}&before={newest.headers['X-Before-Cursor']}")
+        assert contents(older) == ["m1", "m2"]
+        oldest = client.get(f"{url}&before={older.headers['X-Before-Cursor']}")
+        assert contents(oldest) == ["m0"]
+        assert "X-Before-Cursor" not in oldest.headers
+
+    def test_only_messages_after_the_cursor(self, pair):
+        client, me, other = pair
+        exchange(me, other, 2)
+        url = f"/api/messages/conversation?user_id={other}"
+        cursor = client.get(url).headers["X-After-Cursor"]
+
+        assert contents(client.get(f"{url}&after={cursor}")) == []
+        exchange(other, me, 1, start=datetime(2030, 2, 1))
+        newer = client.get(f"{url}&after={cursor}")
+        assert contents(newer) == ["m0"]
+        assert newer.headers["X-After-Cursor"] != cursor
+
+    def test_bad_cursor(self, pair):
+        client, _, other = pair
+        url = f"/api/messages/conversation?user_id={other}&after=garbage"
+        assert client.get(url).status_code == 400
+
+    def test_both_directions_use_the_conversation_index(self, pair):
+        _, me, other = pair
+        plan = db.session.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT id FROM messages WHERE "
+                "(sender_id = :a AND receiver_id = :b) OR (sender_id = :b AND receiver_id = :a) "
+                "ORDER BY timestamp DESC LIMIT 50"
+            ),
+            {"a": me, "b": other},
+        ).all()
+        assert sum("ix_messages_conversation" in row[-1] for row in plan) == 2
+
+
+@pytest.mark.api
+def test_stream_pushes_new_messages(pair):
+    client, me, other = pair
+    response = client.get(f"/api/messages/stream?user_id={other}", buffered=False)
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b"retry:")
+
+    # Messages with someone else are not part of this conversation
+    db.session.add(Message(sender_id=me, receiver_id=me, content="note to self"))
+    db.session.add(Message(sender_id=other, receiver_id=me, content="hello"))
+    db.session.commit()
+
+    chunk = next(chunks).decode()
+    while chunk.startswith(":"):
+        chunk = next(chunks).decode()
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    assert fields["event"] == "message"
+    message = json.loads(fields["data"])
+    assert message["content"] == "hello"
+    assert fields["id"] == message["cursor"]
+    response.close()
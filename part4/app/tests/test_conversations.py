@@ -0,0 +1,144 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.models.user import User
+from app.services import conversations
+
+
+def make_user(name):
+    user = User(first_name=name, last_name="Test", email=f"{name.lower()}-{uuid.uuid4().hex[:8]}@example.com")
+    user.set_password("secret")
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+@pytest.fixture
+def inbox(app, host):
+    """A logged-in client for `host`, the host's id and two correspondents."""
+    alice, bob = make_user("Alice"), make_user("Bob")
+    client = app.test_client()
+    client.post("/auth/login", data={"email": host.email, "password": "hostpass"})
+    yield client, host.id, alice, bob
+    ids = [host.id, alice, bob]
+    Message.query.filter(Message.receiver_id.in_(ids)).delete()
+    Conversation.query.filter(Conversation.user_a_id.in_(ids)).delete()
+    db.session.commit()
+
+
+def conversation(a, b):
+    db.session.expire_all()
+    user_a_id, user_b_id = Conversation.pair(a, b)
+    return Conversation.query.filter_by(user_a_id=user_a_id, user_b_id=user_b_id).one()
+
+
+@pytest.mark.api
+class TestMaintainedConversations:
+    def test_both_send_endpoints_update_the_pair(self, app, inbox):
+        client, me, alice, _ = inbox
+        client.post("/api/messages", json={"receiver_id": alice, "content": "Hello Alice"})
+        token = create_access_token(identity=alice)
+        response = client.post(
+            "/api/v1/messages",
+            json={"receiver_id": me, "content": "Hi!"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 201
+
+        row = conversation(me, alice)
+        assert (row.last_preview, row.last_sender_id) == ("Hi!", alice)
+        assert row.unread_for(me) == row.unread_for(alice) == 1
+        assert Conversation.query.filter(Conversation.user_a_id.in_([me, alice])).count() == 1
+
+    def test_late_message_only_counts_as_unread(self, inbox):
+        _, me, alice, _ = inbox
+        db.session.add(Message(sender_id=alice, receiver_id=me, content="new", timestamp=datetime(2030, 1, 2)))
+        db.session.add(Message(sender_id=alice, receiver_id=me, content="old", timestamp=datetime(2030, 1, 1)))
+        db.session.commit()
+        row = conversation(me, alice)
+        assert (row.last_preview, row.unread_for(me)) == ("new", 2)
+
+    def test_opening_the_chat_marks_it_read(self, inbox):
+        client, me, alice, _ = inbox
+        db.session.add(Message(sender_id=alice, receiver_id=me, content="ping"))
+        db.session.commit()
+        assert conversations.unread_total(me) == 1
+
+        assert client.get(f"/chat/{alice}").status_code == 200
+        assert conversations.unread_total(me) == 0
+        assert conversation(me, alice).unread_for(me) == 0
+        assert Message.query.filter_by(receiver_id=me, is_read=False).count() == 0
+
+    def test_rebuild_matches_maintained_rows(self, inbox):
+        _, me, alice, bob = inbox
+        for sender, receiver, text in [(me, alice, "a"), (alice, me, "b"), (bob, me, "c"), (bob, me, "d")]:
+            db.session.add(Message(sender_id=sender, receiver_id=receiver, content=text))
+            db.session.commit()
+
+        def snapshot():
+            db.session.expire_all()
+            rows = Conversation.query.order_by(Conversation.user_a_id, Conversation.user_b_id).all()
+            return [
+                (r.user_a_id, r.user_b_id, r.last_message_id, r.last_preview, r.unread_a, r.unread_b)
+                for r in rows
+            ]
+
+        maintained = snapshot()
+        conversations.rebuild_all()
+        assert snapshot() == maintained
+
+
+@pytest.mark.api
+def test_inbox_is_one_page_by_recency(inbox):
+    client, me, alice, bob = inbox
+    db.session.add(Message(sender_id=alice, receiver_id=me, content="From Alice", timestamp=datetime(2030, 1, 1)))
+    db.session.add(Message(sender_id=me, receiver_id=bob, content="To Bob", timestamp=datetime(2030, 1, 2)))
+    db.session.commit()
+
+    first = client.get("/messages?limit=1").get_data(as_text=True)
+    assert "You: To Bob" in first and "From Alice" not in first
+    assert "Older conversations" in first
+
+    page = conversations.inbox(me, limit=1)
+    second = client.get(f"/messages?limit=1&cursor={page.next_cursor}").get_data(as_text=True)
+    assert "From Alice" in second and 'class="unread-badge">1<' in second
+    assert "Older conversations" not in second
+
+
+@pytest.mark.api
+def test_deleted_user_conversations_go_to_the_default_user(inbox):
+    client, me, alice, bob = inbox
+    host = db.session.get(User, me)
+    host.is_admin = True
+    db.session.commit()
+    db.session.add(Message(sender_id=alice, receiver_id=bob, content="From Alice"))
+    db.session.add(Message(sender_id=alice, receiver_id=me, content="Also from Alice"))
+    db.session.commit()
+
+    response = client.post(f"/admin/delete_user/{alice}")
+    assert response.status_code == 302
+    row = conversation(bob, "default-user-id")
+    assert (row.last_preview, row.unread_for(bob)) == ("From Alice", 1)
+    assert Conversation.query.filter(
+        (Conversation.user_a_id == alice) | (Conversation.user_b_id == alice)
+    ).count() == 0
+
+    def snapshot():
+        db.session.expire_all()
+        rows = Conversation.query.order_by(Conversation.user_a_id, Conversation.user_b_id).all()
+        return [(r.user_a_id, r.user_b_id, r.last_message_id, r.unread_a, r.unread_b) for r in rows]
+
+    maintained = snapshot()
+    conversations.rebuild_all()
+    assert snapshot() == maintained
+    Message.query.filter_by(sender_id="default-user-id").delete()
+    Conversation.query.filter(
+        (Conversation.user_a_id == "default-user-id") | (Conversation.user_b_id == "default-user-id")
+    ).delete()
+    db.session.commit()
@@ -0,0 +1,119 @@
+import math
+
+import pytest
+from app import db
+from app.services.facade import HBnBFacade
+from app.utils.geo import (
+    EARTH_RADIUS_KM,
+    bounding_box,
+    covering_geohashes,
+    encode_geohash,
+    haversine,
+    haversine_distances,
+    sort_by_distance,
+    within_radius,
+)
+
+PARIS = (48.8566, 2.3522)
+
+
+def destination(lat, lon, bearing, distance_km):
+    """The point `distance_km` from (lat, lon) along `bearing` (degrees)."""
+    lat1, lon1, theta = map(math.radians, (lat, lon, bearing))
+    delta = distance_km / EARTH_RADIUS_KM
+    lat2 = math.asin(
+        math.sin(lat1) * math.cos(delta) + math.cos(lat1) * math.sin(delta) * math.cos(theta)
+    )
+    lon2 = lon1 + math.atan2(
+        math.sin(theta) * math.sin(delta) * math.cos(lat1),
+        math.cos(delta) - math.sin(lat1) * math.sin(lat2),
+    )
+    return math.degrees(lat2), math.degrees(lon2)
+
+
+@pytest.mark.utils
+class TestGeohash:
+    def test_encode_known_value(self):
+        assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_cover_contains_points_inside_radius(self):
+        lat, lon = PARIS
+        cells = covering_geohashes(bounding_box(lat, lon, 20))
+        assert cells and len(cells) <= 32
+        for dlat, dlon in [(0, 0), (0.15, 0.2), (-0.17, -0.2), (0.1, -0.25)]:
+            point = (lat + dlat, lon + dlon)
+            if haversine(lat, lon, *point) <= 20:
+                gh = encode_geohash(*point)
+                assert any(gh.startswith(c) for c in cells)
+
+    def test_cover_across_antimeridian(self):
+        cells = covering_geohashes(bounding_box(0.0, 179.95, 30))
+        east = encode_geohash(0.0, 179.99)
+        west = encode_geohash(0.0, -179.99)
+        assert any(east.startswith(c) for c in cells)
+        assert any(west.startswith(c) for c in cells)
+
+    def test_huge_radius_disables_prefix_filter(self):
+        assert covering_geohashes(bounding_box(0.0, 0.0, 20000)) is None
+
+
+@pytest.mark.utils
+class TestDistanceEngine:
+    def test_vectorized_matches_known_distance(self):
+        # Paris -> London is ~343.5 km
+        d = haversine_distances(*PARIS, [51.5074, 48.8566], [-0.1278, 2.3522])
+        assert d[0] == pytest.approx(343.5, abs=1.0)
+        assert d[1] == pytest.approx(0.0)
+        assert haversine(*PARIS, 51.5074, -0.1278) == pytest.approx(d[0])
+
+    def test_within_radius_mask(self):
+        _, mask = within_radius(*PARIS, [48.86, 51.5074], [2.35, -0.1278], 20)
+        assert mask.tolist() == [True, False]
+
+    def test_sort_by_distance_orders_and_filters(self):
+        class P:
+            def __init__(self, name, lat, lon):
+                self.name, self.latitude, self.longitude = name, lat, lon
+
+        items = [P("far", 45.764, 4.8357), P("near", 48.857, 2.353), P("mid", 48.80, 2.12)]
+        ranked = sort_by_distance(items, *PARIS, radius_km=50)
+        assert [p.name for p, _ in ranked] == ["near", "mid"]
+        assert ranked[0][1] < ranked[1][1]
+        assert sort_by_distance([], *PARIS) == []
+
+
+@pytest.mark.facade
+class TestRadiusSearch:
+    def test_geohash_maintained_on_insert_and_update(self, host, make_place):
+        place = make_place(host, "Louvre loft", *PARIS)
+        assert place.geohash == encode_geohash(*PARIS)
+
+        place.latitude, place.longitude = 45.764, 4.8357  # Lyon
+        db.session.commit()
+        assert place.geohash == encode_geohash(45.764, 4.8357)
+
+    def test_places_within_radius(self, host, make_place):
+        near = make_place(host, "Marais studio", 48.8590, 2.3620)
+        edge = make_place(host, "Versailles house", 48.8049, 2.1204)
+        far = make_place(host, "Lyon flat", 45.7640, 4.8357)
+
+        found = HBnBFacade().places_within_radius(*PARIS, 20)
+        ids = [p.id for p in found]
+        assert near.id in ids
+        assert edge.id in ids
+        assert far.id not in ids
+        # Nearest first
+        assert ids.index(near.id) < ids.index(edge.id)
+
+    def test_points_just_inside_the_radius_are_found(self, host, make_place):
+        # Due north/south reach the box's latitude edges, due east/west come
+        # close to its longitude edges
+        places = [
+            make_place(host, f"Edge {bearing}", *destination(*PARIS, bearing, 19.99))
+            for bearing in (0, 90, 180, 270)
+        ]
+        outside = make_place(host, "Just outside", *destination(*PARIS, 0, 20.01))
+
+        ids = {p.id for p in HBnBFacade().places_within_radius(*PARIS, 20)}
+        assert {p.id for p in places} <= ids
+        assert outside.id not in ids
@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from app.utils.cache import MISSING, SQLiteTTLCache
+from app.utils.geocode import geocoder, normalize_query
+
+KNOWN = {"paris france": ("48.8566", "2.3522")}
+
+
+class _NominatimStandIn(BaseHTTPRequestHandler):
+    """Answers /search like Nominatim; '/slow' sleeps past the client timeout."""
+
+    hits = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query).get("q", [""])[0]
+        self.hits.append(query)
+        if url.path == "/slow":
+            time.sleep(0.5)
+        coords = KNOWN.get(normalize_query(query))
+        body = json.dumps([{"lat": coords[0], "lon": coords[1]}] if coords else [])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def upstream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _NominatimStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture
+def geo(app, ctx, upstream, tmp_path):
+    _NominatimStandIn.hits.clear()
+    app.config.update(
+        GEOCODER_URL=f"{upstream}/search",
+        GEOCODER_TIMEOUT=0.2,
+        GEOCODE_CACHE_PATH=str(tmp_path / "geocode.sqlite"),
+    )
+    return _NominatimStandIn.hits
+
+
+@pytest.mark.utils
+class TestSQLiteTTLCache:
+    def test_ttl_expiry(self, tmp_path):
+        cache = SQLiteTTLCache(str(tmp_path / "c.sqlite"))
+        cache.set("k", [1, 2], ttl=0.05)
+        assert cache.get("k") == [1, 2]
+        time.sleep(0.1)
+        assert cache.get("k") is MISSING
+
+    def test_lru_eviction(self, tmp_path):
+        cache = SQLiteTTLCache(str(tmp_path / "c.sqlite"), max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3, ttl=60)
+        assert len(cache) == 2
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+
+
+@pytest.mark.utils
+class TestGeocoder:
+    def test_normalize_query(self):
+        assert normalize_query("  Paris,   FRANCE ") == "paris france"
+        assert normalize_query("Montréal") == "montreal"
+
+    def test_positive_results_are_cached(self, geo):
+        assert geocoder.geocode("Paris, France") == (48.8566, 2.3522)
+        assert geocoder.geocode("paris  france") == (48.8566, 2.3522)
+        assert len(geo) == 1
+
+    def test_negative_results_are_cached(self, geo):
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                geocoder.geocode("Atlantis")
+        assert len(geo) == 1
+
+    def test_timeout_is_enforced_and_not_cached(self, app, geo, upstream):
+        app.config["GEOCODER_URL"] = f"{upstream}/slow"
+        with pytest.raises(requests.Timeout):
+            geocoder.geocode("Paris, France")
+        assert geocoder.cache().get("paris france") is MISSING
+
+    def test_gazetteer_resolves_offline(self, app, geo, tmp_path):
+        csv_path = tmp_path / "cities.csv"
+        csv_path.write_text("name,latitude,longitude,country\nLyon,45.764,4.8357,France\n")
+        assert geocoder.gazetteer().load_csv(str(csv_path)) == 1
+        app.config["GEOCODER_URL"] = "http://127.0.0.1:9/unreachable"
+        assert geocoder.geocode("Lyon") == (45.764, 4.8357)
+        assert geocoder.geocode("Lyon, France") == (45.764, 4.8357)
+        assert geo == []
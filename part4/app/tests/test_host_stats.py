@@ -0,0 +1,105 @@
+from datetime import datetime
+
+import pytest
+
+from app import create_app, db
+from app.models.host import Host
+from app.models.host_stats import HostStats
+from app.models.place import Place
+from app.models.review import Review
+from app.services.facade import facade
+from app.services.host_stats import host_stats
+from config import TestingConfig
+
+NOW = datetime(2031, 1, 1)
+
+
+@pytest.fixture
+def portfolio(host, make_place, book):
+    """Two places with views, three rated reviews and a few bookings."""
+    a = make_place(host, "Portfolio A", views=7)
+    b = make_place(host, "Portfolio B", views=3)
+    for place, rating in ((a, 5), (a, 4), (b, 3)):
+        db.session.add(Review(text="ok", rating=rating, place_id=place.id, user_id=host.id))
+    # 10 nights, 4 of which fall inside the window, and a declined booking
+    book(a, host, datetime(2029, 12, 28), datetime(2030, 1, 7), status="accepted")
+    book(b, host, datetime(2030, 6, 1), datetime(2030, 6, 6), status="declined")
+    db.session.commit()
+    return host
+
+
+@pytest.mark.facade
+class TestHostStats:
+    def test_compute(self, app, portfolio, count_queries):
+        host_id = portfolio.id
+        app.config["HOST_STATS_WINDOW_DAYS"] = 363  # 2030-01-03 to 2031-01-01
+        try:
+            with count_queries() as statements:
+                stats = host_stats.compute([host_id], now=NOW)[host_id]
+        finally:
+            app.config["HOST_STATS_WINDOW_DAYS"] = 365
+        assert len(statements) == 3
+        assert (stats.listing_count, stats.total_views) == (2, 10)
+        assert (stats.review_count, stats.rating_sum) == (3, 12)
+        assert stats.average_rating == 4.0
+        assert stats.booked_nights == 4
+        assert stats.occupancy == pytest.approx(4 / (2 * 363))
+
+    def test_host_without_places_and_unknown_host(self, host):
+        stats = host_stats.for_host(host.id)
+        assert (stats.listing_count, stats.review_count, stats.occupancy) == (0, 0, 0.0)
+        assert host_stats.for_host("missing") is None
+
+
+@pytest.mark.api
+class TestHostStatsEndpoints:
+    def test_rating_endpoint(self, client, portfolio):
+        res = client.get(f"/api/v1/users/hosts/{portfolio.id}/rating")
+        assert res.status_code == 200
+        body = res.get_json()
+        assert body["host_rating"] == 4.0
+        assert (body["review_count"], body["listing_count"], body["total_views"]) == (3, 2, 10)
+        assert client.get("/api/v1/users/hosts/missing/rating").status_code == 404
+
+    def test_rating_follows_new_reviews(self, client, portfolio):
+        url = f"/api/v1/users/hosts/{portfolio.id}/rating"
+        assert client.get(url).get_json()["review_count"] == 3
+        place = Place.query.filter_by(host_id=portfolio.id).first()
+        db.session.add(Review(text="meh", rating=1, place_id=place.id, user_id=portfolio.id))
+        db.session.commit()
+        assert client.get(url).get_json()["review_count"] == 4
+
+    def test_owner_profile_and_places(self, client, portfolio):
+        assert b"Average Rating:</strong> 4.0" in client.get(f"/owner/{portfolio.id}").data
+        places = client.get(f"/api/v1/users/hosts/{portfolio.id}/owned_places").get_json()
+        assert sorted(p["title"] for p in places) == ["Portfolio A", "Portfolio B"]
+
+
+class MaterializedConfig(TestingConfig):
+    HOST_STATS_MATERIALIZED = True
+
+
+@pytest.mark.facade
+def test_materialized_stats(make_place):
+    app = create_app(MaterializedConfig)
+    with app.app_context():
+        db.create_all()
+        host = Host(first_name="Mat", last_name="Host", email="mat@example.com")
+        host.set_password("hostpass")
+        db.session.add(host)
+        db.session.commit()
+        make_place(host, "Stored", views=2)
+
+        assert host_stats.materialize() == 1
+        assert db.session.get(HostStats, host.id).total_views == 2
+
+        # A fresh row is served as stored, a stale one is recomputed
+        make_place(host, "Stored too")
+        assert host_stats.for_host(host.id).listing_count == 1
+        # Listings are read from places, never from the stored row
+        assert len(facade.get_host_owned_places(host.id)) == 2
+        app.config["HOST_STATS_MAX_AGE"] = 0
+        assert host_stats.for_host(host.id).listing_count == 2
+        assert host_stats.materialize() == 1
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,101 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import inspect
+
+from app import db
+from app.models.host import Host
+from app.services.identity import identity
+from app.utils.cache import MISSING, MemoryTTLCache
+
+
+def user_queries(statements):
+    return [s for s in statements if "FROM users" in s]
+
+
+@pytest.fixture
+def logged_in(app, client):
+    """
+    A logged-in host, created outside of any test app context: each request
+    then gets its own context, `g` and session, as in production.
+    """
+    with app.app_context():
+        host = Host(first_name="Id", last_name="Cache", email=f"id-{uuid.uuid4().hex[:8]}@example.com")
+        host.set_password("hostpass")
+        db.session.add(host)
+        db.session.commit()
+        credentials = {"email": host.email, "password": "hostpass"}
+        host = SimpleNamespace(id=host.id, email=host.email)
+    client.post("/auth/login", data=credentials)
+    yield host
+    client.get("/auth/logout")
+
+
+@pytest.fixture
+def process_cache(app):
+    app.config["IDENTITY_CACHE_TTL"] = 60
+    store = app.extensions["identity_cache"] = MemoryTTLCache()
+    yield store
+    app.config["IDENTITY_CACHE_TTL"] = 0
+    del app.extensions["identity_cache"]
+
+
+@pytest.mark.facade
+class TestRequestScope:
+    def test_user_is_loaded_once_per_request(self, app, host, count_queries):
+        with app.test_request_context():
+            with count_queries() as statements:
+                first = identity.load(host.id)
+                assert identity.load(host.id) is first
+            assert isinstance(first, Host)
+            assert len(user_queries(statements)) == 1
+
+    def test_page_resolves_the_user_once(self, app, client, logged_in, count_queries):
+        with client.session_transaction() as session:
+            session["user"] = logged_in.email
+        # A fresh context: the request runs in it
+        with app.app_context(), count_queries() as statements:
+            response = client.get("/auth/profile")
+        assert response.status_code == 200
+        # The loader's query; the context processor reuses its user
+        assert len(user_queries(statements)) == 1
+
+
+@pytest.mark.facade
+class TestProcessCache:
+    def test_later_requests_need_no_query(self, app, client, logged_in, process_cache, count_queries):
+        client.get("/auth/profile")
+        assert process_cache.get(logged_in.id, MISSING) is not MISSING
+
+        with app.app_context(), count_queries() as statements:
+            response = client.get("/auth/profile")
+        assert response.status_code == 200
+        assert user_queries(statements) == []
+
+    def test_restored_user_is_a_session_instance(self, app, host, process_cache, count_queries):
+        with app.test_request_context():
+            identity.load(host.id)
+        with app.test_request_context():
+            with count_queries() as statements:
+                user = identity.load(host.id)
+            assert statements == []
+            assert isinstance(user, Host)
+            assert user.email == host.email
+            assert inspect(user).session is db.session()
+            assert not db.session.dirty
+
+    def test_profile_edit_drops_the_entry(self, client, logged_in, process_cache):
+        client.get("/auth/profile")
+        client.post("/auth/profile", data={"bio": "Edited bio"})
+
+        assert process_cache.get(logged_in.id, MISSING) is MISSING
+        assert b"Edited bio" in client.get("/auth/profile").data
+
+    def test_rollback_keeps_the_entry(self, app, host, process_cache):
+        with app.test_request_context():
+            user = identity.load(host.id)
+            user.bio = "Never saved"
+            db.session.flush()
+            db.session.rollback()
+        assert process_cache.get(host.id, MISSING) is not MISSING
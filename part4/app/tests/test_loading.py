@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.exc import InvalidRequestError
+
+from app import db
+from app.database import LAZY_LOADING
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.place_photo import PlacePhoto
+from app.models.review import Review
+from app.services.facade import PLACE_DETAIL, facade
+
+
+@pytest.fixture
+def listing(host):
+    """Four places with two photos each, sharing one amenity."""
+    wifi = Amenity(name="Wifi")
+    places = []
+    for i in range(4):
+        place = Place(
+            title=f"Eager {i}",
+            description="Test listing",
+            price=10.0,
+            latitude=20.0 + i * 0.01,
+            longitude=20.0,
+            capacity=1,
+            host_id=host.id,
+            amenities=[wifi],
+        )
+        place.photos = [PlacePhoto(url=f"eager-{i}-{n}.jpg") for n in range(2)]
+        db.session.add(place)
+        places.append(place)
+    db.session.commit()
+    db.session.expire_all()
+    yield places
+    for place in places:
+        db.session.delete(db.session.get(Place, place.id))
+    db.session.delete(db.session.get(Amenity, wifi.id))
+    db.session.commit()
+
+
+@pytest.mark.facade
+class TestLoaderOptions:
+    @pytest.mark.skipif(LAZY_LOADING != "raise_on_sql", reason="lazy loading allowed")
+    def test_unloaded_collection_raises_in_tests(self, listing):
+        place = facade.get_place(listing[0].id)
+        with pytest.raises(InvalidRequestError):
+            place.photos
+
+    def test_place_detail_loads_everything_up_front(self, listing, host, count_queries):
+        db.session.add(Review(text="Nice", rating=4, place_id=listing[0].id, user_id=host.id))
+        db.session.commit()
+        db.session.expire_all()
+
+        place = facade.get_place(listing[0].id, PLACE_DETAIL)
+        with count_queries() as statements:
+            assert len(place.photos) == 2
+            assert [a.name for a in place.amenities] == ["Wifi"]
+            assert place.reviews[0].user.id == host.id
+        assert statements == []
+
+    def test_amenities_do_not_drag_their_places(self, listing):
+        amenity = next(a for a in facade.list_amenities() if a.name == "Wifi")
+        assert "places" not in inspect(amenity).dict
+
+    def test_listing_query_count_is_independent_of_row_count(self, listing, count_queries):
+        with count_queries() as statements:
+            places = facade.geocoded_places_query().all()
+            cards = [p.to_dict() for p in places]
+        assert sum(len(card["photos"]) for card in cards) >= 8
+        # Places joined with hosts, then all photos at once
+        assert len(statements) == 2
+
+
+@pytest.mark.api
+class TestPagesWithoutNPlusOne:
+    def test_places_api(self, client, listing):
+        res = client.get("/places/api?lat=20.0&lon=20.0&radius=10")
+        assert res.status_code == 200
+        assert {p["title"]: len(p["photos"]) for p in res.get_json()} == {
+            f"Eager {i}": 2 for i in range(4)
+        }
+
+    def test_index_and_profiles_render(self, client, listing, host):
+        assert client.get("/").status_code == 200
+        assert client.get(f"/owner/{host.id}").status_code == 200
+        assert client.get(f"/user/{host.id}").status_code == 200
@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import json
+
+import pytest
+
+from app.services.media import asset_url, build_assets, content_hash, media_url
+
+BLOB = "a" * 64
+
+
+@pytest.fixture
+def uploads(app, tmp_path):
+    folder = tmp_path / "uploads"
+    (folder / "blobs").mkdir(parents=True)
+    (folder / "blobs" / f"{BLOB}.jpg").write_bytes(b"\xff\xd8\xff" + bytes(range(256)) * 4)
+    (folder / "old_photo.jpg").write_bytes(b"\xff\xd8\xff old upload")
+    app.config["UPLOAD_FOLDER"] = str(folder)
+    yield folder
+    app.config["UPLOAD_FOLDER"] = None
+
+
+@pytest.mark.utils
+class TestContentHash:
+    def test_only_content_addressed_paths_have_a_hash(self):
+        assert content_hash(f"blobs/{BLOB}.jpg") == BLOB
+        assert content_hash(f"variants/{BLOB}/card.0123456789abcdef.webp") == "0123456789abcdef"
+        assert content_hash(f"variants/{BLOB}/card.jpg") is None
+        assert content_hash("1f2e_photo.jpg") is None
+        assert content_hash(f"blobs/../{BLOB}.jpg") is None
+
+
+@pytest.mark.api
+class TestMedia:
+    def test_content_addressed_file_is_immutable(self, app, client, uploads):
+        with app.test_request_context():
+            url = media_url(f"blobs/{BLOB}.jpg")
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.mimetype == "image/jpeg"
+        assert response.headers["ETag"] == f'"{BLOB}"'
+        cache = response.cache_control
+        assert cache.public and cache.immutable
+        assert cache.max_age == app.config["MEDIA_IMMUTABLE_MAX_AGE"]
+
+        revalidated = client.get(url, headers={"If-None-Match": f'"{BLOB}"'})
+        assert revalidated.status_code == 304
+        assert revalidated.data == b""
+
+    def test_range_requests(self, client, uploads):
+        response = client.get(f"/media/blobs/{BLOB}.jpg", headers={"Range": "bytes=0-2"})
+        assert response.status_code == 206
+        assert response.data == b"\xff\xd8\xff"
+        assert response.headers["Accept-Ranges"] == "bytes"
+
+    def test_other_uploads_get_a_short_max_age(self, app, client, uploads):
+        response = client.get("/media/old_photo.jpg")
+        assert response.status_code == 200
+        assert not response.cache_control.immutable
+        assert response.cache_control.max_age == app.config["MEDIA_MAX_AGE"]
+        etag = response.headers["ETag"]
+        assert client.get("/media/old_photo.jpg", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_missing_and_outside_files(self, client, uploads):
+        assert client.get(f"/media/blobs/{'b' * 64}.jpg").status_code == 404
+        assert client.get("/media/../config.py").status_code == 404
+        assert client.get("/media/%2e%2e/%2e%2e/config.py").status_code == 404
+
+    def test_uploads_in_flight_are_not_served(self, client, uploads):
+        (uploads / ".incoming").mkdir()
+        (uploads / ".incoming" / "upload-abc").write_bytes(b"someone else's photo")
+        (uploads / "blobs").mkdir(exist_ok=True)
+        (uploads / "blobs" / "x.jpg.part").write_bytes(b"half written")
+        (uploads / "other").mkdir()
+        (uploads / "other" / "file.txt").write_bytes(b"private")
+        for path in (".incoming/upload-abc", "blobs/x.jpg.part", "other/file.txt"):
+            assert client.get(f"/media/{path}").status_code == 404
+
+
+@pytest.mark.api
+class TestAssets:
+    @pytest.fixture
+    def static(self, app, tmp_path):
+        folder = tmp_path / "static"
+        (folder / "css").mkdir(parents=True)
+        (folder / "uploads").mkdir()
+        (folder / "css" / "site.css").write_text("body { color: red; }\n" * 50)
+        (folder / "uploads" / "skipped.css").write_text("")
+        original, app.static_folder = app.static_folder, str(folder)
+        yield folder
+        app.static_folder = original
+        app.extensions["asset_manifest"] = {}
+
+    def test_build_writes_fingerprinted_and_compressed_copies(self, app, static):
+        manifest = build_assets(str(static), str(static / "dist" / "manifest.json"))
+
+        digest = hashlib.sha256((static / "css" / "site.css").read_bytes()).hexdigest()[:12]
+        assert manifest == {"css/site.css": f"css/site.{digest}.css"}
+        built = static / "dist" / "css" / f"site.{digest}.css"
+        assert gzip.decompress(built.with_name(built.name + ".gz").read_bytes()) == built.read_bytes()
+        assert json.loads((static / "dist" / "manifest.json").read_text()) == manifest
+
+    def test_asset_url_and_negotiated_encoding(self, app, client, static):
+        with app.test_request_context():
+            assert asset_url("css/site.css") == "/static/css/site.css"
+        app.extensions["asset_manifest"] = build_assets(
+            str(static), str(static / "dist" / "manifest.json")
+        )
+        with app.test_request_context():
+            url = asset_url("css/site.css")
+        assert url.startswith("/assets/css/site.")
+
+        plain = client.get(url)
+        assert plain.status_code == 200
+        assert plain.mimetype == "text/css"
+        assert plain.content_encoding is None
+        assert plain.cache_control.immutable
+        assert "Accept-Encoding" in plain.headers["Vary"]
+
+        compressed = client.get(url, headers={"Accept-Encoding": "gzip, deflate"})
+        assert compressed.content_encoding == "gzip"
+        assert compressed.mimetype == "text/css"
+        assert gzip.decompress(compressed.data) == plain.data
+        assert compressed.headers["ETag"] != plain.headers["ETag"]
@@ -0,0 +1,250 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from app.models.notification import Notification, NotificationArchive
+from app.services.facade import facade
+from app.services.notification_retention import notification_retention
+from app.utils.pubsub import pubsub
+from config import TestingConfig
+
+
+def notify(user_id, message, status="unread", timestamp=None):
+    notification = Notification(
+        recipient_id=user_id,
+        recipient_type="user",
+        message=message,
+        status=status,
+        timestamp=timestamp,
+    )
+    db.session.add(notification)
+    db.session.commit()
+    return notification.id
+
+
+def parse(chunk):
+    """The fields of a Server-Sent Event chunk."""
+    fields = {}
+    for line in chunk.decode().strip().splitlines():
+        key, _, value = line.partition(": ")
+        fields[key] = value
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+@pytest.fixture
+def member(app, host):
+    """A logged-in test client for `host`, and the host's id."""
+    client = app.test_client()
+    client.post("/auth/login", data={"email": host.email, "password": "hostpass"})
+    yield client, host.id
+    Notification.query.filter_by(recipient_id=host.id).delete()
+    db.session.commit()
+
+
+@pytest.mark.utils
+class TestPubSub:
+    def test_fan_out_and_unsubscribe(self, ctx):
+        with pubsub.subscribe("room") as a, pubsub.subscribe("room") as b:
+            pubsub.publish("room", {"n": 1})
+            assert a.get(timeout=1) == b.get(timeout=1) == {"n": 1}
+        pubsub.publish("room", {"n": 2})
+        assert a.get(timeout=0) is None
+
+    def test_rolled_back_notifications_are_not_published(self, ctx):
+        with pubsub.subscribe("notifications:ghost") as subscription:
+            db.session.add(Notification(recipient_id="ghost", recipient_type="user", message="x"))
+            db.session.flush()
+            db.session.rollback()
+            assert subscription.get(timeout=0.1) is None
+
+
+@pytest.mark.api
+class TestNotificationPush:
+    def test_stream_sends_count_then_new_notifications(self, member):
+        client, user_id = member
+        notify(user_id, "Before")
+        response = client.get("/api/v1/notifications/stream", buffered=False)
+        assert response.mimetype == "text/event-stream"
+        chunks = iter(response.response)
+        assert next(chunks).startswith(b"retry:")
+        first = parse(next(chunks))
+        assert first["event"] == "unread"
+        assert first["data"]["unread_count"] == 1
+
+        new_id = notify(user_id, "Pushed")
+        event = parse(next(chunks))
+        assert (event["event"], event["id"]) == ("notification", str(new_id))
+        assert event["data"]["message"] == "Pushed"
+        response.close()
+
+    def test_reconnect_replays_missed_notifications(self, member):
+        client, user_id = member
+        seen = notify(user_id, "Seen")
+        missed = notify(user_id, "Missed")
+        response = client.get(
+            "/api/v1/notifications/stream",
+            headers={"Last-Event-ID": str(seen)},
+            buffered=False,
+        )
+        chunks = iter(response.response)
+        next(chunks)
+        assert parse(next(chunks))["data"]["cursor"] == missed
+        assert parse(next(chunks))["data"]["message"] == "Missed"
+        response.close()
+
+    def test_long_poll(self, app, member):
+        client, user_id = member
+        first = client.get("/api/v1/notifications/poll").get_json()
+        assert first["notifications"] == []
+
+        # Already there: answered at once
+        new_id = notify(user_id, "Ready")
+        ready = client.get(f"/api/v1/notifications/poll?since={first['cursor']}").get_json()
+        assert [n["message"] for n in ready["notifications"]] == ["Ready"]
+        assert ready["cursor"] == new_id
+
+        # Nothing new: empty once the timeout is over
+        idle = client.get(f"/api/v1/notifications/poll?since={new_id}&timeout=0.1").get_json()
+        assert idle == {"notifications": [], "cursor": new_id}
+
+        # Pushed while waiting
+        result = {}
+        hub = app.extensions["pubsub"].hub
+        waiter = threading.Thread(
+            target=lambda: result.update(
+                client.get(f"/api/v1/notifications/poll?since={new_id}&timeout=5").get_json()
+            )
+        )
+        waiter.start()
+        deadline = time.monotonic() + 5
+        while not len(hub) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.2)  # let the waiter finish reading the backlog
+        notify(user_id, "Late")
+        waiter.join(5)
+        assert [n["message"] for n in result["notifications"]] == ["Late"]
+
+
+@pytest.mark.api
+def test_list_is_paginated(member):
+    client, user_id = member
+    for i in range(3):
+        notify(user_id, f"page {i}", timestamp=datetime(2030, 1, 1 + i))
+
+    response = client.get("/api/v1/notifications/?limit=2")
+    assert [n["message"] for n in response.get_json()["notifications"]] == ["page 2", "page 1"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/api/v1/notifications/?limit=2&cursor={cursor}")
+    assert [n["message"] for n in response.get_json()["notifications"]] == ["page 0"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def statuses(*ids):
+    db.session.expire_all()
+    return [db.session.get(Notification, i).status for i in ids]
+
+
+@pytest.mark.api
+class TestBulkMarkRead:
+    def test_mark_all_is_one_update(self, member, count_queries):
+        client, user_id = member
+        ids = [notify(user_id, f"n{i}") for i in range(3)]
+        with count_queries() as statements:
+            assert facade.mark_notifications_read(user_id) == 3
+        assert len(statements) == 1 and statements[0].startswith("UPDATE")
+        db.session.rollback()
+
+        response = client.post("/api/v1/notifications/mark_all_as_read")
+        assert response.get_json()["updated"] == 3
+        assert statuses(*ids) == ["read"] * 3
+
+    def test_mark_by_ids_and_age(self, member):
+        client, user_id = member
+        old = notify(user_id, "Old", timestamp=datetime(2020, 1, 1))
+        recent, other = notify(user_id, "Recent"), notify("someone-else", "Not mine")
+
+        response = client.post("/api/v1/notifications/mark_read", json={"ids": [recent, other]})
+        assert response.get_json()["updated"] == 1
+        response = client.post("/api/v1/notifications/mark_read", json={"older_than": "2021-01-01"})
+        assert response.get_json()["updated"] == 1
+        assert statuses(old, recent, other) == ["read", "read", "unread"]
+        Notification.query.filter_by(id=other).delete()
+        db.session.commit()
+
+    def test_api_clients_use_a_bearer_token(self, app, host):
+        user_id = host.id
+        ids = [notify(user_id, f"api {i}") for i in range(2)]
+        client = app.test_client()
+        url = "/api/v1/notifications/mark_read"
+        assert client.post(url, json={"ids": ids}).status_code == 401
+
+        token = client.post(
+            "/api/v1/auth/login", json={"email": host.email, "password": "hostpass"}
+        ).get_json()["access_token"]
+        response = client.post(url, json={"ids": ids}, headers={"Authorization": f"Bearer {token}"})
+        assert response.get_json()["updated"] == 2
+        assert statuses(*ids) == ["read", "read"]
+        Notification.query.filter_by(recipient_id=user_id).delete()
+        db.session.commit()
+
+    def test_bad_requests(self, member):
+        client, _ = member
+        url = "/api/v1/notifications/mark_read"
+        assert client.post(url, json={}).status_code == 400
+        assert client.post(url, json={"ids": "1,2"}).status_code == 400
+        assert client.post(url, json={"older_than": "yesterday"}).status_code == 400
+
+
+@pytest.mark.facade
+def test_retention_archives_old_read_notifications(app, member, monkeypatch):
+    _, user_id = member
+    now = datetime(2030, 6, 1)
+    stale = [notify(user_id, f"stale {i}", "read", now - timedelta(days=100)) for i in range(3)]
+    unread = notify(user_id, "stale but unread", "unread", now - timedelta(days=100))
+    recent = notify(user_id, "recent", "read", now - timedelta(days=10))
+    monkeypatch.setitem(app.config, "NOTIFY_RETENTION_BATCH", 2)
+
+    assert notification_retention.prune(days=90, now=now) == 3
+    remaining = {n.id for n in Notification.query.filter_by(recipient_id=user_id)}
+    assert remaining == {unread, recent}
+    archived = NotificationArchive.query.filter(NotificationArchive.notification_id.in_(stale)).all()
+    assert sorted(n.message for n in archived) == ["stale 0", "stale 1", "stale 2"]
+    assert all(n.archived_at == now for n in archived)
+
+    # Without archiving the rows are only deleted
+    assert notification_retention.prune(days=5, archive_rows=False, now=now) == 1
+    assert NotificationArchive.query.filter_by(notification_id=recent).first() is None
+
+    # SQLite reuses the id of a pruned last row: archived again all the same
+    reused = stale[-1]
+    again = Notification(recipient_id=user_id, recipient_type="user", message="again",
+                         status="read", timestamp=now - timedelta(days=100))
+    again.id = reused
+    db.session.add(again)
+    db.session.commit()
+    assert notification_retention.prune(days=90, now=now) == 1
+    assert NotificationArchive.query.filter_by(notification_id=reused).count() == 2
+    NotificationArchive.query.delete()
+    db.session.commit()
+
+
+class SQLiteBrokerConfig(TestingConfig):
+    PUBSUB_BROKER = "sqlite"
+    PUBSUB_POLL_INTERVAL = 0.05
+
+
+@pytest.mark.utils
+def test_sqlite_broker_connects_worker_processes(tmp_path):
+    SQLiteBrokerConfig.PUBSUB_PATH = str(tmp_path / "pubsub.sqlite")
+    publisher, listener = create_app(SQLiteBrokerConfig), create_app(SQLiteBrokerConfig)
+    with pubsub.subscribe("room", app=listener) as subscription:
+        time.sleep(0.2)  # poller started
+        pubsub.publish("room", {"n": 1}, app=publisher)
+        assert subscription.get(timeout=2) == {"n": 1}
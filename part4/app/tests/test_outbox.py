@@ -0,0 +1,229 @@
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta
+from email import message_from_bytes
+
+import pytest
+
+from app import create_app, db
+from app.models.booking import Booking
+from app.models.outbox_job import OutboxJob
+from app.models.place import Place
+from app.services.facade import facade
+from app.services.mailer import mailer
+from app.services.outbox import outbox
+from config import TestingConfig
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """
+    Minimal local SMTP server recording the messages it accepts.
+    Recipients containing "reject" are refused.
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.messages = []
+        self.connections = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost stand-in")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            verb = line.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "RCPT" and "reject" in line:
+                self.reply("550 No such user")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b""):
+                        break
+                    data += chunk
+                self.server.messages.append(message_from_bytes(data))
+                self.reply("250 Queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+
+@pytest.fixture
+def smtp(app):
+    server = SMTPStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    app.config.update(MAIL_SERVER="127.0.0.1", MAIL_PORT=server.port)
+    yield server
+    app.config["MAIL_SERVER"] = None
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def jobs(ctx):
+    yield
+    db.session.query(OutboxJob).delete()
+    db.session.commit()
+
+
+def due_now():
+    """Make every pending job due, skipping its backoff."""
+    db.session.query(OutboxJob).update({"next_attempt_at": datetime.utcnow()})
+    db.session.commit()
+
+
+@pytest.mark.utils
+class TestOutbox:
+    def test_idempotency_key(self, jobs):
+        first = mailer.send_email("a@example.com", "Hi", "Body", key="welcome:a")
+        second = mailer.send_email("a@example.com", "Hi", "Body", key="welcome:a")
+        db.session.commit()
+        assert first is second
+        assert OutboxJob.query.count() == 1
+
+    def test_jobs_are_rolled_back_with_the_transaction(self, jobs):
+        mailer.send_email("a@example.com", "Hi", "Body")
+        db.session.rollback()
+        assert OutboxJob.query.count() == 0
+
+    def test_batch_is_delivered_over_one_connection(self, jobs, smtp):
+        for n in range(3):
+            mailer.send_email(f"guest{n}@example.com", f"Mail {n}", "Body")
+        db.session.commit()
+
+        assert outbox.run_once() == 3
+        assert smtp.connections == 1
+        assert sorted(m["Subject"] for m in smtp.messages) == ["Mail 0", "Mail 1", "Mail 2"]
+        assert {job.status for job in OutboxJob.query} == {OutboxJob.DONE}
+        assert outbox.run_once() == 0
+
+    def test_failures_are_retried_with_backoff_then_given_up(self, app, jobs, smtp):
+        mailer.send_email("ok@example.com", "Fine", "Body")
+        bad = mailer.send_email("reject@example.com", "Refused", "Body")
+        db.session.commit()
+        bad_id = bad.id
+
+        before = datetime.utcnow()
+        outbox.run_once()
+        bad = db.session.get(OutboxJob, bad_id)
+        assert (bad.status, bad.attempts) == (OutboxJob.PENDING, 1)
+        assert "SMTPRecipientsRefused" in bad.last_error
+        base = app.config["OUTBOX_BACKOFF_BASE"]
+        assert before + timedelta(seconds=base / 2) <= bad.next_attempt_at
+        assert bad.next_attempt_at <= datetime.utcnow() + timedelta(seconds=base)
+        # Not due yet
+        assert outbox.run_once() == 0
+
+        for _ in range(bad.max_attempts - 1):
+            due_now()
+            outbox.run_once()
+        bad = db.session.get(OutboxJob, bad_id)
+        assert (bad.status, bad.attempts) == (OutboxJob.FAILED, bad.max_attempts)
+        assert [m["Subject"] for m in smtp.messages] == ["Fine"]
+
+    def test_unreachable_server_retries_the_whole_batch(self, app, jobs):
+        app.config.update(MAIL_SERVER="127.0.0.1", MAIL_PORT=1)
+        try:
+            mailer.send_email("a@example.com", "A", "Body")
+            mailer.send_email("b@example.com", "B", "Body")
+            db.session.commit()
+            assert outbox.run_once() == 2
+        finally:
+            app.config["MAIL_SERVER"] = None
+        assert {(j.status, j.attempts) for j in OutboxJob.query} == {(OutboxJob.PENDING, 1)}
+
+    def test_abandoned_jobs_are_claimed_again(self, jobs):
+        mailer.send_email("a@example.com", "Hi", "Body")
+        db.session.commit()
+        db.session.query(OutboxJob).update(
+            {"status": OutboxJob.RUNNING, "locked_until": datetime.utcnow() - timedelta(seconds=1)}
+        )
+        db.session.commit()
+        assert outbox.run_once() == 1
+        assert OutboxJob.query.one().status == OutboxJob.DONE
+
+
+@pytest.mark.facade
+def test_booking_status_email(jobs, smtp, host):
+    place = Place(
+        title="Outbox Villa",
+        description="Test listing",
+        price=10.0,
+        latitude=1.0,
+        longitude=1.0,
+        capacity=1,
+        host_id=host.id,
+    )
+    db.session.add(place)
+    db.session.commit()
+    booking = Booking(
+        user_id=host.id,
+        place_id=place.id,
+        host_id=host.id,
+        start_date=datetime(2031, 3, 1),
+        end_date=datetime(2031, 3, 4),
+        total_price=30.0,
+        guest_count=1,
+    )
+    db.session.add(booking)
+    db.session.commit()
+
+    booking.status = "declined"
+    facade.notify_guest_booking_status(booking, "declined")
+    facade.notify_guest_booking_status(booking, "declined")
+    db.session.commit()
+
+    assert outbox.run_once() == 1
+    (message,) = smtp.messages
+    assert message["To"] == host.email
+    assert message["Subject"] == "Your booking for Outbox Villa has been declined"
+    assert "from 2031-03-01 to 2031-03-04" in message.get_payload()
+
+
+class WorkerConfig(TestingConfig):
+    OUTBOX_WORKERS = 2
+    OUTBOX_POLL_INTERVAL = 30
+
+
+@pytest.mark.utils
+def test_worker_pool_is_woken_by_commit(tmp_path, monkeypatch):
+    WorkerConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'outbox.db'}"
+    app = create_app(WorkerConfig)
+    delivered = []
+    # Restored after the test
+    monkeypatch.setitem(outbox.handlers, "email", outbox.handlers["email"])
+    outbox.handler("email", batch=True)(delivered.extend)
+    with app.app_context():
+        db.create_all()
+        mailer.send_email("a@example.com", "Hi", "Body")
+        db.session.commit()
+    try:
+        deadline = time.monotonic() + 5
+        while not delivered and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert [p["subject"] for p in delivered] == ["Hi"]
+    finally:
+        outbox.stop(app, timeout=5)
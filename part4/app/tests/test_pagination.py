@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models.place import Place
+from app.persistence import InvalidCursor
+from app.persistence.pagination import decode_cursor, encode_cursor, keyset_slice
+from app.services.facade import facade
+
+
+@pytest.fixture
+def places(host):
+    """Five places, two of them sharing a creation time."""
+    base = datetime(2030, 1, 1)
+    created = [base, base + timedelta(1), base + timedelta(1), base + timedelta(2), base + timedelta(3)]
+    rows = []
+    for i, when in enumerate(created):
+        place = Place(
+            title=f"Paged {i}",
+            description="Test listing",
+            price=10.0,
+            latitude=10.0 + i * 0.01,
+            longitude=10.0,
+            capacity=1,
+            host_id=host.id,
+            created_at=when,
+        )
+        db.session.add(place)
+        rows.append(place)
+    db.session.commit()
+    yield rows
+    for place in rows:
+        db.session.delete(place)
+    db.session.commit()
+
+
+def walk(paginate, limit):
+    """Follow next cursors to the end, returning the pages served."""
+    pages, cursor = [], None
+    while True:
+        page = paginate(limit, cursor)
+        pages.append(page.items)
+        if not page.next_cursor:
+            return pages
+        cursor = page.next_cursor
+
+
+@pytest.mark.utils
+class TestCursors:
+    def test_round_trip(self):
+        key = [datetime(2030, 5, 1, 12, 30, 1, 42), "abc"]
+        assert decode_cursor(encode_cursor(key)) == key
+
+    def test_malformed_cursor(self):
+        with pytest.raises(InvalidCursor):
+            decode_cursor("not-a-cursor")
+
+    def test_keyset_slice(self):
+        rows = [(3.5, "c"), (1.0, "b"), (1.0, "a"), (9.0, "d")]
+        first = keyset_slice(rows, key=lambda r: r, limit=2)
+        assert first.items == [(1.0, "a"), (1.0, "b")]
+        second = keyset_slice(rows, key=lambda r: r, limit=2, cursor=first.next_cursor)
+        assert second.items == [(3.5, "c"), (9.0, "d")]
+        assert second.next_cursor is None
+
+
+@pytest.mark.facade
+class TestRepositoryPagination:
+    def test_pages_are_stable_and_complete(self, places):
+        pages = walk(facade.paginate_places, 2)
+        seen = [p for page in pages for p in page if p.title.startswith("Paged")]
+        assert seen == sorted(places, key=lambda p: (p.created_at, p.id))
+        assert all(len(page) <= 2 for page in pages)
+
+    def test_rows_inserted_meanwhile_do_not_shift_pages(self, places, host):
+        first = facade.paginate_places(2)
+        early = Place(
+            title="Inserted later, created earlier",
+            description="Test listing",
+            price=10.0,
+            latitude=1.0,
+            longitude=1.0,
+            capacity=1,
+            host_id=host.id,
+            created_at=datetime(2000, 1, 1),
+        )
+        db.session.add(early)
+        db.session.commit()
+        second = facade.paginate_places(2, first.next_cursor)
+        assert not set(first.items) & set(second.items)
+        assert early not in second.items
+        db.session.delete(early)
+        db.session.commit()
+
+
+@pytest.mark.api
+class TestPaginatedEndpoints:
+    def test_place_list_follows_next_cursor(self, client, places):
+        ids, url = [], "/api/v1/places/?limit=2"
+        while url:
+            res = client.get(url)
+            assert res.status_code == 200
+            ids += [p["id"] for p in res.get_json()]
+            cursor = res.headers.get("X-Next-Cursor")
+            url = f"/api/v1/places/?limit=2&cursor={cursor}" if cursor else None
+            if cursor:
+                assert 'rel="next"' in res.headers["Link"]
+        expected = sorted(places, key=lambda p: (p.created_at, p.id))
+        assert [i for i in ids if i in {p.id for p in places}] == [p.id for p in expected]
+
+    def test_radius_search_is_paginated_by_distance(self, client, places):
+        url = "/api/v1/places/?lat=10.0&lon=10.0&radius=50&limit=3"
+        first = client.get(url)
+        assert [p["title"] for p in first.get_json()] == ["Paged 0", "Paged 1", "Paged 2"]
+        cursor = first.headers["X-Next-Cursor"]
+        rest = client.get(f"{url}&cursor={cursor}").get_json()
+        assert [p["title"] for p in rest] == ["Paged 3", "Paged 4"]
+
+    def test_bad_parameters(self, client):
+        assert client.get("/api/v1/places/?cursor=garbage").status_code == 400
+        assert client.get("/api/v1/places/?limit=0").status_code == 400
@@ -0,0 +1,72 @@
+import pytest
+
+from app import db
+from app.services.passwords import hash_method, hash_password, passwords, verify_password
+
+
+@pytest.mark.utils
+class TestMethods:
+    @pytest.mark.parametrize("method", ["pbkdf2:sha256:1000", "scrypt:1024:8:1", "bcrypt:4"])
+    def test_hash_and_verify(self, method):
+        stored = hash_password("s3cret-pass", method)
+        assert hash_method(stored) == method
+        assert verify_password(stored, "s3cret-pass")
+        assert not verify_password(stored, "wrong-pass")
+
+    def test_garbage_never_verifies(self):
+        assert not verify_password("", "x")
+        assert not verify_password("plaintext", "plaintext")
+
+    def test_needs_rehash_follows_the_configuration(self, app, ctx):
+        current = passwords.hash("s3cret-pass")
+        assert not passwords.needs_rehash(current)
+        assert passwords.needs_rehash(hash_password("s3cret-pass", "pbkdf2:sha256:500"))
+        assert passwords.needs_rehash(hash_password("s3cret-pass", "bcrypt:4"))
+
+    def test_pool_verifies_in_another_process(self, app, ctx):
+        stored = passwords.hash("s3cret-pass")
+        app.config["PASSWORD_WORKERS"] = 1
+        try:
+            assert passwords.verify(stored, "s3cret-pass")
+            assert not passwords.verify(stored, "wrong-pass")
+        finally:
+            app.config["PASSWORD_WORKERS"] = 0
+            passwords.shutdown()
+
+
+@pytest.mark.api
+class TestLogin:
+    def test_outdated_hash_is_replaced_at_login(self, client, host):
+        host.password = hash_password("hostpass", "bcrypt:4")
+        db.session.commit()
+
+        response = client.post(
+            "/api/v1/auth/login", json={"email": host.email, "password": "hostpass"}
+        )
+        assert response.status_code == 200
+        db.session.expire_all()
+        assert hash_method(host.password) == "pbkdf2:sha256:1000"
+        assert host.check_password("hostpass")
+
+        # The web login accepts the new hash
+        response = client.post("/auth/login", data={"email": host.email, "password": "hostpass"})
+        assert response.status_code == 302
+        assert "login" not in response.location
+        client.get("/auth/logout")
+
+    def test_wrong_password_keeps_the_hash(self, client, host):
+        old = host.password = hash_password("hostpass", "pbkdf2:sha256:500")
+        db.session.commit()
+
+        response = client.post(
+            "/api/v1/auth/login", json={"email": host.email, "password": "nope-nope"}
+        )
+        assert response.status_code == 401
+        db.session.expire_all()
+        assert host.password == old
+
+    def test_unknown_email_is_refused(self, client, ctx):
+        response = client.post(
+            "/api/v1/auth/login", json={"email": "nobody@example.com", "password": "whatever1"}
+        )
+        assert response.status_code == 401
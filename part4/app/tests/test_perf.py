@@ -0,0 +1,91 @@
+import logging
+import re
+
+import pytest
+
+from app import create_app, db
+from app.models.place import Place
+from app.models.user import User
+from app.utils.perf import perf
+from config import TestingConfig
+
+
+class PerfConfig(TestingConfig):
+    PERF_ENABLED = True
+    PERF_QUERY_BUDGET = 3
+
+
+@pytest.fixture(scope="module")
+def perf_app():
+    app = create_app(PerfConfig)
+    with app.app_context():
+        db.create_all()
+        admin = User(first_name="Perf", last_name="Admin", email="perf@example.com", is_admin=True)
+        admin.set_password("adminpass")
+        db.session.add(admin)
+        for i in range(4):
+            db.session.add(
+                Place(
+                    title=f"Perf {i}",
+                    description="Test listing",
+                    price=10.0,
+                    latitude=1.0,
+                    longitude=1.0,
+                    capacity=1,
+                )
+            )
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+def server_timing(response):
+    header = response.headers["Server-Timing"]
+    queries = int(re.search(r'desc="(\d+) queries"', header).group(1))
+    total = float(re.search(r"total;dur=([\d.]+)", header).group(1))
+    return queries, total
+
+
+@pytest.mark.utils
+class TestPerfMonitor:
+    def test_disabled_by_default(self, client):
+        assert "Server-Timing" not in client.get("/api/v1/amenities/").headers
+
+    def test_server_timing_counts_statements(self, perf_app):
+        client = perf_app.test_client()
+        queries, total = server_timing(client.get("/api/v1/amenities/"))
+        assert queries == 1
+        assert total > 0
+
+    def test_query_budget_warning(self, perf_app, caplog):
+        client = perf_app.test_client()
+        # The index page runs a handful of queries (places, their photos,
+        # top rated places), more than this budget allows
+        perf_app.config["PERF_QUERY_BUDGET"] = 1
+        try:
+            with caplog.at_level(logging.WARNING, logger=perf_app.logger.name):
+                queries, _ = server_timing(client.get("/"))
+        finally:
+            perf_app.config["PERF_QUERY_BUDGET"] = PerfConfig.PERF_QUERY_BUDGET
+        assert queries > 1
+        assert any(
+            "GET / ran" in r.getMessage() and "budget 1" in r.getMessage()
+            for r in caplog.records
+        )
+
+    def test_admin_report(self, perf_app):
+        client = perf_app.test_client()
+        with perf_app.app_context():
+            perf.reset()
+        for _ in range(5):
+            client.get("/api/v1/amenities/")
+        client.post("/auth/login", data={"email": "perf@example.com", "password": "adminpass"})
+
+        report = client.get("/admin/perf").get_json()
+        assert report["enabled"] is True
+        stats = report["endpoints"]["amenities_amenity_list"]
+        assert stats["requests"] == 5
+        assert stats["queries"]["p50"] == 1
+        assert set(stats["wall_ms"]) == {"p50", "p95", "p99"}
+        assert sum(stats["histogram"].values()) == 5
@@ -0,0 +1,275 @@
+import hashlib
+import io
+import os
+import re
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from app import db
+from app.models.photo_blob import PhotoBlob
+from app.models.place_photo import PlacePhoto
+from app.services.facade import facade
+from app.services.outbox import outbox
+from app.services.photo_pipeline import InvalidImage, photo_pipeline
+
+ORIENTATION = 0x0112
+
+
+@pytest.fixture
+def uploads(app, tmp_path):
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    yield tmp_path
+    app.config["UPLOAD_FOLDER"] = None
+
+
+def image_file(size=(2400, 1200), fmt="JPEG", mode="RGB", orientation=None, name="photo.jpg", color="red"):
+    buffer = io.BytesIO()
+    image = Image.new(mode, size, color)
+    options = {}
+    if orientation:
+        exif = Image.Exif()
+        exif[ORIENTATION] = orientation
+        exif[0x010F] = "Camera maker"
+        options["exif"] = exif
+    image.save(buffer, fmt, **options)
+    buffer.seek(0)
+    return FileStorage(stream=buffer, filename=name)
+
+
+def add(place, file):
+    photo = photo_pipeline.add_photo(place, file)
+    db.session.commit()
+    return photo
+
+
+@pytest.mark.utils
+class TestValidation:
+    def test_rejects_files_that_are_not_images(self, ctx):
+        file = FileStorage(stream=io.BytesIO(b"<?php echo 1; ?>"), filename="x.jpg")
+        with pytest.raises(InvalidImage):
+            photo_pipeline.validate(file.stream)
+
+    def test_rejects_unsupported_formats_and_huge_images(self, app, ctx):
+        with pytest.raises(InvalidImage):
+            photo_pipeline.validate(image_file(fmt="BMP", name="x.bmp").stream)
+        app.config["PHOTO_MAX_PIXELS"] = 1000
+        try:
+            with pytest.raises(InvalidImage):
+                photo_pipeline.validate(image_file(size=(100, 100)).stream)
+        finally:
+            app.config["PHOTO_MAX_PIXELS"] = 40_000_000
+
+    def test_returns_size_and_rewinds(self, ctx):
+        file = image_file(size=(300, 200))
+        assert photo_pipeline.validate(file.stream) == ("image/jpeg", 300, 200)
+        assert file.stream.tell() == 0
+
+
+@pytest.mark.facade
+class TestVariants:
+    def test_upload_is_stored_and_queued(self, host, uploads, make_place):
+        photo = add(make_place(host), image_file())
+
+        assert (photo.width, photo.height) == (2400, 1200)
+        assert photo.variants is None
+        assert (uploads / photo.url).exists()
+        assert photo.variant("card") == photo.url
+
+    def test_drain_renders_variants_and_removes_the_original(self, app, host, uploads, make_place):
+        photo = add(make_place(host), image_file(orientation=6))
+        original = uploads / photo.url
+
+        assert outbox.drain() >= 1
+        db.session.expire_all()
+        photo = db.session.get(PlacePhoto, photo.id)
+
+        assert set(photo.variants) == set(app.config["PHOTO_VARIANTS"])
+        for name, edge in app.config["PHOTO_VARIANTS"].items():
+            entry = photo.variants[name]
+            for fmt in ("webp", "jpeg"):
+                with Image.open(uploads / entry[fmt]) as image:
+                    # Rotated upright (orientation 6), never upscaled
+                    assert image.height > image.width
+                    assert max(image.size) == min(edge, 2400)
+                    assert ORIENTATION not in image.getexif()
+                    assert 0x010F not in image.getexif()
+        assert photo.url == photo.variants["full"]["jpeg"]
+        assert not original.exists()
+
+    def test_transparent_png_is_flattened_for_jpeg(self, host, uploads, make_place):
+        photo = add(make_place(host), image_file(size=(400, 300), fmt="PNG", mode="RGBA", name="p.png"))
+        outbox.drain()
+        db.session.expire_all()
+        photo = db.session.get(PlacePhoto, photo.id)
+
+        with Image.open(uploads / photo.variants["thumb"]["jpeg"]) as image:
+            assert image.mode == "RGB"
+            assert image.size == (320, 240)
+        with Image.open(uploads / photo.variants["card"]["webp"]) as image:
+            assert image.size == (400, 300)
+
+    def test_deleted_photo_files_go_on_commit_only(self, host, uploads, make_place):
+        photo = add(make_place(host), image_file(size=(500, 500)))
+        outbox.drain()
+        db.session.expire_all()
+        photo = db.session.get(PlacePhoto, photo.id)
+        folder = uploads / "variants" / photo.blob_id
+
+        db.session.delete(photo)
+        db.session.flush()
+        db.session.rollback()
+        assert folder.exists()
+
+        photo = db.session.get(PlacePhoto, photo.id)
+        db.session.delete(photo)
+        db.session.commit()
+        assert not folder.exists()
+        assert not os.listdir(uploads / "variants")
+
+    def test_deleting_a_place_removes_its_blobs(self, host, uploads, make_place):
+        place = make_place(host)
+        kept = add(make_place(host), image_file(size=(300, 300), color="green"))
+        photos = [add(place, image_file(size=(400, 400), color=color)) for color in ("red", "red", "blue")]
+        outbox.drain()
+        blob_ids = {photo.blob_id for photo in photos}
+        assert len(blob_ids) == 2
+
+        facade.delete_place(place.id)
+        assert all(db.session.get(PhotoBlob, blob_id) is None for blob_id in blob_ids)
+        assert os.listdir(uploads / "variants") == [kept.blob_id]
+
+
+@pytest.mark.facade
+class TestBlobs:
+    def test_identical_uploads_share_one_blob(self, host, uploads, make_place):
+        data = image_file(size=(640, 480), color="blue").stream.getvalue()
+        first = add(make_place(host), FileStorage(io.BytesIO(data), "a.jpg"))
+        second = add(make_place(host), FileStorage(io.BytesIO(data), "b.jpg"))
+
+        assert first.blob_id == second.blob_id == hashlib.sha256(data).hexdigest()
+        assert first.url == second.url == f"blobs/{first.blob_id}.jpg"
+        assert len(os.listdir(uploads / "blobs")) == 1
+        # One rendering for both photos
+        assert outbox.drain() == 1
+
+        db.session.expire_all()
+        blob = db.session.get(PhotoBlob, first.blob_id)
+        first, second = db.session.get(PlacePhoto, first.id), db.session.get(PlacePhoto, second.id)
+        assert first.variants == second.variants == blob.variants
+        assert first.url == second.url == blob.url
+
+        # A third copy reuses the rendered variants at once
+        third = add(make_place(host), FileStorage(io.BytesIO(data), "c.jpg"))
+        assert third.variants == blob.variants
+        assert outbox.drain() == 0
+
+        folder = uploads / "variants" / blob.id
+        for photo in (first, second):
+            db.session.delete(photo)
+            db.session.commit()
+            assert folder.exists()
+        db.session.delete(third)
+        db.session.commit()
+        assert not folder.exists()
+        assert db.session.get(PhotoBlob, blob.id) is None
+
+
+@pytest.mark.api
+class TestStreamingUpload:
+    @pytest.fixture
+    def place(self, app, client, host, uploads, make_place):
+        place = make_place(host)
+        client.post("/auth/login", data={"email": host.email, "password": "hostpass"})
+        yield place
+        client.get("/auth/logout")
+
+    def upload(self, client, place, *files, name="file"):
+        data = {name: [(io.BytesIO(f), f"p{i}.png") for i, f in enumerate(files)]}
+        return client.post(
+            f"/place/{place.id}/upload_photo",
+            data=data,
+            content_type="multipart/form-data",
+            headers={"Referer": f"http://localhost/places/{place.id}"},
+        )
+
+    def test_upload_is_hashed_while_streamed(self, client, place, uploads):
+        data = image_file(size=(50, 40), fmt="PNG", color="green").stream.getvalue()
+        response = self.upload(client, place, data)
+
+        assert response.status_code == 302
+        photo = PlacePhoto.query.filter_by(place_id=place.id).one()
+        assert photo.blob_id == hashlib.sha256(data).hexdigest()
+        assert (uploads / photo.url).read_bytes() == data
+        # The temporary file went with the request
+        assert os.listdir(uploads / ".incoming") == []
+
+    def test_file_over_the_limit_is_refused(self, app, client, place, uploads):
+        app.config["UPLOAD_MAX_FILE_SIZE"] = 1024
+        try:
+            data = image_file(size=(300, 300), fmt="PNG", mode="RGB").stream.getvalue()
+            data += os.urandom(2048)
+            response = self.upload(client, place, data)
+        finally:
+            app.config["UPLOAD_MAX_FILE_SIZE"] = 16 * 1024 * 1024
+        assert response.status_code == 302
+        assert PlacePhoto.query.filter_by(place_id=place.id).count() == 0
+        with client.session_transaction() as session:
+            assert ("error", "File is too large.") in session["_flashes"]
+
+    def test_too_many_files_and_oversized_requests_are_refused(self, app, client, place):
+        data = image_file(size=(10, 10), fmt="PNG").stream.getvalue()
+        app.config["UPLOAD_MAX_FILES"] = 2
+        try:
+            assert self.upload(client, place, data, data, data).status_code == 302
+        finally:
+            app.config["UPLOAD_MAX_FILES"] = 20
+
+        app.config["MAX_CONTENT_LENGTH"] = 100
+        try:
+            # Without a page to go back to, the error is JSON
+            response = client.post(
+                f"/place/{place.id}/upload_photo",
+                data={"file": (io.BytesIO(data * 10), "p.png")},
+                content_type="multipart/form-data",
+            )
+        finally:
+            app.config["MAX_CONTENT_LENGTH"] = 64 * 1024 * 1024
+        assert response.status_code == 413
+        assert response.get_json() == {"error": "Upload is too large."}
+        assert PlacePhoto.query.filter_by(place_id=place.id).count() == 0
+
+    def test_content_is_sniffed_not_named(self, client, place):
+        response = self.upload(client, place, b"GIF89a but not really an image")
+        assert response.status_code == 302
+        assert PlacePhoto.query.filter_by(place_id=place.id).count() == 0
+
+
+@pytest.mark.api
+class TestTemplates:
+    def test_picture_uses_variants_once_rendered(self, app, host, uploads, make_place):
+        from flask import render_template_string
+
+        photo = add(make_place(host), image_file(size=(1000, 500)))
+        template = '{% from "_photo.html" import picture %}{{ picture(photo, "card", alt="A") }}'
+        with app.test_request_context():
+            html = render_template_string(template, photo=photo)
+        # Not rendered yet: the upload keeps its EXIF, the default stands in
+        assert "image/webp" not in html
+        assert photo.url not in html and "default.jpg" in html
+
+        outbox.drain()
+        db.session.expire_all()
+        photo = db.session.get(PlacePhoto, photo.id)
+        with app.test_request_context():
+            html = render_template_string(template, photo=photo)
+        assert 'type="image/webp"' in html
+        assert re.search(r"/media/variants/\w+/card\.[0-9a-f]{16}\.webp 800w", html)
+        assert re.search(r"thumb\.[0-9a-f]{16}\.jpg 320w", html)
+        assert 'width="800" height="400"' in html
+        assert 'loading="lazy"' in html
+
+        with app.test_request_context():
+            html = render_template_string(template, photo=None)
+        assert "default.jpg" in html
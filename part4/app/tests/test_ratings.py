@@ -0,0 +1,124 @@
+import pytest
+
+from app import db
+from app.models.place_rating_stats import PlaceRatingStats
+from app.models.review import Review
+from app.services import ratings
+
+
+def review(place, rating, user):
+    r = Review(text=f"{rating} stars", rating=rating, place_id=place.id, user_id=user.id)
+    db.session.add(r)
+    db.session.commit()
+    return r
+
+
+def stats_for(place):
+    db.session.expire_all()
+    return db.session.get(PlaceRatingStats, place.id)
+
+
+@pytest.mark.facade
+class TestRatingStats:
+    def test_insert_updates_aggregates_and_top(self, host, make_place):
+        place = make_place(host, "Rated")
+        review(place, 3, host)
+        best = review(place, 5, host)
+        review(place, None, host)  # unrated reviews are not counted
+
+        stats = stats_for(place)
+        assert (stats.review_count, stats.rating_sum) == (2, 8)
+        assert stats.average_rating == 4.0
+        assert stats.top_review_id == best.id
+        assert place.top_review.id == best.id
+
+    def test_edit_and_delete_keep_stats_in_sync(self, host, make_place):
+        place = make_place(host, "Edited")
+        low = review(place, 2, host)
+        best = review(place, 5, host)
+
+        best.rating = 1
+        db.session.commit()
+        stats = stats_for(place)
+        assert (stats.review_count, stats.rating_sum) == (2, 3)
+        assert stats.top_review_id == low.id
+
+        db.session.delete(low)
+        db.session.commit()
+        stats = stats_for(place)
+        assert (stats.review_count, stats.average_rating) == (1, 1.0)
+        assert stats.top_review_id == best.id
+
+        db.session.delete(best)
+        db.session.commit()
+        stats = stats_for(place)
+        assert stats.review_count == 0
+        assert stats.top_review_id is None
+
+    def test_top_rated_places_and_rebuild(self, host, make_place):
+        good = make_place(host, "Good")
+        great = make_place(host, "Great")
+        review(good, 3, host)
+        review(great, 5, host)
+
+        top = ratings.top_rated_places(limit=10)
+        assert top.index(great) < top.index(good)
+
+        db.session.query(PlaceRatingStats).delete()
+        db.session.commit()
+        assert ratings.top_rated_places(limit=10) == []
+
+        assert ratings.rebuild_all() >= 2
+        stats = stats_for(great)
+        assert (stats.review_count, stats.average_rating) == (1, 5.0)
+        assert great in ratings.top_rated_places(limit=10)
+
+    def test_histogram_follows_edits_and_rebuild(self, host, make_place):
+        place = make_place(host, "Histogram")
+        review(place, 5, host)
+        four = review(place, 4, host)
+        review(place, 4, host)
+
+        four.rating = 2
+        db.session.commit()
+        assert stats_for(place).histogram == {"1": 0, "2": 1, "3": 0, "4": 1, "5": 1}
+
+        db.session.query(PlaceRatingStats).delete()
+        db.session.commit()
+        ratings.rebuild_all()
+        assert stats_for(place).histogram == {"1": 0, "2": 1, "3": 0, "4": 1, "5": 1}
+
+
+@pytest.mark.api
+class TestPlaceRatingEndpoint:
+    def test_summary(self, client, host, make_place):
+        place = make_place(host, "Summarized")
+        for rating in (5, 5, 4):
+            review(place, rating, host)
+
+        res = client.get(f"/api/v1/places/{place.id}/rating")
+        assert res.status_code == 200
+        body = res.get_json()
+        assert body["review_count"] == 3
+        assert body["average_rating"] == pytest.approx(14 / 3)
+        assert body["histogram"] == {"1": 0, "2": 0, "3": 0, "4": 1, "5": 2}
+
+        mean = ratings.site_average()
+        assert body["bayesian_rating"] == pytest.approx((5 * mean + 14) / (5 + 3))
+
+    def test_query_count_does_not_grow_with_reviews(self, client, host, count_queries, make_place):
+        
+        place = make_place(host, "Busy")
+        other = make_place(host, "Elsewhere")
+        for _ in range(20):
+            review(other, 3, host)
+        review(place, 4, host)
+        with count_queries() as statements:
+            assert client.get(f"/api/v1/places/{place.id}/rating").status_code == 200
+        # Place lookup, its stats row, the site-wide sums
+        assert len(statements) <= 4
+
+    def test_unrated_place(self, client, host, make_place):
+        place = make_place(host, "Unrated")
+        assert client.get(f"/api/v1/places/{place.id}/rating").status_code == 404
+        assert client.get("/api/v1/places/missing/rating").status_code == 404
@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from app import create_app, db
+from app.models.place import Place
+from app.utils.cache import MISSING, MemoryTTLCache
+from config import TestingConfig
+
+
+@pytest.fixture
+def two_places(host, make_place):
+    places = [make_place(host, "Cached A", 30.0, 30.0), make_place(host, "Cached B", 30.0, 30.0)]
+    yield places
+    for place in places:
+        db.session.delete(place)
+    db.session.commit()
+
+
+@pytest.mark.utils
+class TestMemoryTTLCache:
+    def test_ttl_expiry(self):
+        cache = MemoryTTLCache()
+        cache.set("k", [1, 2], ttl=0.05)
+        assert cache.get("k") == [1, 2]
+        time.sleep(0.1)
+        assert cache.get("k") is MISSING
+
+    def test_lru_eviction(self):
+        cache = MemoryTTLCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3, ttl=60)
+        assert len(cache) == 2
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+
+
+@pytest.mark.api
+class TestCachedResponses:
+    def test_hit_and_conditional_get(self, client, two_places):
+        url = f"/api/v1/places/{two_places[0].id}"
+        first = client.get(url)
+        assert first.headers["X-Cache"] == "MISS"
+        second = client.get(url)
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.get_json() == first.get_json()
+        assert second.headers["ETag"] == first.headers["ETag"]
+
+        revalidated = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+        assert revalidated.status_code == 304
+        assert revalidated.data == b""
+
+    def test_editing_a_place_evicts_only_what_depends_on_it(self, client, two_places):
+        a, b = two_places
+        for url in (f"/api/v1/places/{a.id}", f"/api/v1/places/{b.id}", "/places/api"):
+            client.get(url)
+
+        a.title = "Cached A (renamed)"
+        db.session.commit()
+
+        renamed = client.get(f"/api/v1/places/{a.id}")
+        assert renamed.headers["X-Cache"] == "MISS"
+        assert renamed.get_json()["title"] == "Cached A (renamed)"
+        assert client.get("/places/api").headers["X-Cache"] == "MISS"
+        assert client.get(f"/api/v1/places/{b.id}").headers["X-Cache"] == "HIT"
+
+    def test_new_place_evicts_its_host_listing(self, client, two_places, host, make_place):
+        url = f"/api/v1/users/hosts/{host.id}/owned_places"
+        assert len(client.get(url).get_json()) == 2
+        assert client.get(url).headers["X-Cache"] == "HIT"
+        extra = make_place(host, "Cached extra", 30.0, 30.0)
+        assert len(client.get(url).get_json()) == 3
+        db.session.delete(extra)
+        db.session.commit()
+        assert len(client.get(url).get_json()) == 2
+
+    def test_index_listings_fragment(self, client, two_places, host, make_place):
+        assert b"Cached B" in client.get("/").data
+        newer = make_place(host, "Cached C", 30.0, 30.0)
+        assert b"Cached C" in client.get("/").data
+        db.session.delete(newer)
+        db.session.commit()
+
+    def test_errors_are_not_cached(self, client):
+        assert client.get("/api/v1/places/missing").status_code == 404
+        assert "X-Cache" not in client.get("/api/v1/places/missing").headers
+
+
+class SQLiteCacheConfig(TestingConfig):
+    RESPONSE_CACHE_BACKEND = "sqlite"
+
+
+@pytest.mark.utils
+def test_sqlite_backend_is_shared_between_apps(tmp_path):
+    SQLiteCacheConfig.RESPONSE_CACHE_PATH = str(tmp_path / "responses.sqlite")
+    apps = [create_app(SQLiteCacheConfig), create_app(SQLiteCacheConfig)]
+    for app in apps:
+        with app.app_context():
+            db.create_all()
+
+    assert apps[0].test_client().get("/places/api").headers["X-Cache"] == "MISS"
+    assert apps[1].test_client().get("/places/api").headers["X-Cache"] == "HIT"
+
+    # A commit in one worker invalidates the entry for the other
+    with apps[0].app_context():
+        db.session.add(
+            Place(title="Shared", description="x", price=1.0, latitude=1.0, longitude=1.0, capacity=1)
+        )
+        db.session.commit()
+    assert apps[1].test_client().get("/places/api").headers["X-Cache"] == "MISS"
@@ -0,0 +1,117 @@
+import uuid
+
+import pytest
+from flask_jwt_extended import decode_token
+
+from app import db
+from app.models.place import Place
+from app.models.user import User
+from app.services.tokens import tokens
+
+
+def user_queries(statements):
+    return [s for s in statements if "FROM users" in s]
+
+
+def login(client, email, password):
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def guest(ctx):
+    user = User(first_name="Guest", last_name="Test", email=f"guest-{uuid.uuid4().hex[:8]}@example.com")
+    user.set_password("guestpass")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.mark.api
+class TestClaims:
+    def test_login_embeds_the_claims(self, client, host):
+        claims = decode_token(login(client, host.email, "hostpass")["access_token"])
+        assert claims["sub"] == host.id
+        assert claims["is_host"] is True
+        assert claims["is_admin"] is False
+        assert claims["ver"] == host.token_version
+
+    def test_owner_edits_without_loading_users(self, client, host, count_queries):
+        place = Place(title="Claims", description="Listing", price=50.0, latitude=1.0, longitude=1.0, capacity=2, host_id=host.id)
+        db.session.add(place)
+        db.session.commit()
+        token = login(client, host.email, "hostpass")["access_token"]
+        db.session.expire_all()
+
+        with count_queries() as statements:
+            response = client.put(
+                f"/api/v1/places/{place.id}",
+                json={"title": "Claims edited", "price": 60.0, "capacity": 3},
+                headers=bearer(token),
+            )
+        assert response.status_code == 200
+        assert response.get_json()["host_id"] == host.id
+        assert user_queries(statements) == []
+
+    def test_others_are_turned_away_without_a_query(self, client, host, guest, count_queries):
+        host_id, guest_id = host.id, guest.id
+        token = login(client, guest.email, "guestpass")["access_token"]
+
+        with count_queries() as statements:
+            assert client.get(f"/api/v1/users/users/{host_id}", headers=bearer(token)).status_code == 403
+            assert client.get(f"/api/v1/users/hosts/{guest_id}", headers=bearer(token)).status_code == 403
+        assert statements == []
+
+    def test_signing_key_is_prepared_once(self, app, ctx):
+        assert tokens._key("decode") is tokens._key("decode")
+
+
+@pytest.mark.api
+class TestRevocation:
+    def test_logout_revokes_the_token(self, client, guest):
+        issued = login(client, guest.email, "guestpass")
+        token = issued["access_token"]
+        assert client.get(f"/api/v1/users/users/{guest.id}", headers=bearer(token)).status_code == 200
+
+        assert client.post("/api/v1/auth/logout", headers=bearer(token)).status_code == 204
+        assert client.get(f"/api/v1/users/users/{guest.id}", headers=bearer(token)).status_code == 401
+        # The refresh token is revoked on its own
+        assert client.post("/api/v1/auth/logout", headers=bearer(issued["refresh_token"])).status_code == 204
+
+    def test_changed_role_revokes_earlier_tokens(self, client, guest):
+        guest.is_admin = True
+        db.session.commit()
+        token = login(client, guest.email, "guestpass")["access_token"]
+        assert decode_token(token)["is_admin"] is True
+
+        guest.is_admin = False
+        db.session.commit()
+        assert client.get("/api/v1/users/users", headers=bearer(token)).status_code == 401
+
+        token = login(client, guest.email, "guestpass")["access_token"]
+        assert decode_token(token)["is_admin"] is False
+        assert client.get(f"/api/v1/users/users/{guest.id}", headers=bearer(token)).status_code == 200
+
+    def test_becoming_a_host_revokes_earlier_tokens(self, client, guest):
+        token = login(client, guest.email, "guestpass")["access_token"]
+        guest.type = "host"
+        db.session.commit()
+        assert client.get(f"/api/v1/users/users/{guest.id}", headers=bearer(token)).status_code == 401
+
+    def test_rolled_back_change_revokes_nothing(self, client, guest):
+        token = login(client, guest.email, "guestpass")["access_token"]
+        guest.password = "not-a-hash"
+        db.session.flush()
+        db.session.rollback()
+        assert client.get(f"/api/v1/users/users/{guest.id}", headers=bearer(token)).status_code == 200
+
+    def test_deleted_account_tokens_are_refused(self, client, guest):
+        guest_id = guest.id
+        token = login(client, guest.email, "guestpass")["access_token"]
+        assert client.delete(f"/api/v1/users/users/{guest_id}", headers=bearer(token)).status_code == 204
+        assert client.get(f"/api/v1/users/users/{guest_id}", headers=bearer(token)).status_code == 401
@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.user import User
+from app.services.facade import facade
+
+
+@pytest.fixture
+def user(ctx):
+    user = facade.create_user(
+        {
+            "first_name": "Ada",
+            "last_name": "Lovelace",
+            "email": "  Ada.Lovelace@Example.COM ",
+            "password": "password123",
+        }
+    )
+    yield user
+    db.session.delete(user)
+    db.session.commit()
+
+
+@pytest.mark.facade
+class TestEmailLookup:
+    def test_email_is_stored_normalized(self, user):
+        assert user.email == "ada.lovelace@example.com"
+
+    def test_lookup_ignores_case_in_one_query(self, user):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            found = facade.get_user_by_email("ADA.lovelace@example.com")
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        assert found is user
+        assert len(statements) == 1
+
+    def test_host_lookup(self, host):
+        assert facade.get_host_by_email(host.email.upper()) is host
+        assert facade.get_host_by_email("nobody@example.com") is None
+
+    def test_case_variants_are_rejected(self, user):
+        db.session.add(
+            User(
+                first_name="Ada",
+                last_name="Copy",
+                email="ADA.LOVELACE@example.com",
+                password="x",
+            )
+        )
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.models.place import Place
+from app.services.view_counter import view_counter
+
+
+@pytest.fixture
+def place(app, host):
+    app.config.update(
+        VIEW_FLUSH_INTERVAL=0, VIEW_FLUSH_THRESHOLD=1000, VIEW_DEDUP_WINDOW=60
+    )
+    place = Place(
+        title="Counted",
+        description="Test listing",
+        price=10.0,
+        latitude=1.0,
+        longitude=1.0,
+        capacity=1,
+        host_id=host.id,
+    )
+    db.session.add(place)
+    db.session.commit()
+    return place
+
+
+def stored_views(place_id):
+    return db.session.execute(
+        text("SELECT views FROM places WHERE id = :id"), {"id": place_id}
+    ).scalar()
+
+
+@pytest.mark.utils
+class TestViewCounter:
+    def test_views_are_buffered_until_flush(self, place):
+        assert place.increment_views(viewer_key="a")
+        assert place.increment_views(viewer_key="b")
+        assert view_counter.pending(place.id) == 2
+        assert stored_views(place.id) == 0
+
+        assert view_counter.flush() == 2
+        assert view_counter.pending(place.id) == 0
+        assert stored_views(place.id) == 2
+
+    def test_repeat_views_are_deduplicated(self, place):
+        assert place.increment_views(viewer_key="same")
+        assert not place.increment_views(viewer_key="same")
+        view_counter.flush()
+        assert stored_views(place.id) == 1
+
+    def test_host_views_are_ignored(self, place, host):
+        assert not place.increment_views(user=host, viewer_key="host")
+        assert view_counter.pending(place.id) == 0
+
+    def test_flush_adds_to_concurrent_updates(self, place):
+        place.increment_views(viewer_key="x")
+        # Another worker flushed its own deltas in the meantime
+        db.session.execute(
+            text("UPDATE places SET views = views + 5 WHERE id = :id"), {"id": place.id}
+        )
+        db.session.commit()
+        view_counter.flush()
+        assert stored_views(place.id) == 6
+
+    def test_threshold_triggers_flush(self, app, place):
+        app.config["VIEW_FLUSH_THRESHOLD"] = 3
+        for viewer in ("a", "b", "c"):
+            place.increment_views(viewer_key=viewer)
+        assert view_counter.pending(place.id) == 0
+        assert stored_views(place.id) == 3
+
+    def test_failed_inline_flush_keeps_the_views(self, app, place, monkeypatch):
+        app.config["VIEW_FLUSH_THRESHOLD"] = 2
+        monkeypatch.setattr(
+            "app.services.view_counter._FLUSH_SQL", text("UPDATE no_such_table SET views = 1")
+        )
+        for viewer in ("a", "b"):
+            assert place.increment_views(viewer_key=viewer)
+        assert view_counter.pending(place.id) == 2
+        # An explicit flush (flask flush-views) reports the error
+        with pytest.raises(Exception):
+            view_counter.flush()
+        monkeypatch.undo()
+        assert view_counter.flush() == 2
+        assert stored_views(place.id) == 2
@@ -0,0 +1,166 @@
+"""
+cache.py: Small key/value caches with per-entry expiry and LRU eviction.
+
+SQLiteTTLCache keeps JSON-serializable values in a SQLite file so every
+worker process on the host shares the same entries. MemoryTTLCache offers
+the same interface inside one process. Each entry carries its own expiry,
+and the least recently used entries are evicted once the cache grows past
+its size limit.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+"""Sentinel returned by `get` when a key is absent or expired."""
+
+
+class SQLiteTTLCache:
+    """
+    Persistent TTL + LRU cache backed by a single SQLite table.
+
+    Attributes:
+        path (str): Location of the SQLite database file.
+        table (str): Table holding the entries.
+        max_entries (int): Entries kept before LRU eviction kicks in.
+    """
+
+    def __init__(self, path, table="cache", max_entries=10000):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT,"
+                " expires_at REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_last_used"
+                f" ON {table} (last_used)"
+            )
+
+    def _conn(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=MISSING):
+        """
+        Look up a key, refreshing its LRU position on a hit.
+
+        Returns:
+            The stored value (which may be None), or `default` if the key
+            is absent or expired.
+        """
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return default
+            if row[1] <= now:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return default
+            conn.execute(
+                f"UPDATE {self.table} SET last_used = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        """
+        Store a value for `ttl` seconds, evicting LRU entries if needed.
+        """
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table}"
+                " (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            self._evict(conn, now)
+
+    def delete(self, key):
+        with self._conn() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def _evict(self, conn, now):
+        """Drop expired entries, then the least recently used overflow."""
+        conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+        overflow = (
+            conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            - self.max_entries
+        )
+        if overflow > 0:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY last_used LIMIT ?)",
+                (overflow,),
+            )
+
+
+class MemoryTTLCache:
+    """
+    In-process TTL + LRU cache with the interface of SQLiteTTLCache.
+
+    Values are stored as is, not copied.
+
+    Attributes:
+        max_entries (int): Entries kept before LRU eviction kicks in.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at), LRU first
+
+    def get(self, key, default=MISSING):
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return default
+            if item[1] <= now:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return item[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
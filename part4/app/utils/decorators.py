@@ -2,6 +2,7 @@
 
 from functools import wraps
 from flask import abort, flash, redirect, url_for
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 from flask_login import current_user
 
 def admin_required(f):
@@ -19,3 +20,21 @@ def admin_required(f):
         return f(*args, **kwargs)
 
     return decorated_function
+
+
+def login_or_jwt_required(f):
+    """
+    Decorator for JSON endpoints shared by the site and API clients: accepts
+    a logged-in session or a Bearer JWT, and passes the caller's id as
+    `user_id`. Without either, answers 401 the way flask-jwt-extended does.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if current_user.is_authenticated:
+            user_id = current_user.id
+        else:
+            verify_jwt_in_request()
+            user_id = get_jwt_identity()
+        return f(*args, user_id=user_id, **kwargs)
+
+    return decorated_function
@@ -0,0 +1,212 @@
+"""
+geo.py: Geospatial helpers used by place search.
+
+Provides geohash encoding for the indexed ``Place.geohash`` column, the
+bounding-box / cell-cover computations used to prefilter radius searches
+in SQL, and a vectorized haversine engine that computes distances for
+whole arrays of coordinates at once.
+"""
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# Number of characters stored in Place.geohash (~5 m x 5 m cells)
+GEOHASH_PRECISION = 9
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(lat, lon, precision=GEOHASH_PRECISION):
+    """
+    Encode a latitude/longitude pair as a geohash string.
+
+    Args:
+        lat (float): Latitude in degrees.
+        lon (float): Longitude in degrees.
+        precision (int): Number of base32 characters to produce.
+
+    Returns:
+        str: The geohash of the cell containing the point.
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits, ch, even = 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch = (ch << 1) | 1
+                lon_lo = mid
+            else:
+                ch <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_lo = mid
+            else:
+                ch <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Return the (height, width) in degrees of a geohash cell."""
+    lat_bits = (5 * precision) // 2
+    lon_bits = 5 * precision - lat_bits
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    Compute the lat/lon rectangle enclosing a circle on the earth's surface.
+
+    Uses the same spherical earth as `haversine`, so every point within
+    `radius_km` by that distance lies inside the box.
+
+    Returns:
+        tuple: (min_lat, min_lon, max_lat, max_lon). Longitudes may fall
+        outside [-180, 180] when the box crosses the antimeridian.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        # The circle covers a pole: every longitude is in range
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+    # Widest point of the circle, which lies poleward of `lat`
+    dlon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+    return min_lat, lon - dlon, max_lat, lon + dlon
+
+
+def _longitude_ranges(min_lon, max_lon):
+    """Split a longitude interval that wraps the antimeridian in two."""
+    if min_lon < -180.0:
+        return [(min_lon + 360.0, 180.0), (-180.0, max_lon)]
+    if max_lon > 180.0:
+        return [(min_lon, 180.0), (-180.0, max_lon - 360.0)]
+    return [(min_lon, max_lon)]
+
+
+def _cells_in_range(lo, hi, size, floor):
+    """Number of grid cells of `size` needed to span [lo, hi]."""
+    first = math.floor((lo - floor) / size)
+    last = math.floor((hi - floor) / size)
+    return last - first + 1
+
+
+def covering_geohashes(bbox, max_cells=32):
+    """
+    Choose the finest set of geohash prefixes covering a bounding box.
+
+    The precision is the largest one (up to GEOHASH_PRECISION) whose cover
+    needs at most `max_cells` cells, so each prefix is an index range scan.
+
+    Args:
+        bbox (tuple): (min_lat, min_lon, max_lat, max_lon) as returned by
+            `bounding_box`.
+        max_cells (int): Upper bound on the number of prefixes returned.
+
+    Returns:
+        list[str] | None: Sorted geohash prefixes, or None if the box is so
+        large that no prefix filter would help.
+    """
+    min_lat, min_lon, max_lat, max_lon = bbox
+    lon_ranges = _longitude_ranges(min_lon, max_lon)
+
+    precision = 0
+    for p in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(p)
+        rows = _cells_in_range(min_lat, max_lat, height, -90.0)
+        cols = sum(_cells_in_range(lo, hi, width, -180.0) for lo, hi in lon_ranges)
+        if rows * cols <= max_cells:
+            precision = p
+            break
+    if precision == 0:
+        return None
+
+    height, width = cell_size(precision)
+    cells = set()
+    row = math.floor((min_lat + 90.0) / height)
+    while -90.0 + row * height <= max_lat and row * height < 180.0:
+        center_lat = -90.0 + (row + 0.5) * height
+        for lo, hi in lon_ranges:
+            col = math.floor((lo + 180.0) / width)
+            while -180.0 + col * width <= hi and col * width < 360.0:
+                center_lon = -180.0 + (col + 0.5) * width
+                cells.add(encode_geohash(center_lat, center_lon, precision))
+                col += 1
+        row += 1
+    return sorted(cells)
+
+
+def haversine_distances(lat, lon, lats, lons):
+    """
+    Great-circle distances in kilometers from one point to many.
+
+    Args:
+        lat (float): Latitude of the origin in degrees.
+        lon (float): Longitude of the origin in degrees.
+        lats (array-like): Latitudes of the targets in degrees.
+        lons (array-like): Longitudes of the targets in degrees.
+
+    Returns:
+        numpy.ndarray: Distances, one per target.
+    """
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lons, dtype=np.float64) - lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometers between two points."""
+    return float(haversine_distances(lat1, lon1, [lat2], [lon2])[0])
+
+
+def within_radius(lat, lon, lats, lons, radius_km):
+    """
+    Compute distances and the matching radius mask in one pass.
+
+    Returns:
+        tuple: (distances, mask) where mask[i] is True when target i lies
+        within `radius_km` of the origin.
+    """
+    distances = haversine_distances(lat, lon, lats, lons)
+    return distances, distances <= radius_km
+
+
+def sort_by_distance(items, lat, lon, radius_km=None):
+    """
+    Order objects with `latitude`/`longitude` attributes by distance.
+
+    Args:
+        items (list): Objects to rank, e.g. Place instances.
+        lat (float): Latitude of the origin.
+        lon (float): Longitude of the origin.
+        radius_km (float | None): Drop items farther than this if given.
+
+    Returns:
+        list[tuple]: (item, distance_km) pairs, nearest first.
+    """
+    if not items:
+        return []
+    lats = np.fromiter((i.latitude for i in items), np.float64, len(items))
+    lons = np.fromiter((i.longitude for i in items), np.float64, len(items))
+    distances = haversine_distances(lat, lon, lats, lons)
+    order = np.argsort(distances, kind="stable")
+    if radius_km is not None:
+        order = order[distances[order] <= radius_km]
+    return [(items[i], float(distances[i])) for i in order]
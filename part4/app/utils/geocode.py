@@ -1,43 +1,201 @@
-import math
+"""
+geocode.py: Address geocoding with a persistent cache and offline gazetteer.
+
+Lookups are resolved in order from:
+
+1. the gazetteer, a table of well-known places preloaded from a CSV;
+2. the geocode cache, which also remembers addresses that were not found;
+3. OpenStreetMap's Nominatim API, called with a strict timeout.
+
+Both tables live in one SQLite file (GEOCODE_CACHE_PATH, by default in the
+instance folder) so that all worker processes share them.
+"""
+
+import csv
+import os
+import re
+import sqlite3
+import unicodedata
+
 import requests
-from flask import jsonify, request
-from math import radians, sin, cos, sqrt, atan2
+from flask import current_app
 
-def geocode_address(address):
+from app.utils.cache import MISSING, SQLiteTTLCache
+
+DEFAULTS = {
+    "GEOCODER_URL": "https://nominatim.openstreetmap.org/search",
+    "GEOCODER_TIMEOUT": 3.0,
+    "GEOCODER_USER_AGENT": "hbnb-geocoder/1.0",
+    "GEOCODE_CACHE_PATH": None,
+    "GEOCODE_CACHE_TTL": 30 * 24 * 3600,
+    "GEOCODE_NEGATIVE_TTL": 3600,
+    "GEOCODE_CACHE_MAX_ENTRIES": 10000,
+    "GEOCODE_GAZETTEER_CSV": None,
+}
+
+
+def normalize_query(address):
+    """
+    Build the cache key for an address.
+
+    Case, accents, punctuation and repeated whitespace are ignored, so
+    "Paris, France" and "  paris   FRANCE " share one entry.
+    """
+    text = unicodedata.normalize("NFKD", address)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w]+", " ", text.lower())
+    return " ".join(text.split())
+
+
+class Gazetteer:
+    """
+    Offline table of place names resolved without any network access.
+
+    Attributes:
+        path (str): SQLite file holding the `gazetteer` table.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with sqlite3.connect(path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS gazetteer ("
+                " key TEXT PRIMARY KEY, lat REAL NOT NULL, lon REAL NOT NULL)"
+            )
+
+    def lookup(self, key):
+        """Return (lat, lon) for a normalized key, or None."""
+        with sqlite3.connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT lat, lon FROM gazetteer WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def load_csv(self, csv_path):
+        """
+        Load entries from a CSV with `name`, `latitude` and `longitude`
+        columns and an optional `country` column.
+
+        Each row is stored under its name alone and, when a country is
+        given, under "name country" as well.
+
+        Returns:
+            int: Number of rows read.
+        """
+        entries, rows = [], 0
+        with open(csv_path, newline="", encoding="utf-8") as fh:
+            for row in csv.DictReader(fh):
+                rows += 1
+                lat, lon = float(row["latitude"]), float(row["longitude"])
+                entries.append((normalize_query(row["name"]), lat, lon))
+                if row.get("country"):
+                    key = normalize_query(f"{row['name']} {row['country']}")
+                    entries.append((key, lat, lon))
+        with sqlite3.connect(self.path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO gazetteer (key, lat, lon) VALUES (?, ?, ?)",
+                entries,
+            )
+        return rows
+
+
+class Geocoder:
+    """
+    Flask extension resolving addresses to coordinates.
+
+    State is kept per application in `app.extensions["geocoder"]`.
     """
-    Geocodes an address using OpenStreetMap's Nominatim API and returns latitude and longitude.
-    """
-    url = f'https://nominatim.openstreetmap.org/search'
-    params = {
-        'q': address,
-        'format': 'json',
-        'addressdetails': 1,
-        'limit': 1
-    }
-    
-    response = requests.get(url, params=params)
-    
-    if response.status_code == 200:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        app.extensions["geocoder"] = {}
+        csv_path = app.config["GEOCODE_GAZETTEER_CSV"]
+        if csv_path and os.path.exists(csv_path):
+            with app.app_context():
+                self.gazetteer().load_csv(csv_path)
+
+    def _state(self):
+        config = current_app.config
+        state = current_app.extensions["geocoder"]
+        path = config["GEOCODE_CACHE_PATH"] or os.path.join(
+            current_app.instance_path, "geocode_cache.sqlite"
+        )
+        if state.get("path") != path:
+            state.clear()
+            state["path"] = path
+            state["cache"] = SQLiteTTLCache(
+                path,
+                table="geocode_cache",
+                max_entries=config["GEOCODE_CACHE_MAX_ENTRIES"],
+            )
+            state["gazetteer"] = Gazetteer(path)
+        return state
+
+    def cache(self):
+        return self._state()["cache"]
+
+    def gazetteer(self):
+        return self._state()["gazetteer"]
+
+    def geocode(self, address):
+        """
+        Resolve an address to (lat, lon).
+
+        Raises:
+            ValueError: If the address is unknown (also cached, briefly).
+            requests.RequestException: If the upstream call fails or times
+                out; such failures are not cached.
+        """
+        config = current_app.config
+        key = normalize_query(address)
+        if not key:
+            raise ValueError("Empty address.")
+
+        coords = self.gazetteer().lookup(key)
+        if coords:
+            return coords
+
+        cache = self.cache()
+        cached = cache.get(key)
+        if cached is not MISSING:
+            if cached is None:
+                raise ValueError(f"Address '{address}' not found.")
+            return tuple(cached)
+
+        response = requests.get(
+            config["GEOCODER_URL"],
+            params={"q": address, "format": "json", "addressdetails": 1, "limit": 1},
+            headers={"User-Agent": config["GEOCODER_USER_AGENT"]},
+            timeout=config["GEOCODER_TIMEOUT"],
+        )
+        if response.status_code != 200:
+            raise requests.HTTPError(
+                f"Error in geocoding request ({response.status_code}).",
+                response=response,
+            )
+
         data = response.json()
-        if data:
-            lat = float(data[0]['lat'])
-            lon = float(data[0]['lon'])
-            return lat, lon
-        else:
+        if not data:
+            cache.set(key, None, config["GEOCODE_NEGATIVE_TTL"])
             raise ValueError(f"Address '{address}' not found.")
-    else:
-        raise Exception("Error in geocoding request.")
-
-
-# Helper function to calculate the distance between two points (Haversine formula)
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371  # Radius of Earth in kilometers
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = (sin(dlat / 2) ** 2 +
-         cos(radians(lat1)) * cos(radians(lat2)) *
-         sin(dlon / 2) ** 2)
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    distance = R * c  # Distance in kilometers
-    print(f"Distance: {distance} km")  # Debugging line
-    return distance
\ No newline at end of file
+
+        coords = (float(data[0]["lat"]), float(data[0]["lon"]))
+        cache.set(key, list(coords), config["GEOCODE_CACHE_TTL"])
+        return coords
+
+
+geocoder = Geocoder()
+
+
+def geocode_address(address):
+    """
+    Geocodes an address and returns latitude and longitude.
+
+    See `Geocoder.geocode` for the lookup order and errors raised.
+    """
+    return geocoder.geocode(address)
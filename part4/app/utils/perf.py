@@ -0,0 +1,194 @@
+"""
+perf.py: Opt-in per-request SQL and latency instrumentation.
+
+When PERF_ENABLED is set, every request records:
+
+- the number of SQL statements it executed and the time spent in them,
+  measured with SQLAlchemy `before/after_cursor_execute` engine events;
+- its wall time, measured from Flask's before/after request hooks.
+
+Each response carries a `Server-Timing` header, e.g.
+
+    Server-Timing: db;dur=3.12;desc="4 queries", total;dur=18.40
+
+which browser dev tools show next to the request. Samples are aggregated
+per endpoint (the last PERF_SAMPLE_SIZE requests for percentiles, plus
+cumulative latency histograms) and served as JSON by `/admin/perf`.
+Requests running more than PERF_QUERY_BUDGET statements are logged as
+warnings, which is how N+1 loops usually show up.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+import numpy as np
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from app.database import db
+
+DEFAULTS = {
+    "PERF_ENABLED": False,
+    "PERF_QUERY_BUDGET": 25,
+    "PERF_SAMPLE_SIZE": 1000,
+}
+
+# Upper bounds (ms) of the latency histogram buckets; the last is open-ended
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class _EndpointStats:
+    """Samples and histograms for one endpoint."""
+
+    def __init__(self, sample_size):
+        self.count = 0
+        self.over_budget = 0
+        self.samples = deque(maxlen=sample_size)  # (wall_ms, db_ms, queries)
+        self.histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def add(self, wall_ms, db_ms, queries, over_budget):
+        self.count += 1
+        self.over_budget += over_budget
+        self.samples.append((wall_ms, db_ms, queries))
+        self.histogram[bisect_left(HISTOGRAM_BUCKETS_MS, wall_ms)] += 1
+
+    def summary(self):
+        data = np.array(self.samples, dtype=float)
+        wall, db_time, queries = data[:, 0], data[:, 1], data[:, 2]
+
+        def pct(values):
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            return {"p50": round(p50, 2), "p95": round(p95, 2), "p99": round(p99, 2)}
+
+        labels = [f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS]
+        labels.append(f">{HISTOGRAM_BUCKETS_MS[-1]}ms")
+        return {
+            "requests": self.count,
+            "over_query_budget": self.over_budget,
+            "wall_ms": pct(wall),
+            "db_ms": pct(db_time),
+            "queries": {**pct(queries), "max": int(queries.max())},
+            "histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+class _PerfState:
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+
+class PerfMonitor:
+    """
+    Flask extension recording query counts and latencies per endpoint.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        if not app.config["PERF_ENABLED"]:
+            return
+        app.extensions["perf"] = _PerfState(app)
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", _before_execute)
+                event.listen(engine, "after_cursor_execute", _after_execute)
+
+        app.before_request(_start_request)
+        app.after_request(self._finish_request)
+
+    @staticmethod
+    def enabled(app=None):
+        return "perf" in (app or current_app).extensions
+
+    def _finish_request(self, response):
+        started = g.pop("perf_started", None)
+        if started is None:
+            return response
+        wall_ms = (time.perf_counter() - started) * 1000
+        queries = g.pop("perf_queries", 0)
+        db_ms = g.pop("perf_db_seconds", 0.0) * 1000
+
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={db_ms:.2f};desc="{queries} queries", total;dur={wall_ms:.2f}',
+        )
+
+        state = current_app.extensions["perf"]
+        budget = state.app.config["PERF_QUERY_BUDGET"]
+        endpoint = request.endpoint or "<unmatched>"
+        over_budget = bool(budget) and queries > budget
+        if over_budget:
+            current_app.logger.warning(
+                "%s %s ran %d SQL statements (budget %d, %.1f ms in DB)",
+                request.method,
+                request.path,
+                queries,
+                budget,
+                db_ms,
+            )
+
+        with state.lock:
+            stats = state.endpoints.get(endpoint)
+            if stats is None:
+                stats = state.endpoints[endpoint] = _EndpointStats(
+                    state.app.config["PERF_SAMPLE_SIZE"]
+                )
+            stats.add(wall_ms, db_ms, queries, over_budget)
+        return response
+
+    def report(self):
+        """
+        Per-endpoint summary, slowest p95 first.
+
+        Returns:
+            dict: {"enabled": bool, "query_budget": int, "endpoints": {...}}
+        """
+        if not self.enabled():
+            return {"enabled": False, "endpoints": {}}
+        state = current_app.extensions["perf"]
+        with state.lock:
+            summaries = {name: s.summary() for name, s in state.endpoints.items()}
+        ordered = sorted(summaries.items(), key=lambda kv: -kv[1]["wall_ms"]["p95"])
+        return {
+            "enabled": True,
+            "query_budget": state.app.config["PERF_QUERY_BUDGET"],
+            "endpoints": dict(ordered),
+        }
+
+    def reset(self):
+        if self.enabled():
+            state = current_app.extensions["perf"]
+            with state.lock:
+                state.endpoints.clear()
+
+
+perf = PerfMonitor()
+
+
+# ---- Hooks ----
+
+
+def _start_request():
+    g.perf_started = time.perf_counter()
+    g.perf_queries = 0
+    g.perf_db_seconds = 0.0
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    context._perf_started = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    # Statements run outside a request (CLI, background flushes) are not tracked
+    if has_request_context() and "perf_started" in g:
+        g.perf_queries += 1
+        g.perf_db_seconds += time.perf_counter() - context._perf_started
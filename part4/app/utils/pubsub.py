@@ -0,0 +1,265 @@
+"""
+pubsub.py: Publish/subscribe channels for pushing events to clients.
+
+Subscribers (e.g. an open Server-Sent Events response) get a Subscription
+on a channel name and block on `get(timeout)`; `pubsub.publish(channel,
+message)` hands a JSON-serializable message to every current subscriber
+of that channel.
+
+Delivery to the subscribers of a process always goes through its local
+hub. What connects the processes is the broker (PUBSUB_BROKER):
+
+- "memory": publishes straight to the local hub; enough for a single
+  worker process.
+- "sqlite": appends messages to a SQLite file (PUBSUB_PATH) shared by the
+  worker processes of a host. Each process polls it for new rows every
+  PUBSUB_POLL_INTERVAL seconds, while it has subscribers, and fans them
+  out to its hub.
+- "package.module:Class": any class taking (app, hub) and implementing
+  `publish(channel, message)` and `on_subscribe()`, which delivers what
+  it receives with `hub.deliver(channel, message)`; e.g. to use Redis
+  between hosts.
+
+Messages are not stored for late subscribers; consumers that must not
+miss events re-read them from the database after (re)subscribing.
+"""
+
+import importlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from flask import current_app, has_app_context
+
+DEFAULTS = {
+    "PUBSUB_BROKER": "memory",
+    "PUBSUB_PATH": None,
+    "PUBSUB_POLL_INTERVAL": 0.5,
+    "PUBSUB_QUEUE_SIZE": 100,
+}
+
+# Seconds a message stays in the SQLite broker file
+SQLITE_RETENTION = 60
+
+
+class Subscription:
+    """
+    Messages of one channel for one subscriber, buffered up to `maxsize`.
+
+    A subscriber too slow to keep up loses the oldest messages.
+    """
+
+    def __init__(self, hub, channel, maxsize):
+        self.hub = hub
+        self.channel = channel
+        self.messages = queue.Queue(maxsize)
+
+    def put(self, message):
+        while True:
+            try:
+                self.messages.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.messages.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Next message, or None after `timeout` seconds without one."""
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LocalHub:
+    """Subscriptions of this process, by channel."""
+
+    def __init__(self, queue_size):
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.channels = {}
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.queue_size)
+        with self.lock:
+            self.channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.channels[subscription.channel]
+
+    def deliver(self, channel, message):
+        with self.lock:
+            subscribers = list(self.channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(message)
+        return len(subscribers)
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(s) for s in self.channels.values())
+
+
+class MemoryBroker:
+    """Single-process broker: publishing is local delivery."""
+
+    def __init__(self, app, hub):
+        self.hub = hub
+
+    def publish(self, channel, message):
+        self.hub.deliver(channel, message)
+
+    def on_subscribe(self):
+        pass
+
+
+class SQLiteBroker:
+    """
+    Broker for the worker processes of one host, through a shared SQLite file.
+    """
+
+    def __init__(self, app, hub):
+        self.hub = hub
+        self.path = app.config["PUBSUB_PATH"] or os.path.join(
+            app.instance_path, "pubsub.sqlite"
+        )
+        self.interval = app.config["PUBSUB_POLL_INTERVAL"]
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._poller = None
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pubsub ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " channel TEXT NOT NULL,"
+                " message TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+
+    def _conn(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def publish(self, channel, message):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO pubsub (channel, message, created_at) VALUES (?, ?, ?)",
+                (channel, json.dumps(message), time.time()),
+            )
+
+    def on_subscribe(self):
+        """Start polling the file on first subscription."""
+        with self._lock:
+            if self._poller is None:
+                self._poller = threading.Thread(
+                    target=self._poll, name="pubsub-poller", daemon=True
+                )
+                self._poller.start()
+
+    def _poll(self):
+        conn = self._conn()
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM pubsub").fetchone()[0]
+        last_prune = time.monotonic()
+        while True:
+            time.sleep(self.interval)
+            if not len(self.hub):
+                # Nobody to deliver to: skip what was published meanwhile
+                last_id = conn.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM pubsub"
+                ).fetchone()[0]
+                continue
+            rows = conn.execute(
+                "SELECT id, channel, message FROM pubsub WHERE id > ? ORDER BY id",
+                (last_id,),
+            ).fetchall()
+            for row_id, channel, message in rows:
+                self.hub.deliver(channel, json.loads(message))
+                last_id = row_id
+            if time.monotonic() - last_prune > SQLITE_RETENTION:
+                with conn:
+                    conn.execute(
+                        "DELETE FROM pubsub WHERE created_at < ?",
+                        (time.time() - SQLITE_RETENTION,),
+                    )
+                last_prune = time.monotonic()
+
+
+BROKERS = {"memory": MemoryBroker, "sqlite": SQLiteBroker}
+
+
+class _PubSubState:
+    def __init__(self, app):
+        self.hub = LocalHub(app.config["PUBSUB_QUEUE_SIZE"])
+        name = app.config["PUBSUB_BROKER"]
+        if name in BROKERS:
+            broker_class = BROKERS[name]
+        elif ":" in name:
+            module, _, attr = name.partition(":")
+            broker_class = getattr(importlib.import_module(module), attr)
+        else:
+            raise ValueError(f"Unknown PUBSUB_BROKER: {name!r}")
+        self.broker = broker_class(app, self.hub)
+
+
+class PubSub:
+    """
+    Flask extension routing published messages to subscribers.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        app.extensions["pubsub"] = _PubSubState(app)
+
+    @staticmethod
+    def _state(app=None):
+        return (app or current_app).extensions["pubsub"]
+
+    def publish(self, channel, message, app=None):
+        if app is None and not has_app_context():
+            return
+        self._state(app).broker.publish(channel, message)
+
+    def subscribe(self, channel, app=None):
+        """
+        Start receiving the messages published on `channel`.
+
+        Returns:
+            Subscription: Close it (or use it as a context manager) when done.
+        """
+        state = self._state(app)
+        subscription = state.hub.subscribe(channel)
+        state.broker.on_subscribe()
+        return subscription
+
+
+pubsub = PubSub()
@@ -0,0 +1,298 @@
+"""
+response_cache.py: Cache of public responses and page fragments.
+
+Read-only public endpoints are wrapped with `response_cache.cached(...)`,
+which stores the finished response (body, status, headers) under the
+request path and query string. Cached responses carry an ETag, so clients
+revalidating with `If-None-Match` get an empty 304.
+`response_cache.fragment(...)` does the same for a piece of HTML inside a
+page that is otherwise rendered per user (e.g. the index listings).
+
+Entries are stored in a TTL + LRU backend from app.utils.cache: in process
+memory, or a SQLite file shared by all worker processes
+(RESPONSE_CACHE_BACKEND = "memory" | "sqlite").
+
+Invalidation is driven by writes. Each entry is tagged with what it was
+built from ("places", "place:<id>", "host:<id>", ...). Every tag has a
+version stored next to the entries; an entry is only served while all of
+its tags still have the versions it was built with. After a commit, the
+tags of the rows the transaction inserted, updated or deleted get new
+versions, so editing one place drops its detail page and the listings but
+keeps every other place's cached pages. Writes issued as plain SQL (e.g.
+the buffered view counts) are not seen and only show up once entries
+expire, RESPONSE_CACHE_TTL seconds at most.
+"""
+
+import functools
+import hashlib
+import os
+import uuid
+
+from flask import Response, current_app, has_app_context, request
+from flask_restx import Resource
+from flask_restx.utils import unpack
+from markupsafe import Markup
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.models.booking import Booking
+from app.models.place import Place
+from app.models.place_photo import PlacePhoto
+from app.models.review import Review
+from app.models.user import User
+from app.utils.cache import MISSING, MemoryTTLCache, SQLiteTTLCache
+
+DEFAULTS = {
+    "RESPONSE_CACHE_ENABLED": True,
+    "RESPONSE_CACHE_BACKEND": "memory",
+    "RESPONSE_CACHE_PATH": None,
+    "RESPONSE_CACHE_TTL": 300,
+    "RESPONSE_CACHE_MAX_ENTRIES": 2000,
+}
+
+# Tag versions outlive entries; an evicted version is replaced by a new one,
+# which only turns the entries built with the old one into misses
+TAG_TTL = 7 * 24 * 3600
+
+# Response headers not replayed from the cache
+_SKIPPED_HEADERS = {"content-length", "set-cookie", "etag", "x-cache"}
+
+_TAGS_KEY = "response_cache_tags"
+
+
+class ResponseCache:
+    """
+    Flask extension caching public responses and fragments.
+
+    The backend is kept per application in `app.extensions["response_cache"]`.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        for key, value in DEFAULTS.items():
+            app.config.setdefault(key, value)
+        if not app.config["RESPONSE_CACHE_ENABLED"]:
+            return
+        max_entries = app.config["RESPONSE_CACHE_MAX_ENTRIES"]
+        backend = app.config["RESPONSE_CACHE_BACKEND"]
+        if backend == "sqlite":
+            path = app.config["RESPONSE_CACHE_PATH"] or os.path.join(
+                app.instance_path, "response_cache.sqlite"
+            )
+            store = SQLiteTTLCache(path, table="response_cache", max_entries=max_entries)
+        elif backend == "memory":
+            store = MemoryTTLCache(max_entries=max_entries)
+        else:
+            raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend!r}")
+        app.extensions["response_cache"] = store
+
+    @staticmethod
+    def _store():
+        if not has_app_context():
+            return None
+        return current_app.extensions.get("response_cache")
+
+    # ---- Tags ----
+
+    def _versions(self, store, tags):
+        """Current version of each tag, creating the missing ones."""
+        versions = {}
+        for tag in tags:
+            version = store.get(f"tag:{tag}")
+            if version is MISSING:
+                version = uuid.uuid4().hex
+                store.set(f"tag:{tag}", version, TAG_TTL)
+            versions[tag] = version
+        return versions
+
+    def _lookup(self, store, key):
+        entry = store.get(key)
+        if entry is MISSING:
+            return None
+        for tag, version in entry["tags"].items():
+            if store.get(f"tag:{tag}") != version:
+                return None
+        return entry
+
+    def invalidate(self, *tags):
+        """Drop every entry built from any of `tags`."""
+        store = self._store()
+        if store is None:
+            return
+        for tag in tags:
+            store.set(f"tag:{tag}", uuid.uuid4().hex, TAG_TTL)
+
+    def clear(self):
+        store = self._store()
+        if store is not None:
+            store.clear()
+
+    # ---- Responses ----
+
+    def cached(self, tags, ttl=None):
+        """
+        Decorator caching the response of a GET view.
+
+        Works on plain Flask views and on flask-restx Resource methods
+        (placed above `marshal_with` so the marshalled output is cached).
+        Only 200 responses are stored.
+
+        Args:
+            tags (iterable | callable): Tags of the data the response is
+                built from, or a function of the view arguments returning
+                them.
+            ttl (int | None): Seconds an entry lives (RESPONSE_CACHE_TTL
+                by default).
+        """
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                store = self._store()
+                if store is None or request.method not in ("GET", "HEAD"):
+                    return view(*args, **kwargs)
+
+                key = f"response:{request.path}?{_canonical_query()}"
+                entry = self._lookup(store, key)
+                if entry is not None:
+                    response = Response(
+                        entry["body"], entry["status"], entry["headers"]
+                    )
+                    return _conditional(response, entry["etag"], "HIT")
+
+                # Versions are read before rendering: a commit landing
+                # meanwhile leaves the new entry already stale
+                entry_tags = tags(**kwargs) if callable(tags) else tags
+                versions = self._versions(store, entry_tags)
+                response = _make_response(view(*args, **kwargs), args)
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+
+                body = response.get_data(as_text=True)
+                etag = hashlib.sha1(body.encode()).hexdigest()
+                store.set(
+                    key,
+                    {
+                        "body": body,
+                        "status": response.status_code,
+                        "headers": [
+                            [k, v]
+                            for k, v in response.headers.items()
+                            if k.lower() not in _SKIPPED_HEADERS
+                        ],
+                        "etag": etag,
+                        "tags": versions,
+                    },
+                    ttl or current_app.config["RESPONSE_CACHE_TTL"],
+                )
+                return _conditional(response, etag, "MISS")
+
+            return wrapper
+
+        return decorator
+
+    def fragment(self, key, render, tags, ttl=None):
+        """
+        Cached piece of HTML.
+
+        Args:
+            key (str): Name of the fragment.
+            render (callable): Renders the fragment on a miss.
+            tags (iterable): Tags of the data the fragment is built from.
+            ttl (int | None): Seconds an entry lives (RESPONSE_CACHE_TTL
+                by default).
+
+        Returns:
+            Markup: The fragment, safe to insert in a template.
+        """
+        store = self._store()
+        if store is None:
+            return Markup(render())
+        key = f"fragment:{key}"
+        entry = self._lookup(store, key)
+        if entry is None:
+            versions = self._versions(store, tags)
+            entry = {"body": str(render()), "tags": versions}
+            store.set(key, entry, ttl or current_app.config["RESPONSE_CACHE_TTL"])
+        return Markup(entry["body"])
+
+
+response_cache = ResponseCache()
+
+
+def _canonical_query():
+    """Query string with sorted arguments, so ?a=1&b=2 and ?b=2&a=1 share a key."""
+    return "&".join(
+        f"{k}={v}" for k, v in sorted(request.args.items(multi=True))
+    )
+
+
+def _make_response(rv, args):
+    if isinstance(rv, Response):
+        return rv
+    if args and isinstance(args[0], Resource):
+        data, code, headers = unpack(rv)
+        return args[0].api.make_response(data, code, headers)
+    return current_app.make_response(rv)
+
+
+def _conditional(response, etag, status):
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate it (cheaply, via the
+    # ETag) before reuse, so invalidations are seen at once
+    response.cache_control.no_cache = True
+    response.headers["X-Cache"] = status
+    return response.make_conditional(request)
+
+
+# ---- Invalidation on commit ----
+
+
+def _loaded(obj, attr):
+    """Current and previous values of an attribute, without loading it."""
+    history = inspect(obj).attrs[attr].history
+    return {v for v in (*history.added, *history.unchanged, *history.deleted) if v}
+
+
+def _tags_for(obj, review_place_ids):
+    if isinstance(obj, Place):
+        return {"places", f"place:{obj.id}"} | {
+            f"host:{hid}" for hid in _loaded(obj, "host_id")
+        }
+    if isinstance(obj, PlacePhoto):
+        return {"places"} | {f"place:{pid}" for pid in _loaded(obj, "place_id")}
+    if isinstance(obj, Review):
+        place_ids = _loaded(obj, "place_id")
+        review_place_ids.update(place_ids)
+        return {"ratings"} | {f"place:{pid}" for pid in place_ids}
+    if isinstance(obj, Booking):
+        # Host statistics include occupancy
+        return {"bookings"} | {f"host:{hid}" for hid in _loaded(obj, "host_id")}
+    if isinstance(obj, User):
+        return {f"host:{obj.id}"}
+    return set()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_tags(session, flush_context):
+    # Tags left after a rollback merely invalidate a few entries needlessly
+    tags = session.info.setdefault(_TAGS_KEY, set())
+    review_place_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tags.update(_tags_for(obj, review_place_ids))
+    if review_place_ids:
+        # Host ratings are computed from the reviews of the host's places
+        rows = session.connection().execute(
+            select(Place.host_id).where(Place.id.in_(review_place_ids))
+        )
+        tags.update(f"host:{hid}" for (hid,) in rows if hid)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    tags = session.info.pop(_TAGS_KEY, None)
+    if tags:
+        response_cache.invalidate(*tags)
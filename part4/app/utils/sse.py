@@ -0,0 +1,59 @@
+"""
+sse.py: Server-Sent Events responses fed by a pubsub subscription.
+"""
+
+import json
+import time
+
+from flask import Response
+
+
+def format_event(event, data, event_id=None):
+    """One SSE event; `event_id` is what the browser sends back as Last-Event-ID."""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def event_stream(subscription, opening, timeout, heartbeat, select):
+    """
+    Streaming response relaying a subscription to the client.
+
+    The generator runs after the request has ended, without an app
+    context: everything that needs the database must be done before, and
+    passed in through `opening`.
+
+    Args:
+        subscription (Subscription): Closed when the stream ends.
+        opening (list[str]): Formatted events sent first.
+        timeout (float): Seconds before the stream ends; the browser
+            reconnects by itself.
+        heartbeat (float): Seconds between keep-alive comments.
+        select (callable): Maps a published message to a formatted event,
+            or None to skip it.
+
+    Returns:
+        Response: A text/event-stream response.
+    """
+
+    def events():
+        try:
+            yield "retry: 3000\n"
+            yield from opening
+            deadline = time.monotonic() + timeout
+            while (remaining := deadline - time.monotonic()) > 0:
+                message = subscription.get(timeout=min(heartbeat, remaining))
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                event = select(message)
+                if event is not None:
+                    yield event
+        finally:
+            subscription.close()
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
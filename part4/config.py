@@ -9,6 +9,77 @@ class Config:
     SECRET_KEY (str): Flask secret key, defaults to 'default_secret_key' if env var not set.
     DEBUG (bool): Debug mode flag, defaults to False.
     JWT_SECRET_KEY (str): Signing key for JWTs, should be overridden via env var in production.
+    GEOCODER_TIMEOUT (float): Seconds to wait for the geocoding API before giving up.
+    GEOCODE_CACHE_PATH (str): SQLite file for the geocode cache and gazetteer
+        (defaults to the instance folder).
+    GEOCODE_GAZETTEER_CSV (str): Optional CSV of well-known places loaded at startup.
+    VIEW_FLUSH_INTERVAL (float): Seconds between background flushes of buffered place views.
+    VIEW_FLUSH_THRESHOLD (int): Pending views that trigger an immediate flush.
+    VIEW_DEDUP_WINDOW (int): Seconds during which repeat views by one viewer count once.
+    AVAILABILITY_TTL (int): Seconds a cached place availability calendar stays valid.
+    PAGE_SIZE (int): Default number of items per page in list endpoints.
+    MAX_PAGE_SIZE (int): Upper bound for the `limit` query parameter.
+    PERF_ENABLED (bool): Record SQL statement counts and latencies per endpoint.
+    PERF_QUERY_BUDGET (int): Statements per request above which a warning is logged.
+    PERF_SAMPLE_SIZE (int): Recent requests kept per endpoint for percentiles.
+    RESPONSE_CACHE_ENABLED (bool): Cache public read endpoints and the index listings.
+    RESPONSE_CACHE_BACKEND (str): "memory" (per process) or "sqlite" (shared by workers).
+    RESPONSE_CACHE_PATH (str): SQLite file of the shared backend (defaults to the
+        instance folder).
+    RESPONSE_CACHE_TTL (int): Seconds a cached response stays valid at most.
+    RATING_PRIOR_WEIGHT (int): Virtual reviews at the site-wide mean added to each
+        place's Bayesian rating.
+    HOST_STATS_MATERIALIZED (bool): Store host statistics in the host_stats table
+        instead of computing them on each read.
+    HOST_STATS_MAX_AGE (int): Seconds a stored host statistics row is served before
+        being recomputed.
+    HOST_STATS_WINDOW_DAYS (int): Trailing window, in days, over which host
+        occupancy is measured.
+    OUTBOX_WORKERS (int): Background job worker threads per process (0 leaves jobs
+        to `flask outbox-worker`).
+    OUTBOX_BATCH_SIZE (int): Jobs a worker claims at once.
+    OUTBOX_MAX_ATTEMPTS (int): Runs of a failing job before it is marked failed.
+    OUTBOX_BACKOFF_BASE (float): Seconds before the first retry; doubles per attempt.
+    MAIL_SERVER (str): SMTP server for outgoing email (unset: emails are logged).
+    MAIL_PORT (int): SMTP port.
+    MAIL_USE_TLS (bool): Upgrade the SMTP connection with STARTTLS.
+    MAIL_USERNAME (str): SMTP login, if the server requires one.
+    MAIL_PASSWORD (str): SMTP password.
+    MAIL_DEFAULT_SENDER (str): From address of outgoing email.
+    PUBSUB_BROKER (str): Pub/sub broker pushing live events: "memory" (one process),
+        "sqlite" (worker processes of one host) or "package.module:Class".
+    PUBSUB_PATH (str): SQLite file of the "sqlite" broker (defaults to the instance
+        folder).
+    NOTIFY_STREAM_TIMEOUT (int): Seconds a notification event stream stays open before
+        the browser reconnects.
+    NOTIFY_POLL_TIMEOUT (int): Longest wait of a notification long poll, in seconds.
+    NOTIFY_RETENTION_DAYS (int): Age, in days, after which read notifications are
+        removed by `flask prune-notifications`.
+    NOTIFY_RETENTION_ARCHIVE (bool): Copy pruned notifications to notifications_archive
+        instead of only deleting them.
+    UPLOAD_FOLDER (str): Where uploaded photos are stored (defaults to static/uploads).
+    MAX_CONTENT_LENGTH (int): Largest request body accepted, in bytes (413 above).
+    UPLOAD_MAX_FILE_SIZE (int): Largest uploaded file, in bytes, checked while it streams in.
+    UPLOAD_MAX_FILES (int): Most files accepted in one request.
+    PHOTO_VARIANTS (dict): Resized copies rendered for each place photo, as
+        {name: longest edge in pixels}.
+    PHOTO_QUALITY (int): WebP/JPEG quality of the rendered variants.
+    PHOTO_MAX_PIXELS (int): Largest accepted upload, in pixels.
+    PHOTO_RENDER_THREADS (int): Threads rendering the photos of one job batch.
+    MEDIA_MAX_AGE (int): Browser cache lifetime, in seconds, of uploads not named
+        after their content.
+    MEDIA_IMMUTABLE_MAX_AGE (int): Cache lifetime of content-addressed uploads and
+        built assets (sent as immutable).
+    ASSET_MANIFEST (str): Manifest written by `flask build-assets` (defaults to
+        static/dist/manifest.json).
+    IDENTITY_CACHE_TTL (int): Seconds the logged-in user is kept between requests
+        by each process (0 disables it; edits through the app drop it at once).
+    PASSWORD_METHOD (str): Password hashing algorithm and cost, e.g. "scrypt:32768:8:1",
+        "pbkdf2:sha256:600000" or "bcrypt:12"; older hashes are upgraded at login.
+    PASSWORD_WORKERS (int): Processes verifying passwords (0: on the request thread).
+    JWT_REVOCATION_TTL (int): Seconds an account-wide token revocation is kept
+        (defaults to the refresh token lifetime); revocations are per process.
+    JWT_REVOCATION_MAX_ENTRIES (int): Revoked tokens and accounts kept in memory.
     """
 
     SECRET_KEY = os.getenv("SECRET_KEY", "default_secret_key")
@@ -19,6 +90,97 @@ class Config:
         "JWT_SECRET_KEY", "change-me-to-a-secure-random-string-for-development"
     )
 
+    # Geocoding: strict upstream timeout, shared on-disk cache, offline gazetteer
+    GEOCODER_TIMEOUT = float(os.getenv("GEOCODER_TIMEOUT", "3"))
+    GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH")
+    GEOCODE_CACHE_TTL = 30 * 24 * 3600
+    GEOCODE_NEGATIVE_TTL = 3600
+    GEOCODE_CACHE_MAX_ENTRIES = 10000
+    GEOCODE_GAZETTEER_CSV = os.getenv("GEOCODE_GAZETTEER_CSV")
+
+    # Place views are buffered per process and flushed as aggregated deltas
+    VIEW_FLUSH_INTERVAL = 10.0
+    VIEW_FLUSH_THRESHOLD = 100
+    VIEW_DEDUP_WINDOW = 30 * 60
+
+    # Booking calendars are cached per process and rebuilt after this long
+    AVAILABILITY_TTL = 300
+
+    # Keyset pagination of list endpoints and admin pages
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    # Opt-in request instrumentation (Server-Timing headers, /admin/perf)
+    PERF_ENABLED = os.getenv("PERF_ENABLED", "0") == "1"
+    PERF_QUERY_BUDGET = int(os.getenv("PERF_QUERY_BUDGET", "25"))
+    PERF_SAMPLE_SIZE = 1000
+
+    # Public responses cached until a commit touches what they show
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH")
+    RESPONSE_CACHE_TTL = 300
+    RESPONSE_CACHE_MAX_ENTRIES = 2000
+
+    # Bayesian place ratings: weight of the site-wide mean, in reviews
+    RATING_PRIOR_WEIGHT = 5
+
+    # Host rating / portfolio statistics, optionally stored in host_stats
+    HOST_STATS_MATERIALIZED = os.getenv("HOST_STATS_MATERIALIZED", "0") == "1"
+    HOST_STATS_MAX_AGE = 3600
+    HOST_STATS_WINDOW_DAYS = 365
+
+    # Background jobs (outbox table + worker threads) and outgoing email
+    OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "2"))
+    OUTBOX_BATCH_SIZE = 20
+    OUTBOX_MAX_ATTEMPTS = 5
+    OUTBOX_BACKOFF_BASE = 10.0
+    MAIL_SERVER = os.getenv("MAIL_SERVER")
+    MAIL_PORT = int(os.getenv("MAIL_PORT", "25"))
+    MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "0") == "1"
+    MAIL_USERNAME = os.getenv("MAIL_USERNAME")
+    MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
+    MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER", "HBnB <noreply@hbnb.local>")
+
+    # Live notifications (Server-Sent Events / long polling) and their broker
+    PUBSUB_BROKER = os.getenv("PUBSUB_BROKER", "memory")
+    PUBSUB_PATH = os.getenv("PUBSUB_PATH")
+    NOTIFY_STREAM_TIMEOUT = 300
+    NOTIFY_HEARTBEAT = 15
+    NOTIFY_POLL_TIMEOUT = 25
+
+    # Retention of read notifications (`flask prune-notifications`)
+    NOTIFY_RETENTION_DAYS = int(os.getenv("NOTIFY_RETENTION_DAYS", "90"))
+    NOTIFY_RETENTION_ARCHIVE = os.getenv("NOTIFY_RETENTION_ARCHIVE", "1") == "1"
+    NOTIFY_RETENTION_BATCH = 1000
+
+    # Place photos: validated on upload, resized variants rendered by the outbox
+    UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER")
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 64 * 1024 * 1024))
+    UPLOAD_MAX_FILE_SIZE = int(os.getenv("UPLOAD_MAX_FILE_SIZE", 16 * 1024 * 1024))
+    UPLOAD_MAX_FILES = 20
+    PHOTO_VARIANTS = {"thumb": 320, "card": 800, "full": 1600}
+    PHOTO_QUALITY = 80
+    PHOTO_MAX_PIXELS = 40_000_000
+    PHOTO_RENDER_THREADS = 4
+
+    # Media and assets served with long-lived cache headers
+    MEDIA_MAX_AGE = 3600
+    MEDIA_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+    ASSET_MANIFEST = os.getenv("ASSET_MANIFEST")
+
+    # Logged-in user resolved once per request, and kept between requests
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", 0))
+    IDENTITY_CACHE_MAX_ENTRIES = 10000
+
+    # Password hashing, verified in a process pool
+    PASSWORD_METHOD = os.getenv("PASSWORD_METHOD", "scrypt:32768:8:1")
+    PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", min(4, os.cpu_count() or 1)))
+
+    # API tokens carry their claims; revoked ones are denied from memory
+    JWT_REVOCATION_TTL = None
+    JWT_REVOCATION_MAX_ENTRIES = 100000
+
 
 # ----------------------- development config ----------------------- #
 class DevelopmentConfig(Config):
@@ -34,11 +196,37 @@ class DevelopmentConfig(Config):
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
 
+# ----------------------- testing config ----------------------- #
+class TestingConfig(Config):
+    """
+    Testing configuration class.
+
+    Uses an in-memory SQLite database so each app instance starts empty.
+    """
+
+    TESTING = True
+
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Tests run queued jobs explicitly with outbox.run_once()
+    OUTBOX_WORKERS = 0
+
+    # Passwords verified inline, with a cheap method
+    PASSWORD_WORKERS = 0
+    PASSWORD_METHOD = "pbkdf2:sha256:1000"
+
+
 # ----------------------- config mapping ----------------------- #
 """
 Mapping of configuration environment names to their config classes.
 
 - development: DevelopmentConfig
+- testing: TestingConfig
 - default: DevelopmentConfig
 """
-config = {"development": DevelopmentConfig, "default": DevelopmentConfig}
+config = {
+    "development": DevelopmentConfig,
+    "testing": TestingConfig,
+    "default": DevelopmentConfig,
+}
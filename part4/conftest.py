@@ -0,0 +1,10 @@
+"""
+conftest.py: Settings that must be in place before the app package is imported.
+"""
+
+import os
+
+# Collections of places and amenities walked without a loader option raise
+# instead of lazy loading, so N+1 query loops fail the tests (see
+# app/database.py)
+os.environ.setdefault("HBNB_LAZY_LOADING", "raise_on_sql")
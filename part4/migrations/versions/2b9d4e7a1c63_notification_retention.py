@@ -0,0 +1,37 @@
+"""notification retention
+
+Revision ID: 2b9d4e7a1c63
+Revises: f3d8a5c1b960
+Create Date: 2026-10-17 17:03:51.904316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b9d4e7a1c63'
+down_revision = 'f3d8a5c1b960'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_notifications_recipient_status_timestamp', 'notifications', ['recipient_id', 'status', 'timestamp'], unique=False)
+    op.create_table('notifications_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('recipient_id', sa.String(length=36), nullable=False),
+    sa.Column('recipient_type', sa.String(length=20), nullable=False),
+    sa.Column('message', sa.String(length=500), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notifications_archive_recipient_timestamp', 'notifications_archive', ['recipient_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notifications_archive_recipient_timestamp', table_name='notifications_archive')
+    op.drop_table('notifications_archive')
+    op.drop_index('ix_notifications_recipient_status_timestamp', table_name='notifications')
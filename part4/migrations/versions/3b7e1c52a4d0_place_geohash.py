@@ -0,0 +1,38 @@
+"""place geohash
+
+Revision ID: 3b7e1c52a4d0
+Revises: 9f6d857892af
+Create Date: 2026-10-17 09:12:41.108233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.geo import encode_geohash
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e1c52a4d0'
+down_revision = '9f6d857892af'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('places', sa.Column('geohash', sa.String(length=12), nullable=True))
+    op.create_index(op.f('ix_places_geohash'), 'places', ['geohash'], unique=False)
+
+    # Backfill existing listings
+    conn = op.get_bind()
+    rows = conn.execute(sa.text('SELECT id, latitude, longitude FROM places')).fetchall()
+    for place_id, lat, lon in rows:
+        if lat and lon:
+            conn.execute(
+                sa.text('UPDATE places SET geohash = :gh WHERE id = :id'),
+                {'gh': encode_geohash(lat, lon), 'id': place_id},
+            )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_places_geohash'), table_name='places')
+    op.drop_column('places', 'geohash')
@@ -0,0 +1,28 @@
+"""place photo variants
+
+Revision ID: 4c1e8f2d7a90
+Revises: 2b9d4e7a1c63
+Create Date: 2026-10-17 18:12:40.517203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1e8f2d7a90'
+down_revision = '2b9d4e7a1c63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('place_photos', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('place_photos', sa.Column('height', sa.Integer(), nullable=True))
+    op.add_column('place_photos', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('place_photos', 'variants')
+    op.drop_column('place_photos', 'height')
+    op.drop_column('place_photos', 'width')
@@ -0,0 +1,50 @@
+"""place rating stats
+
+Revision ID: 5c2d8e9a1f37
+Revises: 3b7e1c52a4d0
+Create Date: 2026-10-17 10:04:18.552907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2d8e9a1f37'
+down_revision = '3b7e1c52a4d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('place_rating_stats',
+    sa.Column('place_id', sa.String(length=36), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('average_rating', sa.Float(), nullable=False),
+    sa.Column('top_review_id', sa.String(length=36), nullable=True),
+    sa.Column('top_rating', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['place_id'], ['places.id'], ),
+    sa.PrimaryKeyConstraint('place_id')
+    )
+    op.create_index(op.f('ix_place_rating_stats_average_rating'), 'place_rating_stats', ['average_rating'], unique=False)
+    op.create_index(op.f('ix_reviews_place_id'), 'reviews', ['place_id'], unique=False)
+
+    # Backfill aggregates from existing reviews
+    op.execute(
+        'INSERT INTO place_rating_stats (place_id, review_count, rating_sum, average_rating) '
+        'SELECT place_id, COUNT(rating), SUM(rating), AVG(rating) '
+        'FROM reviews WHERE rating IS NOT NULL GROUP BY place_id'
+    )
+    op.execute(
+        'UPDATE place_rating_stats SET '
+        'top_review_id = (SELECT r.id FROM reviews r WHERE r.place_id = place_rating_stats.place_id '
+        'AND r.rating IS NOT NULL ORDER BY r.rating DESC, r.created_at DESC LIMIT 1), '
+        'top_rating = (SELECT MAX(r.rating) FROM reviews r WHERE r.place_id = place_rating_stats.place_id)'
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_reviews_place_id'), table_name='reviews')
+    op.drop_index(op.f('ix_place_rating_stats_average_rating'), table_name='place_rating_stats')
+    op.drop_table('place_rating_stats')
@@ -0,0 +1,43 @@
+"""photo blobs
+
+Revision ID: 7a3f5b9c2e14
+Revises: 4c1e8f2d7a90
+Create Date: 2026-10-17 19:26:08.341975
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3f5b9c2e14'
+down_revision = '4c1e8f2d7a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('photo_blobs',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('content_type', sa.String(length=32), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('url', sa.String(length=256), nullable=False),
+    sa.Column('variants', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Batch mode: SQLite cannot add a foreign key to an existing table
+    with op.batch_alter_table('place_photos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('blob_id', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_place_photos_blob_id'), ['blob_id'], unique=False)
+        batch_op.create_foreign_key('fk_place_photos_blob_id', 'photo_blobs', ['blob_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('place_photos', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_place_photos_blob_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_place_photos_blob_id'))
+        batch_op.drop_column('blob_id')
+    op.drop_table('photo_blobs')
@@ -0,0 +1,36 @@
+"""user email lower index
+
+Revision ID: 7a41f0c3d925
+Revises: 5c2d8e9a1f37
+Create Date: 2026-10-17 11:26:52.340118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a41f0c3d925'
+down_revision = '5c2d8e9a1f37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    duplicates = conn.execute(sa.text(
+        'SELECT lower(trim(email)) FROM users GROUP BY lower(trim(email)) HAVING COUNT(*) > 1'
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            'Accounts differing only by email case must be merged first: '
+            + ', '.join(duplicates)
+        )
+
+    # Store emails in their canonical form, as the User model now does
+    op.execute('UPDATE users SET email = lower(trim(email)) WHERE email != lower(trim(email))')
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_users_email_lower', table_name='users')
@@ -0,0 +1,23 @@
+"""booking availability index
+
+Revision ID: 8e5b2a6f0c14
+Revises: 7a41f0c3d925
+Create Date: 2026-10-17 12:08:33.917265
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8e5b2a6f0c14'
+down_revision = '7a41f0c3d925'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_bookings_place_availability', 'bookings', ['place_id', 'status', 'start_date', 'end_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_bookings_place_availability', table_name='bookings')
@@ -0,0 +1,36 @@
+"""widen password hash
+
+Revision ID: 9d2c6e1f4b37
+Revises: 7a3f5b9c2e14
+Create Date: 2026-10-17 21:02:17.655190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2c6e1f4b37'
+down_revision = '7a3f5b9c2e14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # scrypt hashes are ~160 characters. SQLite does not enforce VARCHAR
+    # lengths, and rebuilding users there would lose ix_users_email_lower.
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    op.alter_column('users', 'password',
+               existing_type=sa.String(length=128),
+               type_=sa.String(length=256),
+               existing_nullable=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    op.alter_column('users', 'password',
+               existing_type=sa.String(length=256),
+               type_=sa.String(length=128),
+               existing_nullable=False)
@@ -0,0 +1,29 @@
+"""pagination indexes
+
+Revision ID: a3c9d17e5b82
+Revises: 8e5b2a6f0c14
+Create Date: 2026-10-17 13:41:06.284519
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c9d17e5b82'
+down_revision = '8e5b2a6f0c14'
+branch_labels = None
+depends_on = None
+
+CREATED_AT_TABLES = ['amenities', 'bookings', 'place_photos', 'places', 'reviews', 'users']
+
+
+def upgrade():
+    for table in CREATED_AT_TABLES:
+        op.create_index(op.f(f'ix_{table}_created_at'), table, ['created_at'], unique=False)
+    op.create_index('ix_notifications_recipient_timestamp', 'notifications', ['recipient_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notifications_recipient_timestamp', table_name='notifications')
+    for table in CREATED_AT_TABLES:
+        op.drop_index(op.f(f'ix_{table}_created_at'), table_name=table)
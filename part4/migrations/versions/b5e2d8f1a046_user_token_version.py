@@ -0,0 +1,24 @@
+"""user token version
+
+Revision ID: b5e2d8f1a046
+Revises: 9d2c6e1f4b37
+Create Date: 2026-10-17 22:14:38.201947
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e2d8f1a046'
+down_revision = '9d2c6e1f4b37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    op.drop_column('users', 'token_version')
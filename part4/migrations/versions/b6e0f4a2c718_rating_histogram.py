@@ -0,0 +1,38 @@
+"""rating histogram
+
+Revision ID: b6e0f4a2c718
+Revises: a3c9d17e5b82
+Create Date: 2026-10-17 15:12:47.903316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e0f4a2c718'
+down_revision = 'a3c9d17e5b82'
+branch_labels = None
+depends_on = None
+
+STARS = range(1, 6)
+
+
+def upgrade():
+    for star in STARS:
+        op.add_column('place_rating_stats', sa.Column(f'rating_{star}_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill the histogram from existing reviews
+    op.execute(
+        'UPDATE place_rating_stats SET '
+        + ', '.join(
+            f'rating_{star}_count = (SELECT COUNT(*) FROM reviews r '
+            f'WHERE r.place_id = place_rating_stats.place_id AND r.rating = {star})'
+            for star in STARS
+        )
+    )
+
+
+def downgrade():
+    for star in reversed(STARS):
+        op.drop_column('place_rating_stats', f'rating_{star}_count')
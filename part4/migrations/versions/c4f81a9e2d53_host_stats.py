@@ -0,0 +1,38 @@
+"""host stats
+
+Revision ID: c4f81a9e2d53
+Revises: b6e0f4a2c718
+Create Date: 2026-10-17 16:40:05.218734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f81a9e2d53'
+down_revision = 'b6e0f4a2c718'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('host_stats',
+    sa.Column('host_id', sa.String(length=36), nullable=False),
+    sa.Column('listing_count', sa.Integer(), nullable=False),
+    sa.Column('total_views', sa.Integer(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('average_rating', sa.Float(), nullable=False),
+    sa.Column('booked_nights', sa.Integer(), nullable=False),
+    sa.Column('occupancy', sa.Float(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['host_id'], ['hosts.id'], ),
+    sa.PrimaryKeyConstraint('host_id')
+    )
+    op.create_index(op.f('ix_places_host_id'), 'places', ['host_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_places_host_id'), table_name='places')
+    op.drop_table('host_stats')
@@ -0,0 +1,65 @@
+"""notification archive surrogate key
+
+Revision ID: c8f4a2e6d913
+Revises: b5e2d8f1a046
+Create Date: 2026-10-17 23:05:12.418830
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f4a2e6d913'
+down_revision = 'b5e2d8f1a046'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'recipient_id, recipient_type, message, status, timestamp, archived_at'
+
+
+def _archive_table(name, key_columns):
+    op.create_table(name,
+    *key_columns,
+    sa.Column('recipient_id', sa.String(length=36), nullable=False),
+    sa.Column('recipient_type', sa.String(length=20), nullable=False),
+    sa.Column('message', sa.String(length=500), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def upgrade():
+    # notifications.id can come back once pruned: keep it as a plain column
+    _archive_table('notifications_archive_new', [
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('notification_id', sa.Integer(), nullable=False),
+    ])
+    op.execute(
+        f'INSERT INTO notifications_archive_new (notification_id, {COLUMNS}) '
+        f'SELECT id, {COLUMNS} FROM notifications_archive ORDER BY id'
+    )
+    op.drop_index('ix_notifications_archive_recipient_timestamp', table_name='notifications_archive')
+    op.drop_table('notifications_archive')
+    op.rename_table('notifications_archive_new', 'notifications_archive')
+    op.create_index('ix_notifications_archive_recipient_timestamp', 'notifications_archive', ['recipient_id', 'timestamp'], unique=False)
+    op.create_index(op.f('ix_notifications_archive_notification_id'), 'notifications_archive', ['notification_id'], unique=False)
+
+
+def downgrade():
+    # The latest copy of each notification id is kept
+    _archive_table('notifications_archive_old', [
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    ])
+    op.execute(
+        f'INSERT INTO notifications_archive_old (id, {COLUMNS}) '
+        f'SELECT notification_id, {COLUMNS} FROM notifications_archive '
+        'WHERE id IN (SELECT max(id) FROM notifications_archive GROUP BY notification_id)'
+    )
+    op.drop_index(op.f('ix_notifications_archive_notification_id'), table_name='notifications_archive')
+    op.drop_index('ix_notifications_archive_recipient_timestamp', table_name='notifications_archive')
+    op.drop_table('notifications_archive')
+    op.rename_table('notifications_archive_old', 'notifications_archive')
+    op.create_index('ix_notifications_archive_recipient_timestamp', 'notifications_archive', ['recipient_id', 'timestamp'], unique=False)
@@ -0,0 +1,23 @@
+"""message conversation index
+
+Revision ID: e7b3d91f4c26
+Revises: d2a6c0e8b417
+Create Date: 2026-10-17 19:21:44.870356
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3d91f4c26'
+down_revision = 'd2a6c0e8b417'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_messages_conversation', 'messages', ['sender_id', 'receiver_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_messages_conversation', table_name='messages')
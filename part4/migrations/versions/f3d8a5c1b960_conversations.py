@@ -0,0 +1,67 @@
+"""conversations
+
+Revision ID: f3d8a5c1b960
+Revises: e7b3d91f4c26
+Create Date: 2026-10-17 16:12:40.318254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3d8a5c1b960'
+down_revision = 'e7b3d91f4c26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('conversations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_a_id', sa.String(length=36), nullable=False),
+    sa.Column('user_b_id', sa.String(length=36), nullable=False),
+    sa.Column('last_message_id', sa.Integer(), nullable=True),
+    sa.Column('last_sender_id', sa.String(length=36), nullable=True),
+    sa.Column('last_preview', sa.String(length=200), nullable=True),
+    sa.Column('last_timestamp', sa.DateTime(), nullable=False),
+    sa.Column('unread_a', sa.Integer(), nullable=False),
+    sa.Column('unread_b', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_a_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_b_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_a_id', 'user_b_id', name='uq_conversations_pair')
+    )
+    op.create_index('ix_conversations_a_recent', 'conversations', ['user_a_id', 'last_timestamp'], unique=False)
+    op.create_index('ix_conversations_b_recent', 'conversations', ['user_b_id', 'last_timestamp'], unique=False)
+
+    # Backfill one row per pair of users from existing messages
+    op.execute(
+        'INSERT INTO conversations (user_a_id, user_b_id, last_timestamp, unread_a, unread_b) '
+        'SELECT a, b, COALESCE(MAX(timestamp), CURRENT_TIMESTAMP), '
+        'SUM(CASE WHEN unread AND receiver_id = a THEN 1 ELSE 0 END), '
+        'SUM(CASE WHEN unread AND receiver_id = b THEN 1 ELSE 0 END) '
+        'FROM (SELECT receiver_id, timestamp, '
+        'CASE WHEN sender_id < receiver_id THEN sender_id ELSE receiver_id END AS a, '
+        'CASE WHEN sender_id < receiver_id THEN receiver_id ELSE sender_id END AS b, '
+        '(NOT COALESCE(is_read, FALSE) AND sender_id <> receiver_id) AS unread '
+        'FROM messages) AS m GROUP BY a, b'
+    )
+    op.execute(
+        'UPDATE conversations SET last_message_id = ('
+        'SELECT m.id FROM messages m WHERE '
+        '(m.sender_id = conversations.user_a_id AND m.receiver_id = conversations.user_b_id) OR '
+        '(m.sender_id = conversations.user_b_id AND m.receiver_id = conversations.user_a_id) '
+        'ORDER BY m.timestamp DESC, m.id DESC LIMIT 1)'
+    )
+    op.execute(
+        'UPDATE conversations SET '
+        'last_sender_id = (SELECT m.sender_id FROM messages m WHERE m.id = conversations.last_message_id), '
+        'last_preview = (SELECT SUBSTR(m.content, 1, 200) FROM messages m WHERE m.id = conversations.last_message_id)'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_conversations_b_recent', table_name='conversations')
+    op.drop_index('ix_conversations_a_recent', table_name='conversations')
+    op.drop_table('conversations')
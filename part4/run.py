@@ -1,6 +1,9 @@
 from app import create_app
 
-app = create_app()
+# Worker processes started with "spawn" (the password pool) import this
+# script again as __mp_main__: they need no application of their own
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     app.run(debug=True)